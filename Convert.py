@@ -0,0 +1,31 @@
+import sys
+
+import _funcs
+import _utils
+
+def Convert(prjnm,fmt):
+
+    # Load options
+    run,test,fout,output,tol,maxiter,method,starts,chkpt,props,vars,bounds,constr,nlgeom,vfs,bc,nprops,nvars,nt,engine = _funcs.load_options(prjnm)
+
+    # Pack per-increment CSV files of each test into a single container
+    _funcs.convert_project(prjnm,test,nt,fmt,engine)
+
+    return
+
+if __name__ == '__main__':
+
+    # Clear command window
+    _utils.clear_screen()
+
+    # Name of project and container format
+    prjname = 'Benchmark'
+    fmt = 'h5'
+
+    # Name of project and container format from command line
+    if len(sys.argv) > 1:
+        prjname = sys.argv[1]
+    if len(sys.argv) > 2:
+        fmt = sys.argv[2].lower()
+
+    Convert(prjname,fmt)
\ No newline at end of file
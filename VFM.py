@@ -1,26 +1,42 @@
+import os
 import sys
 
 import _funcs
 import _utils
 
-def VFM(prjnm):
+def VFM(prjnm,resume=False,log=False):
 
     ##################
     # PRE-PROCESSING #
     ##################
 
     # Load options
-    run,test,fout,tol,maxiter,props,vars,bounds,constr,nlgeom,vfs,bc,nprops,nvars,nt = _funcs.load_options(prjnm)
+    run,test,fout,output,tol,maxiter,method,starts,chkpt,props,vars,bounds,constr,nlgeom,vfs,bc,nprops,nvars,nt,engine = _funcs.load_options(prjnm)
+
+    # Print identification progress of event log of output folder
+    if log:
+        dirout = os.path.join(os.getcwd(),'output',fout)
+        print(_funcs.render_event_log(nvars,nt,fout,dirout))
+        return
+
+    # Resume identification from checkpoints
+    chkpt['resume'] = resume
 
     # Create output directory
-    dirout = _funcs.create_directory(prjnm,fout,test,nt)
+    dirout = _funcs.create_directory(prjnm,fout,test,nt,resume)
+
+    # Set scratch directory of memory-mapped arrays
+    if engine['dir'] is None:
+        engine['dir'] = dirout
 
     # Print start info to log file and return start time
-    st = _funcs.print_start(prjname,fout,dirout)
+    st = _funcs.print_start(prjnm,fout,dirout)
 
     # Load project data
     coord,displ,conn,centr,force,time,thk,ori,nf = _funcs.load_data(prjnm,test,
-                                                                    nt)
+                                                                    nt,fout,
+                                                                    dirout,
+                                                                    engine)
 
     # Set dimensional mechanics variables
     nn,ne,npe,dof,ndi,nshr,ntens,ncomp,nstatev = _funcs.dim_vars(coord,conn,
@@ -39,7 +55,7 @@ def VFM(prjnm):
                                                              thk[t],ne[t],
                                                              npe[t],dof[t],
                                                              ndi[t],ntens[t],
-                                                             nf[t])
+                                                             nf[t],engine)
 
     # Get boundary conditions degrees of freedom
     bcdofs = [None]*nt
@@ -49,23 +65,23 @@ def VFM(prjnm):
                                                    bc[t],t)
 
     # Compute elements strain-displacement matrix
-    bg,mbginv = [None]*nt,[None]*nt
+    bg,mbglsq = [None]*nt,[None]*nt
     for t in range(nt):
         if 'sb' in list(vfs[t].keys()):
-            bg[t],mbginv[t] = _funcs.strain_displacement(coord[t],conn[t],
+            bg[t],mbglsq[t] = _funcs.strain_displacement(coord[t],conn[t],
                                                          bcdofs[t],nn[t],ne[t],
                                                          npe[t],dof[t],
                                                          ncomp[t],nlgeom)
 
     # Select type of virtual fields
-    nvfs = [None]*nt
+    nvfs,vfsu = [None]*nt,[None]*nt
     for t in range(nt):
 
         # User-defined virtual fields
         if 'ud' in list(vfs[t].keys()):
 
             # Generate user-defined virtual fields
-            vfs[t],nvfs[t],vfsu = _funcs.user_defined_virtual_fields(coord[t],
+            vfs[t],nvfs[t],vfsu[t] = _funcs.user_defined_virtual_fields(coord[t],
                                                                 centr[t],nn[t],ne[t],
                                                                 dof[t],vfs[t])
 
@@ -79,14 +95,15 @@ def VFM(prjnm):
             vfs[t] = _funcs.sensivity_based_virtual_fields(strain[t],rot[t],
                                                            dfgrd[t],rotm[t],
                                                            time[t],bg[t],
-                                                           mbginv[t],bcdofs[t],
+                                                           mbglsq[t],bcdofs[t],
                                                            vfs[t],nn[t],ne[t],
                                                            dof[t],ndi[t],
                                                            nshr[t],ntens[t],
                                                            ncomp[t],nstatev[t],
-                                                           nvfs[t],nf[t],
+                                                           nvfs[t],nf[t],t,
                                                            nprops,props,vars,
-                                                           nlgeom,fout)
+                                                           nlgeom,fout,dirout,
+                                                           engine)
 
     ##############
     # PROCESSING #
@@ -100,9 +117,10 @@ def VFM(prjnm):
             props = _funcs.properties_constraints(props,constr)
 
         # Perform vfm simulation with given material properties
-        ivw,evw,phi,_ = _funcs.simulation(strain,rot,dfgrd,rotm,force,vol,vfs,
+        ivw,evw,_,phi,_ = _funcs.simulation(strain,rot,dfgrd,rotm,force,vol,vfs,
                                           ne,dof,ndi,nshr,ntens,nstatev,nvfs,
-                                          nf,nt,nprops,props,nlgeom,fout)
+                                          nf,nt,nprops,props,nlgeom,fout,
+                                          engine)
 
         # Write virtual work of given material properties
         for t in range(nt):
@@ -116,22 +134,39 @@ def VFM(prjnm):
     elif run == 'identification':
 
         props = _funcs.identification(strain,rot,dfgrd,rotm,force,time,vol,bg,
-                                      mbginv,bcdofs,vfs,nn,ne,dof,ndi,nshr,
+                                      mbglsq,bcdofs,vfs,nn,ne,dof,ndi,nshr,
                                       ntens,ncomp,nstatev,nvfs,nf,nt,nprops,
                                       nvars,props,vars,bounds,constr,nlgeom,
-                                      test,fout,dirout,tol,maxiter,st)
+                                      test,fout,dirout,tol,maxiter,method,
+                                      starts,chkpt,st,engine)
+
+        # Apply user-defined properties constraints to final solution
+        if len(constr) > 0:
+            props = _funcs.properties_constraints(props,constr)
 
     ###################
     # POST-PROCESSING #
     ###################
 
+    # Keep stress of final solution of tests evaluated in worker processes
+    _funcs.fetch_test_results(props,nt,engine)
+
     # Loop over tests
     for t in range(nt):
         _funcs.post_processing(coord[t],displ[t],conn[t],strain[t],rot[t],
                                dfgrd[t],vol[t],time[t],rotm[t],vfs[t],ne[t],
                                dof[t],ndi[t],nshr[t],ntens[t],ncomp[t],
-                               nstatev[t],nvfs[t],nf[t],test[t],nt,nprops,
-                               props,vars,nlgeom,fout,dirout,vfsu)
+                               nstatev[t],nvfs[t],nf[t],t,test[t],nt,nprops,
+                               props,vars,nlgeom,fout,dirout,vfsu[t],output,
+                               engine)
+
+    # Print usage of stress integration cache
+    _funcs.print_result_cache(engine['cache'],fout,dirout)
+
+    # Shut down pools of processes of stress integration and tests, which are
+    #   otherwise shut down at exit if the run fails
+    _funcs.close_integration_pool(engine)
+    _funcs.close_test_pools(engine)
 
     return
 
@@ -143,8 +178,11 @@ if __name__ == '__main__':
     # Name of project
     prjname = 'Benchmark'
 
-    # Name of project from command line
-    if len(sys.argv) > 1:
-        prjname = sys.argv[-1]
+    # Name of project, resume and log flags from command line
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) > 0:
+        prjname = args[-1]
+    resume = '--resume' in sys.argv[1:]
+    log = '--log' in sys.argv[1:]
 
-    VFM(prjname)
\ No newline at end of file
+    VFM(prjname,resume,log)
\ No newline at end of file
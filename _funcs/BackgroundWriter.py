@@ -0,0 +1,199 @@
+import time
+import queue
+import atexit
+import threading
+import numpy as np
+from functools import partial
+
+import _funcs
+
+# Maximum number of pending writes, rows per batch and seconds between flushes
+writer_queue = 1024
+writer_batch = 256
+writer_interval = 1.0
+
+def flush_writes(progress,vwork,refresh):
+    """
+    Write pending progress rows, latest virtual work of each test and pending
+      refresh events.
+
+    Parameters
+    ----------
+    progress : {(nvars,nt,fout,dirout): (nrows, (it,fevit,x,phi) )} , dict
+        Pending rows of identification progress of each file.
+    vwork : {(test,nt,fout,dirout): (ivw,evw,nvfs,nf)} , dict
+        Latest virtual work of each test.
+    refresh : {(fout,dirout): (nrows, (it,t,refresh,change,time,saved) )} , dict
+        Pending refresh events of sensitivity-based virtual fields of each
+          file.
+    """
+
+    for (nvars,nt,fout,dirout),rows in progress.items():
+        _funcs.write_progress_rows(rows,nvars,nt,fout,dirout)
+
+    for (test,nt,fout,dirout),(ivw,evw,nvfs,nf) in vwork.items():
+        _funcs.write_virtual_work(ivw,evw,test,nvfs,nf,nt,fout,dirout)
+
+    for (fout,dirout),rows in refresh.items():
+        _funcs.write_refresh_rows(rows,fout,dirout)
+
+    progress.clear()
+    vwork.clear()
+    refresh.clear()
+
+    return
+
+def writer_loop(writer):
+    """
+    Write progress, virtual work and refresh events of the queue of the
+      background writer in batches.
+
+    Parameters
+    ----------
+    writer : {'queue','thread','error','exit'} , dict
+        Background writer.
+    """
+
+    progress,vwork,refresh = {},{},{}
+    nrows = 0
+    last = time.perf_counter()
+    stop = False
+
+    while not stop:
+
+        # Wait for next write until next periodic flush
+        try:
+            item = writer['queue'].get(timeout=writer_interval)
+        except queue.Empty:
+            item = ()
+
+        # Stop after writing all pending writes
+        if item is None:
+            stop = True
+
+        # Append progress rows in order
+        elif item and (item[0] == 'progress'):
+            progress.setdefault(item[1],[]).append(item[2])
+            nrows += 1
+
+        # Keep only latest virtual work, superseded iterations are coalesced
+        elif item and (item[0] == 'vwork'):
+            vwork[item[1]] = item[2]
+
+        # Append refresh events in order
+        elif item and (item[0] == 'refresh'):
+            refresh.setdefault(item[1],[]).append(item[2])
+            nrows += 1
+
+        # Flush batch when large enough, periodically or on stop
+        now = time.perf_counter()
+        if stop or (nrows >= writer_batch) or (now - last >= writer_interval):
+            try:
+                flush_writes(progress,vwork,refresh)
+            except Exception as e:
+                writer['error'] = e
+                progress.clear()
+                vwork.clear()
+                refresh.clear()
+            nrows = 0
+            last = now
+
+    return
+
+def start_writer():
+    """
+    Start background writer thread of identification outputs.
+
+    Returns
+    -------
+    writer : {'queue','thread','error','exit'} , dict
+        Background writer, with bounded queue of pending writes, writer
+          thread, first error of writer and exit handler.
+
+    Notes
+    -----
+    The writer is also stopped at interpreter exit, so that the pending
+      writes are not lost when the identification is interrupted.
+    """
+
+    writer = {'queue': queue.Queue(writer_queue),
+              'thread': None,
+              'error': None,
+              'exit': None}
+
+    writer['thread'] = threading.Thread(target=writer_loop,args=(writer,),
+                                        daemon=True)
+    writer['thread'].start()
+
+    writer['exit'] = partial(stop_writer,writer)
+    atexit.register(writer['exit'])
+
+    return writer
+
+def stop_writer(writer):
+    """
+    Stop background writer thread after writing all pending writes.
+
+    Parameters
+    ----------
+    writer : {'queue','thread','error','exit'} , dict
+        Background writer.
+
+    Raises
+    ------
+    Exception
+        First error raised while writing in background.
+    """
+
+    if writer['thread'] is not None:
+        writer['queue'].put(None)
+        writer['thread'].join()
+        writer['thread'] = None
+        atexit.unregister(writer['exit'])
+
+    if writer['error'] is not None:
+        raise writer['error']
+
+    return
+
+def submit_progress(writer,it,fevit,x,phi,nvars,nt,fout,dirout):
+    """
+    Queue a row of identification progress of variables and cost function.
+
+    See Also
+    --------
+    write_progress : parameters of identification progress.
+    """
+
+    row = (it,fevit,np.array(x,dtype=float),np.array(phi,dtype=float))
+    writer['queue'].put(('progress',(nvars,nt,fout,dirout),row))
+
+    return
+
+def submit_virtual_work(writer,ivw,evw,test,nvfs,nf,nt,fout,dirout):
+    """
+    Queue internal and external virtual work of current solution of a test.
+
+    See Also
+    --------
+    write_virtual_work : parameters of virtual work.
+    """
+
+    vw = (np.array(ivw),np.array(evw),nvfs,nf)
+    writer['queue'].put(('vwork',(test,nt,fout,dirout),vw))
+
+    return
+
+def submit_refresh(writer,it,t,refresh,change,time,saved,fout,dirout):
+    """
+    Queue a refresh event of sensitivity-based virtual fields of a test.
+
+    See Also
+    --------
+    write_refresh_rows : parameters of refresh events.
+    """
+
+    row = (it,t,refresh,float(change),float(time),float(saved))
+    writer['queue'].put(('refresh',(fout,dirout),row))
+
+    return
\ No newline at end of file
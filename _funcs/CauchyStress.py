@@ -3,8 +3,8 @@ import numpy as np
 import _funcs
 import _utils
 
-def cauchy_stress(strain,rot,rotm,ne,dof,ndi,nshr,ntens,nstatev,nf,nprops,
-                  props,fout,voigt=False):
+def cauchy_stress(strain,rot,rotm,ne,dof,ndi,nshr,ntens,nstatev,nf,t,nprops,
+                  props,fout,engine,voigt=False,slot='eval'):
     """
     Compute the cauchy stress in local csys using the backward-Euler with an elastic predictor and plastic corrector.
 
@@ -30,46 +30,72 @@ def cauchy_stress(strain,rot,rotm,ne,dof,ndi,nshr,ntens,nstatev,nf,nprops,
         Number of internal state variables.
     nf : int
         Number of increments.
+    t : int
+        Test number.
     nprops : int
         Number of material properties.
-    props : (nprops,) , float
-        Material properties.
+    props : (nprops,) or (nbatch,nprops) , float
+        Material properties, or batch of material properties.
     fout : str
         Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
     voigt : bool
         Flag for voigt notation (False/True).
+    slot : str or None
+        Slot of result store keeping the results of single material
+          properties, or of the whole batch for batch slots, or None to not
+          keep the results.
 
     Returns
     -------
-    stress : (nf,ne,dof,dof) , float
+    stress : ([nbatch],nf,ne,dof,dof) or ([nbatch],nf,ne,ntens) , float
         Cauchy stress in global csys.
-    statev : (nf,ne,ntens+1) , float
+    statev : ([nbatch],nf,ne,ntens+1) , float
         Internal state variables in local csys.
-    de33 : (nf,ne) , float
+    de33 : ([nbatch],nf,ne) , float
         Strain in thickness direction (plane stress).
-    success : bool
+    success : bool or (nbatch,) , bool
         Variable to monitor the sucess of stress reconstruction (False/True).
+
+    Notes
+    -----
+    For a batch of material properties, all results have a leading batch
+      dimension and the success is given for each material properties.
+      Results of stress integration are reused from the result store and the
+      cache of engine settings for material properties already integrated in
+      this test.
     """
 
-    # Initialize f2py external stop function
-    _funcs.ummdp_vfm.f2py_stop = _utils.f2py_stop
+    # Batch of material properties
+    batch = np.ndim(props) == 2
 
     # Stress integration in corotational material csys
-    try:
-        stress,statev,de33 = _funcs.ummdp_vfm.ummdp_vfm(strain,ne,ndi,nshr,
-                                                        ntens,nstatev,props,
-                                                        nprops,nf,fout)
-        success = True
+    stress,statev,de33,success = _funcs.cached_integration(strain,ne,ndi,nshr,
+                                                           ntens,nstatev,
+                                                           np.atleast_2d(props),
+                                                           nprops,nf,t,fout,
+                                                           engine,slot)
 
-    except Exception:
-        stress = np.zeros((nf,ne,ntens))
-        statev = np.zeros((nf,ne,ntens+1))
-        de33 = np.zeros((nf,ne))
+    nbatch = stress.shape[0]
 
-        success = False
+    # Initialize cauchy stress on global csys
+    if voigt:
+        stressg = _utils.memory_map((nbatch,nf,ne,ntens),engine,stress.dtype)
+    else:
+        stressg = _utils.memory_map((nbatch,nf,ne,dof,dof),engine,
+                                    stress.dtype)
 
     # Rotate cauchy stress to global csys and convert to tensor form
-    stress = _utils.rotate_tensor(stress,rot,rotm,ne,dof,ndi,ntens,nf,
-                                  dir=1,voigt=voigt)
+    for b in range(nbatch):
+        for blk in _utils.increment_blocks(nf,engine):
+            nb = blk.stop - blk.start
+            stressg[b,blk] = _utils.rotate_tensor(stress[b,blk],rot[blk],rotm,
+                                                  ne,dof,ndi,ntens,nb,dir=1,
+                                                  voigt=voigt)
+
+    # Remove batch dimension of single material properties
+    if not batch:
+        stressg,statev,de33,success = stressg[0],statev[0],de33[0],bool(success[0])
 
-    return stress,statev,de33,success
\ No newline at end of file
+    return stressg,statev,de33,success
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import pickle
+
+import _utils
+
+def load_checkpoint(filename):
+    """
+    Load checkpoint of identification.
+
+    Parameters
+    ----------
+    filename : str
+        Checkpoint file.
+
+    Returns
+    -------
+    chk : dict or None
+        Checkpoint contents, or None if not found.
+    """
+
+    if not os.path.isfile(filename):
+        return None
+
+    try:
+        with open(filename,'rb') as f:
+            chk = pickle.load(f)
+    except Exception:
+        _utils.error(f'checkpoint file {os.path.basename(filename)} could not be loaded.')
+
+    return chk
+
+def write_checkpoint(filename,chk):
+    """
+    Write checkpoint of identification.
+
+    Parameters
+    ----------
+    filename : str
+        Checkpoint file.
+    chk : dict
+        Checkpoint contents.
+
+    Notes
+    -----
+    The checkpoint is written to a temporary file which replaces the previous
+      checkpoint, so that a killed job always leaves a complete checkpoint.
+    """
+
+    with open(f'{filename}.tmp','wb') as f:
+        pickle.dump(chk,f,protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f'{filename}.tmp',filename)
+
+    return
+
+def history_file(filename):
+    """
+    Get history file of checkpoint of identification.
+
+    Parameters
+    ----------
+    filename : str
+        Checkpoint file.
+
+    Returns
+    -------
+    filename : str
+        History file of checkpoint.
+    """
+
+    return f'{os.path.splitext(filename)[0]}_History.pkl'
+
+def append_history(filename,entries,offset):
+    """
+    Append evaluations to history of checkpoint of identification.
+
+    Parameters
+    ----------
+    filename : str
+        Checkpoint file.
+    entries : list
+        Evaluations of history since last checkpoint.
+    offset : int
+        Size of history file of last checkpoint.
+
+    Returns
+    -------
+    offset : int
+        Size of history file with appended evaluations.
+
+    Notes
+    -----
+    The history file is truncated at the size of the last checkpoint before
+      appending, which discards evaluations written after it by a killed job
+      or diverged from the history when resuming.
+    """
+
+    hfile = history_file(filename)
+    with open(hfile,'r+b' if os.path.isfile(hfile) else 'w+b') as f:
+        f.seek(offset)
+        f.truncate()
+        for entry in entries:
+            pickle.dump(entry,f,protocol=pickle.HIGHEST_PROTOCOL)
+        offset = f.tell()
+
+    return offset
+
+def load_history(filename,offset):
+    """
+    Load evaluations of history of checkpoint of identification.
+
+    Parameters
+    ----------
+    filename : str
+        Checkpoint file.
+    offset : int
+        Size of history file of checkpoint.
+
+    Returns
+    -------
+    entries : list
+        Evaluations of history, with the size of history file up to each
+          evaluation in end.
+    """
+
+    entries = []
+    try:
+        with open(history_file(filename),'rb') as f:
+            while f.tell() < offset:
+                entry = pickle.load(f)
+                entry['end'] = f.tell()
+                entries.append(entry)
+    except Exception:
+        _utils.error(f'history file of checkpoint {os.path.basename(filename)} could not be loaded.')
+
+    return entries
+
+def checkpoint_file(fout,dirout,n=None):
+    """
+    Get checkpoint file of identification.
+
+    Parameters
+    ----------
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    n : int, optional
+        Number of checkpoint, for several identifications in the same
+          directory.
+
+    Returns
+    -------
+    filename : str
+        Checkpoint file.
+    """
+
+    if n is None:
+        return os.path.join(dirout,f'{fout}_Checkpoint.pkl')
+
+    return os.path.join(dirout,f'{fout}_Checkpoint{n}.pkl')
\ No newline at end of file
@@ -1,7 +1,7 @@
 import os
 import shutil
 
-def create_directory(prjnm,fout,test,nt):
+def create_directory(prjnm,fout,test,nt,resume=False):
     """
     Create directory to export output files of current project.
 
@@ -15,6 +15,8 @@ def create_directory(prjnm,fout,test,nt):
         List of tests name.
     nt : int
         Number of tests.
+    resume : bool
+        Flag to resume identification from checkpoints (False/True).
 
     Returns
     -------
@@ -30,17 +32,23 @@ def create_directory(prjnm,fout,test,nt):
     if not os.path.isdir(outf):
         os.mkdir(outf)
 
-    # Delete old output folder
+    # Delete old output folder, keeping only checkpoints to resume
     if os.path.isdir(dirout):
-        shutil.rmtree(dirout)
+        if resume:
+            for root,_,files in os.walk(dirout):
+                for file in files:
+                    if '_Checkpoint' not in file:
+                        os.remove(os.path.join(root,file))
+        else:
+            shutil.rmtree(dirout)
 
     # Create project output folder
-    os.mkdir(dirout)
+    os.makedirs(dirout,exist_ok=True)
 
     # Create tests output folders
     if nt > 1:
         for t in range(nt):
-            os.mkdir(f'{dirout}\{test[t]}')
+            os.makedirs(os.path.join(dirout,test[t]),exist_ok=True)
 
     # Copy options file to output folder
     dirin = os.path.join(os.getcwd(),'input',prjnm,f'{prjnm}.vfm')
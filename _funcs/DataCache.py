@@ -0,0 +1,108 @@
+import os
+import glob
+import numpy as np
+
+def cache_key(filesdir):
+    """
+    Generate the cache key of the test data files.
+
+    Parameters
+    ----------
+    filesdir : str
+        Test data files directory and prefix.
+
+    Returns
+    -------
+    key : str
+        Cache key built from the paths, sizes and modification times of the
+          test data files.
+    """
+
+    # Get test data files
+    files = sorted(glob.glob(f'{filesdir}_*.csv'))
+
+    # Build key from path, size and modification time of each file
+    key = []
+    for file in files:
+        fstat = os.stat(file)
+        key.append(f'{os.path.abspath(file)};{fstat.st_size};{fstat.st_mtime_ns}')
+
+    return '\n'.join(key)
+
+def load_cache(filesdir,key,engine):
+    """
+    Load test data from binary cache files.
+
+    Parameters
+    ----------
+    filesdir : str
+        Test data files directory and prefix.
+    key : str
+        Cache key of the current test data files.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    data : {'coord','conn','displ','force','time','thk','ori','centr'} or None
+        Cached test data, or None if the cache is missing or stale.
+    """
+
+    # Set cache files
+    filename = f'{filesdir}_Cache.npz'
+    filenameu = f'{filesdir}_Cache_U.npy'
+
+    if not (os.path.isfile(filename) and os.path.isfile(filenameu)):
+        return None
+
+    # Load cache and check if it matches the current test data files
+    try:
+        with np.load(filename,allow_pickle=False) as cache:
+            if str(cache['key']) != key:
+                return None
+            data = {k: cache[k] for k in cache.files if k != 'key'}
+
+        # Load displacements in memory or memory-mapped
+        if engine['nblk'] is None:
+            data['displ'] = np.load(filenameu)
+        else:
+            data['displ'] = np.load(filenameu,mmap_mode='r')
+    except Exception:
+        return None
+
+    return data
+
+def save_cache(filesdir,key,data):
+    """
+    Save test data to binary cache files.
+
+    Parameters
+    ----------
+    filesdir : str
+        Test data files directory and prefix.
+    key : str
+        Cache key of the current test data files.
+    data : {'coord','conn',['displ'],'force','time','thk','ori','centr'}
+        Test data to be cached, without displacements if already written to
+          cache file of displacements.
+    """
+
+    # Set cache files
+    filename = f'{filesdir}_Cache.npz'
+    filenameu = f'{filesdir}_Cache_U.npy'
+
+    # Write to temporary files and replace cache to avoid partial writes
+    try:
+        if ('displ' in data) and (not isinstance(data['displ'],np.memmap)):
+            with open(f'{filenameu}.tmp','wb') as f:
+                np.save(f,data['displ'])
+            os.replace(f'{filenameu}.tmp',filenameu)
+
+        data = {k: data[k] for k in data if k != 'displ'}
+        with open(f'{filename}.tmp','wb') as f:
+            np.savez(f,key=np.array(key),**data)
+        os.replace(f'{filename}.tmp',filename)
+    except OSError:
+        pass
+
+    return
\ No newline at end of file
@@ -1,13 +1,192 @@
 import os
-import shutil
-import meshio
+import h5py
 import numpy as np
-from scipy.fftpack import ss_diff
 
 import _utils
 
+# Compression filter and level of fields
+export_compression = 'gzip'
+export_level = 4
+
+# Data type of fields of each precision
+export_precision = {'double': np.float64, 'single': np.float32}
+
+# Names of exported fields
+export_fields = ['le','s','peeq','pe','pk','vol','vf','ss','de33']
+
+def export_increments(output,nf,test):
+    """
+    Get increments exported to paraview.
+
+    Parameters
+    ----------
+    output : {'precision','fields','every','increments'} , dict
+        Export settings.
+    nf : int
+        Number of increments.
+    test : str
+        Name of test.
+
+    Returns
+    -------
+    incs : (nfo,) , int
+        Exported increments.
+
+    Notes
+    -----
+    With an interval of increments, the last increment is always exported.
+    """
+
+    kw = '*Output.'
+
+    if output['increments'] is not None:
+        incs = np.unique(output['increments'])
+        if (incs[0] < 0) or (incs[-1] >= nf):
+            _utils.error(f'{kw} Increments of test {test} are between 0 and '
+                         f'{nf-1}.')
+    else:
+        incs = np.unique(np.append(np.arange(0,nf,output['every']),nf-1))
+
+    return incs
+
+def paraview_voigt(tensor,ne,dof):
+    """
+    Rearrange voigt components of tensor to paraview order.
+
+    Parameters
+    ----------
+    tensor : (ne,ntens) , float
+        Tensor in voigt form.
+    ne : int
+        Number of elements.
+    dof : int
+        Number of degrees of freedom.
+
+    Returns
+    -------
+    tensor3d : (ne,6) , float
+        Tensor in voigt form of paraview.
+    """
+
+    if dof == 2:
+        tensor3d = np.zeros((ne,6))
+        tensor3d[:,[0,1,3]] = tensor
+    elif dof == 3:
+        tensor3d = tensor[:,[0,1,2,3,5,4]]
+
+    return tensor3d
+
+def attribute_type(shape):
+    """
+    Get xdmf attribute type of field.
+
+    Parameters
+    ----------
+    shape : tuple , int
+        Shape of field of one increment.
+
+    Returns
+    -------
+    atype : str
+        Attribute type of field.
+    """
+
+    if len(shape) == 1:
+        atype = 'Scalar'
+    elif (len(shape) == 2) and (shape[1] in [2,3]):
+        atype = 'Vector'
+    elif (len(shape) == 2) and (shape[1] == 6):
+        atype = 'Tensor6'
+    elif ((len(shape) == 2) and (shape[1] == 9)) or (shape[1:] == (3,3)):
+        atype = 'Tensor'
+    else:
+        atype = 'Matrix'
+
+    return atype
+
+def data_item(dset,h5name,f=None):
+    """
+    Get xdmf data item of field stored in hdf5 file.
+
+    Parameters
+    ----------
+    dset : h5py.Dataset
+        Dataset of field.
+    h5name : str
+        Name of hdf5 file relative to xdmf file.
+    f : int, optional
+        Increment of time-varying field, selected by a hyperslab.
+
+    Returns
+    -------
+    item : str
+        Xdmf data item of field.
+    """
+
+    if np.issubdtype(dset.dtype,np.integer):
+        dtype = 'Int'
+    else:
+        dtype = 'Float'
+
+    dims = ' '.join(str(n) for n in dset.shape)
+    item = (f'<DataItem DataType="{dtype}" Dimensions="{dims}" Format="HDF" '
+            f'Precision="{dset.dtype.itemsize}">{h5name}:{dset.name}</DataItem>')
+
+    # Select increment of time-varying field
+    if f is not None:
+        rank = len(dset.shape)
+        start = ' '.join([str(f)] + ['0']*(rank-1))
+        stride = ' '.join(['1']*rank)
+        count = ' '.join(str(n) for n in (1,) + dset.shape[1:])
+        dims = ' '.join(str(n) for n in dset.shape[1:])
+        item = (f'<DataItem ItemType="HyperSlab" Dimensions="{dims}" '
+                f'Type="HyperSlab"><DataItem Dimensions="3 {rank}" '
+                f'Format="XML">{start} {stride} {count}</DataItem>'
+                f'{item}</DataItem>')
+
+    return item
+
+def create_field(h5,name,shape,nf,dtype):
+    """
+    Create compressed dataset of field.
+
+    Parameters
+    ----------
+    h5 : h5py.File
+        Output hdf5 file.
+    name : str
+        Path of dataset in hdf5 file.
+    shape : tuple , int
+        Shape of field of one increment.
+    nf : int or None
+        Number of increments, or None for time-invariant field.
+    dtype : type
+        Data type of field.
+
+    Returns
+    -------
+    dset : h5py.Dataset
+        Dataset of field, chunked along increments if time-varying.
+    """
+
+    if nf is None:
+        dset = h5.create_dataset(name,shape,dtype=dtype,
+                                 compression=export_compression,
+                                 compression_opts=export_level,shuffle=True)
+    else:
+        dset = h5.create_dataset(name,(nf,)+shape,dtype=dtype,
+                                 chunks=(1,)+shape,
+                                 compression=export_compression,
+                                 compression_opts=export_level,shuffle=True)
+
+    # Flag time-varying field
+    dset.attrs['varying'] = nf is not None
+
+    return dset
+
 def export_paraview(coord,displ,conn,strain,vol,stress,peeq,pstrain,de33,
-                    pkstress,vfs,ss,iss,ne,dof,nvfs,nf,test,nt,fout,dirout,vfsu):
+                    pkstress,vfs,ss,iss,ne,dof,nvfs,nf,test,nt,fout,dirout,vfsu,
+                    incs,output):
     """
     Export experimental finite element mesh to paraview file.
 
@@ -19,23 +198,25 @@ def export_paraview(coord,displ,conn,strain,vol,stress,peeq,pstrain,de33,
         Nodes displacements.
     conn : (ne,npe) , int
         Elements connectivity.
-    strain : (nf,ne,ntens) , float
+    strain : (nfo,ne,ntens) or None , float
         Strain in global csys.
-    stress : (nf,ne,ntens) , float
+    vol : (ne) , float
+        Elements volume.
+    stress : (nfo,ne,ntens) or None , float
         Cauchy stress in global csys.
-    peeq : (nf,ne) , float
+    peeq : (nfo,ne) or None , float
         Equivalent plastic strain.
-    pstrain : (nf,ne,ntens) , float
+    pstrain : (nfo,ne,ntens) or None , float
         Plastic strain in global csys.
-    de33 : (nf,ne) , float
+    de33 : (nfo,ne) or None , float
         Strain in thickness direction.
-    pkstress : (nf,ne,dof,dof) , float
+    pkstress : (nfo,ne,dof,dof) or None , float
         1st piola-kirchhoff stress.
-    vfs : {(nvfs,nf,ne,dof,dof), (nvfs,nf,nn,dof)} , float
+    vfs : {(nvfs,1|nf,ne,dof*dof), (nvfs,nn,dof)} , float
         Settings and generated virtual fields.
-    ss : (nvfs,nf,ne,dof,dof) or None , float
+    ss : (nvfs,nfo,ne,dof,dof) or None , float
         Total stress sensitivity.
-    iss : (nvfs,nf,ne,dof,dof) or None , float
+    iss : (nvfs,nfo,ne,dof,dof) or None , float
         Incremental stress sensitivity.
     ne : int
         Number of elements.
@@ -53,45 +234,29 @@ def export_paraview(coord,displ,conn,strain,vol,stress,peeq,pstrain,de33,
         Name of output folder.
     dirout : str
         Directory of project to export output files.
-    """
-
-    # Rearrange voigt components
-    if dof == 2:
-        stress3d = np.zeros((nf,ne,6))
-        strain3d = np.zeros((nf,ne,6))
-        pstrain3d = np.zeros((nf,ne,6))
-
-        stress3d[...,[0,1,3]] = stress
-        strain3d[...,[0,1,3]] = strain
-        pstrain3d[...,[0,1,3]] = pstrain
-
-    elif dof == 3:
-        stress3d = stress[...,[0,1,2,3,5,4]]
-        strain3d = strain[...,[0,1,2,3,5,4]]
-        pstrain3d = pstrain[...,[0,1,2,3,5,4]]
-
-    # Rearrange tensor components for paraview export
-    pkstress = _utils.rearrange_tensor(pkstress,ne,dof,nf)[0,...]
-
-    if 'sb' in list(vfs.keys()):
-        ss = _utils.rearrange_tensor(ss,ne,dof,nf,nvfs)
-        iss = _utils.rearrange_tensor(iss,ne,dof,nf,nvfs)
-
-    # Repeat user-defined virtual fields over time increments
-    if 'ud' in list(vfs.keys()):
-        vfs['e'] = np.repeat(vfs['e'],nf,1)
+    vfsu : (nvfs,1|nf,nn,dof) or None , float
+        Virtual displacements.
+    incs : (nfo,) , int
+        Exported increments.
+    output : {'precision','fields','every','increments'} , dict
+        Export settings.
 
-        vfsu = np.repeat(vfsu,nf,1)
+    Notes
+    -----
+    The fields given as None are not exported, and the fields of shape nfo are
+      given at the exported increments only.
 
-    # Reshape virtual fields to tensor format
-    vfs['e'] = np.reshape(vfs['e'],(nvfs,nf,ne,dof,dof))
+    The mesh, the elements volume and the virtual fields given for a single
+      increment are written once and shared by all increments. The other fields
+      are written increment by increment into datasets chunked along the
+      increments, and selected by hyperslabs in the xdmf file.
+    """
 
-    # Nodes and elements connectivity
-    points = coord
+    # Paraview cell type and geometry type
     if dof == 2:
-        cells = [('quad',conn)]
+        topology,geometry = 'Quadrilateral','XY'
     elif dof == 3:
-        cells = [('hexahedron',conn)]
+        topology,geometry = 'Hexahedron','XYZ'
 
     # Set output folder
     if nt > 1:
@@ -99,50 +264,161 @@ def export_paraview(coord,displ,conn,strain,vol,stress,peeq,pstrain,de33,
     else:
         outF = os.path.join(dirout,fout)
 
+    h5name = f'{os.path.basename(outF)}.h5'
+    dtype = export_precision[output['precision']]
+    nfo = len(incs)
+
+    # Increments of virtual fields, single increment for user-defined fields
+    nfe = np.shape(vfs['e'])[1]
+    vf = 'vf' in output['fields']
+    vfu = vf and (vfsu is not None)
+    if vfu:
+        nfu = np.shape(vfsu)[1]
+
     # Output paraview file
-    with meshio.xdmf.TimeSeriesWriter(f'{outF}.xdmf') as w:
-
-        w.write_points_cells(points,cells)
-
-        for f in range(nf):
-            pdata = {
-                      'X': coord + displ[f,...],
-                      'U': displ[f,...],
-                    }
-            cdata = {
-                     'LE': [strain3d[f,...]],
-                      'S': [stress3d[f,...]],
-                   'PEEQ': [peeq[f,...]],
-                     'PE': [pstrain3d[f,...]],
-                     'PK': [pkstress[f,...]],
-                    'VOL': [vol],
-                    }
-
-            # Add virtual displacement fields
+    with h5py.File(f'{outF}.h5','w') as h5:
+
+        # Write mesh
+        mgeom = h5.create_dataset('mesh/geometry',data=coord)
+        mtopo = h5.create_dataset('mesh/topology',data=conn)
+
+        # Time-invariant and time-varying fields of nodes and elements
+        pfields,cfields = {},{}
+
+        pfields['X'] = create_field(h5,'point/X',coord.shape,nfo,dtype)
+        pfields['U'] = create_field(h5,'point/U',coord.shape,nfo,dtype)
+
+        if vfu:
             for i in range(nvfs):
-                pdata[f'VF{i+1}'] = vfsu[i,f,...]
+                pfields[f'VF{i+1}'] = create_field(h5,f'point/VF{i+1}',
+                                                   coord.shape,
+                                                   None if nfu == 1 else nfo,
+                                                   dtype)
 
-            # Add virtual strain fields
+        if strain is not None:
+            cfields['LE'] = create_field(h5,'cell/LE',(ne,6),nfo,dtype)
+        if stress is not None:
+            cfields['S'] = create_field(h5,'cell/S',(ne,6),nfo,dtype)
+        if peeq is not None:
+            cfields['PEEQ'] = create_field(h5,'cell/PEEQ',(ne,),nfo,dtype)
+        if pstrain is not None:
+            cfields['PE'] = create_field(h5,'cell/PE',(ne,6),nfo,dtype)
+        if pkstress is not None:
+            cfields['PK'] = create_field(h5,'cell/PK',(ne,dof,dof),nfo,dtype)
+        if 'vol' in output['fields']:
+            cfields['VOL'] = create_field(h5,'cell/VOL',(ne,),None,dtype)
+
+        if vf:
+            for i in range(nvfs):
+                cfields[f'VF{i+1}'] = create_field(h5,f'cell/VF{i+1}',
+                                                   (ne,dof,dof),
+                                                   None if nfe == 1 else nfo,
+                                                   dtype)
+
+        if ss is not None:
             for i in range(nvfs):
-                cdata[f'VF{i+1}'] = [vfs['e'][i,f,...]]
+                cfields[f'SS{i+1}'] = create_field(h5,f'cell/SS{i+1}',
+                                                   (ne,dof,dof),nfo,dtype)
+                cfields[f'ISS{i+1}'] = create_field(h5,f'cell/ISS{i+1}',
+                                                    (ne,dof,dof),nfo,dtype)
+
+        if de33 is not None:
+            cfields['de33'] = create_field(h5,'cell/de33',(ne,),nfo,dtype)
+
+        # Write time-invariant fields once
+        if 'VOL' in cfields:
+            cfields['VOL'][...] = vol
+
+        if vf:
+            for i in range(nvfs):
+                if vfu and (nfu == 1):
+                    pfields[f'VF{i+1}'][...] = vfsu[i,0]
+                if nfe == 1:
+                    cfields[f'VF{i+1}'][...] = np.reshape(vfs['e'][i,0],
+                                                          (ne,dof,dof))
+
+        # Write time-varying fields increment by increment
+        for k,f in enumerate(incs):
+
+            pfields['X'][k] = coord + displ[f,...]
+            pfields['U'][k] = displ[f,...]
+
+            # Rearrange voigt components of increment
+            if strain is not None:
+                cfields['LE'][k] = paraview_voigt(strain[k],ne,dof)
+            if stress is not None:
+                cfields['S'][k] = paraview_voigt(stress[k],ne,dof)
+            if peeq is not None:
+                cfields['PEEQ'][k] = peeq[k,...]
+            if pstrain is not None:
+                cfields['PE'][k] = paraview_voigt(pstrain[k],ne,dof)
+
+            # Rearrange tensor components of increment
+            if pkstress is not None:
+                cfields['PK'][k] = _utils.rearrange_tensor(pkstress[k],ne,dof,
+                                                           1)[0,0]
+
+            # Add time-varying virtual fields
+            if vf:
+                for i in range(nvfs):
+                    if vfu and (nfu != 1):
+                        pfields[f'VF{i+1}'][k] = vfsu[i,f]
+                    if nfe != 1:
+                        cfields[f'VF{i+1}'][k] = np.reshape(vfs['e'][i,f],
+                                                            (ne,dof,dof))
 
             # Add stress sensitivities
-            if 'sb' in list(vfs.keys()):
+            if ss is not None:
+                ssk = _utils.rearrange_tensor(ss[:,k],ne,dof,1,nvfs)
+                issk = _utils.rearrange_tensor(iss[:,k],ne,dof,1,nvfs)
                 for i in range(nvfs):
-                    cdata[f'SS{i+1}'] = [ss[i,f,...]]
-                    cdata[f'ISS{i+1}'] = [iss[i,f,...]]
+                    cfields[f'SS{i+1}'][k] = ssk[i,0]
+                    cfields[f'ISS{i+1}'][k] = issk[i,0]
 
             # Add thickness strain
-            if dof == 2:
-                cdata['de33'] = [de33[f,...]]
+            if de33 is not None:
+                cfields['de33'][k] = de33[k,...]
 
-            # Write data
-            w.write_data(f,point_data=pdata,cell_data=cdata)
+        # Mesh shared by all increments
+        lines = ['<?xml version="1.0"?>',
+                 '<Xdmf xmlns:xi="http://www.w3.org/2001/XInclude" '
+                 'Version="3.0">',
+                 '<Domain>',
+                 '<Grid Name="TimeSeries" GridType="Collection" '
+                 'CollectionType="Temporal">']
 
-    # Move .h5 file from cwd to output folder
-    if nt > 1:
-        shutil.move(f'{test}.h5',f'{outF}.h5')
-    else:
-        shutil.move(f'{fout}.h5',f'{outF}.h5')
+        mesh = ('<xi:include xpointer="xpointer(//Grid[@Name=&quot;mesh&quot;]'
+                '/*[self::Topology or self::Geometry])" />')
+
+        # Reference fields of each exported increment
+        for k,f in enumerate(incs):
+            lines += ['<Grid>',mesh,f'<Time Value="{f}" />']
+            for center,fields in [('Node',pfields),('Cell',cfields)]:
+                for name,dset in fields.items():
+                    if dset.attrs['varying']:
+                        shape = dset.shape[1:]
+                        item = data_item(dset,h5name,k)
+                    else:
+                        shape = dset.shape
+                        item = data_item(dset,h5name)
+                    lines += [f'<Attribute Name="{name}" AttributeType='
+                              f'"{attribute_type(shape)}" Center="{center}">'
+                              f'{item}</Attribute>']
+            lines += ['</Grid>']
+
+        lines += ['</Grid>',
+                  '<Grid Name="mesh" GridType="Uniform">',
+                  f'<Geometry GeometryType="{geometry}">'
+                  f'{data_item(mgeom,h5name)}</Geometry>',
+                  f'<Topology TopologyType="{topology}" '
+                  f'NumberOfElements="{ne}">{data_item(mtopo,h5name)}'
+                  '</Topology>',
+                  '</Grid>',
+                  '</Domain>',
+                  '</Xdmf>']
+
+    # Output xdmf file
+    with open(f'{outF}.xdmf','w') as x:
+        x.write('\n'.join(lines) + '\n')
 
     return
\ No newline at end of file
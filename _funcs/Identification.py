@@ -1,18 +1,105 @@
 import warnings
 import numpy as np
 from functools import partial
-from scipy.optimize import minimize
+from scipy.optimize import (minimize,least_squares,differential_evolution,
+                            OptimizeResult)
 
 import _funcs
+import _utils
 
 warnings.filterwarnings('ignore')
 
-def fcn_callback(x,strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,vfs,nn,ne,dof,
-                 ndi,nshr,ntens,ncomp,nstatev,nvfs,nf,nt,nprops,props,vars,
-                 nvars,constr,nlgeom,test,fout,dirout):
+# Available optimization methods
+optimization_methods = ['nelder-mead','trf','dogbox','lm',
+                        'differential-evolution']
+
+# Optimization methods of least-squares residuals
+least_squares_methods = ['trf','dogbox','lm']
 
-    # Declare global variables
-    global it,fevit,bestphi,ivw,evw
+def identification_context(chkpt):
+    """
+    Initialize the context of an identification, shared by the cost function,
+      jacobian and callback of the identification algorithm.
+
+    Parameters
+    ----------
+    chkpt : {'every','resume','file'} , dict
+        Checkpoint settings.
+
+    Returns
+    -------
+    ctx : {'it','fev','fevit','njev','bestphi','ivw','evw','chkpt','seed','history','offset','replay','elog','writer','refresh','x','monitor','stop'} , dict
+        Iteration number, number of total and iteration function evaluations,
+          number of jacobian evaluations, best cost function, virtual work
+          of last or best evaluation, checkpoint settings, random seed of
+          identification algorithm, history of evaluations since last
+          checkpoint, size of history file of last checkpoint, evaluations
+          of checkpoint to replay, event log of progress, background
+          writer of outputs, refresh state of sensitivity-based virtual
+          fields, identification variables of last iteration, monitor of
+          iterations and flag of identification stopped by monitor.
+    """
+
+    ctx = {'it': 0,
+           'fev': 0,
+           'fevit': 0,
+           'njev': 0,
+           'bestphi': None,
+           'ivw': None,
+           'evw': None,
+           'chkpt': chkpt,
+           'seed': None,
+           'history': [],
+           'offset': 0,
+           'replay': [],
+           'elog': None,
+           'writer': None,
+           'refresh': None,
+           'x': None,
+           'monitor': None,
+           'stop': False}
+
+    # Reload history of evaluations of checkpoint to replay
+    if chkpt['resume']:
+        chk = _funcs.load_checkpoint(chkpt['file'])
+        if chk is not None:
+            ctx['seed'] = chk['seed']
+            ctx['replay'] = _funcs.load_history(chkpt['file'],
+                                                chk['offset'])[::-1]
+
+    # Random seed of identification algorithm
+    if ctx['seed'] is None:
+        ctx['seed'] = int(np.random.SeedSequence().generate_state(1)[0])
+
+    return ctx
+
+def history_simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,
+                       ntens,nstatev,nvfs,nf,nt,nprops,props,nlgeom,fout,
+                       engine,ctx):
+
+    # Replay finished evaluation of checkpoint with same material properties
+    if ctx['replay']:
+        entry = ctx['replay'].pop()
+        if ('props' in entry) and np.array_equal(entry['props'],props):
+            ctx['offset'] = entry['end']
+            return entry['out']
+
+        # Discard remaining evaluations if identification diverges from history
+        ctx['replay'] = []
+
+    # Perform vfm simulation with material properties
+    out = _funcs.simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,
+                            nshr,ntens,nstatev,nvfs,nf,nt,nprops,props,nlgeom,
+                            fout,engine)
+
+    # Save evaluation to history
+    ctx['history'].append({'props': np.copy(props), 'out': out})
+
+    return out
+
+def fcn_callback(x,strain,rot,dfgrd,rotm,time,bg,mbglsq,bcdofs,vfs,nn,ne,dof,
+                 ndi,nshr,ntens,ncomp,nstatev,nvfs,nf,nt,nprops,props,vars,
+                 nvars,constr,nlgeom,test,fout,dirout,engine,ctx):
 
     # Copy material properties
     fcnprops = np.copy(props)
@@ -26,55 +113,117 @@ def fcn_callback(x,strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,vfs,nn,ne,dof,
     # Update sensivity-based virtual fields
     for t in range(nt):
         if 'sb' in list(vfs[t].keys()):
-            vfs[t] = _funcs.sensivity_based_virtual_fields(strain[t],rot[t],
-                                                           dfgrd[t],rotm[t],
-                                                           time[t],bg[t],
-                                                           mbginv[t],bcdofs[t],
-                                                           vfs[t],nn[t],ne[t],
-                                                           dof[t],ndi[t],
-                                                           nshr[t],ntens[t],
-                                                           ncomp[t],nstatev[t],
-                                                           nvfs[t],nf[t],
-                                                           nprops,fcnprops,
-                                                           vars,nlgeom,fout)
-
-    # Write virtual work of current solution
-    for t in range(nt):
-        _funcs.write_virtual_work(ivw[t],evw[t],test[t],nvfs[t],nf[t],nt,
+
+            # Check refresh policy of sensitivity-based virtual fields
+            refresh,change = _funcs.refresh_virtual_fields(fcnprops[vars],
+                                                           ctx['it'],vfs[t],
+                                                           ctx['refresh'][t])
+
+            if refresh:
+
+                # Replay virtual fields regenerated before checkpoint
+                entry = ctx['replay'].pop() if ctx['replay'] else None
+                if (entry is not None) and (entry.get('t') == t):
+                    ctx['offset'] = entry['end']
+                    vfs[t].update(entry['vfs'])
+
+                # Regenerate virtual fields, discarding remaining evaluations
+                #   if identification diverges from history
+                else:
+                    ctx['replay'] = []
+                    vfs[t] = _funcs.sensivity_based_virtual_fields(strain[t],
+                                                                   rot[t],
+                                                                   dfgrd[t],
+                                                                   rotm[t],
+                                                                   time[t],
+                                                                   bg[t],
+                                                                   mbglsq[t],
+                                                                   bcdofs[t],
+                                                                   vfs[t],
+                                                                   nn[t],ne[t],
+                                                                   dof[t],
+                                                                   ndi[t],
+                                                                   nshr[t],
+                                                                   ntens[t],
+                                                                   ncomp[t],
+                                                                   nstatev[t],
+                                                                   nvfs[t],
+                                                                   nf[t],t,
+                                                                   nprops,
+                                                                   fcnprops,
+                                                                   vars,nlgeom,
+                                                                   fout,dirout,
+                                                                   engine)
+
+                    # Save regenerated virtual fields to history
+                    ctx['history'].append({'t': t,
+                                           'vfs': {key: vfs[t][key] for key
+                                                   in ['e','u','x','time']}})
+
+            # Queue refresh event of sensitivity-based virtual fields
+            _funcs.submit_refresh(ctx['writer'],ctx['it'],t,refresh,change,
+                                  vfs[t]['time'],ctx['refresh'][t]['saved'],
                                   fout,dirout)
 
-    # Print variables and total cost function progress to screen and log file
-    _funcs.print_progress(it,fevit,x,bestphi,nvars,nt,fout,dirout,'it')
+    # Queue virtual work of current solution
+    for t in range(nt):
+        _funcs.submit_virtual_work(ctx['writer'],ctx['ivw'][t],ctx['evw'][t],
+                                   test[t],nvfs[t],nf[t],nt,fout,dirout)
+
+    # Log variables and total cost function progress
+    _funcs.print_progress(ctx['it'],ctx['fevit'],x,ctx['bestphi'],nvars,nt,
+                          ctx['elog'],'it')
 
-    # Write variables and cost function progress to file
-    _funcs.write_progress(it,fevit,x,bestphi,nvars,nt,fout,dirout)
+    # Queue variables and cost function progress to file
+    _funcs.submit_progress(ctx['writer'],ctx['it'],ctx['fevit'],x,
+                           ctx['bestphi'],nvars,nt,fout,dirout)
 
     # Update iteration number
-    it += 1
+    ctx['it'] += 1
 
     # Reset function evaluations per iteration counter
-    fevit = 0
+    ctx['fevit'] = 0
+
+    # Write checkpoint at interval of iterations, except when replaying it
+    chkpt = ctx['chkpt']
+    if (chkpt['every'] > 0) and (ctx['it'] % chkpt['every'] == 0) and \
+       (not ctx['replay']):
+
+        # Append evaluations since last checkpoint to history file
+        ctx['offset'] = _funcs.append_history(chkpt['file'],ctx['history'],
+                                              ctx['offset'])
+        ctx['history'] = []
+
+        _funcs.write_checkpoint(chkpt['file'],{'it': ctx['it'],
+                                               'fev': ctx['fev'],
+                                               'x': x,
+                                               'bestphi': ctx['bestphi'],
+                                               'seed': ctx['seed'],
+                                               'offset': ctx['offset']})
+
+    # Identification variables of last iteration
+    ctx['x'] = np.copy(x)
+
+    # Stop identification when requested by monitor of iterations
+    if (ctx['monitor'] is not None) and ctx['monitor'](ctx['it']-1,
+                                                       ctx['bestphi']):
+        ctx['stop'] = True
+        raise StopIteration
 
     return
 
-def fcn(x,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,nstatev,
-        nvfs,nf,nt,nprops,props,vars,nvars,constr,nlgeom,fout,dirout):
-
-    # Declare global variables
-    global fev,fevit,it,fevphi,bestphi,ivw,evw
-
-    # Print iteration header to log file
-    if fevit == 0 or ((fevit == 1) and (it == 1)):
-        _funcs.print_iteration(it,fout,dirout)
+def fcn_residuals(x,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
+                  nstatev,nvfs,nf,nt,nprops,props,vars,nvars,constr,nlgeom,
+                  fout,dirout,engine,ctx):
 
     # Copy material properties
     fcnprops = np.copy(props)
 
     # Update number of total evaluations
-    fev += 1
+    ctx['fev'] += 1
 
     # Update current number of evaluations in iteration
-    fevit += 1
+    ctx['fevit'] += 1
 
     # Update material properties with current solution
     fcnprops[vars] = x
@@ -82,42 +231,391 @@ def fcn(x,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,nstatev,
     # Apply user-defined properties constraints
     fcnprops = _funcs.properties_constraints(fcnprops,constr)
 
-    # Check validity of current solution
-    valid = ~np.isnan(props[vars]).any()
+    # Check validity of current solution and its constrained properties
+    valid = not (np.isnan(x).any() or np.isnan(fcnprops[vars]).any())
 
     # Perform vfm simulation with current solution
     if valid:
-        ivw,evw,fevphi,success = _funcs.simulation(strain,rot,dfgrd,rotm,force,
-                                                   vol,vfs,ne,dof,ndi,nshr,
-                                                   ntens,nstatev,nvfs,nf,nt,
-                                                   nprops,fcnprops,nlgeom,fout)
+        ivw,evw,res,fevphi,success = history_simulation(strain,rot,dfgrd,
+                                                        rotm,force,vol,vfs,ne,
+                                                        dof,ndi,nshr,ntens,
+                                                        nstatev,nvfs,nf,nt,
+                                                        nprops,fcnprops,
+                                                        nlgeom,fout,engine,
+                                                        ctx)
 
     # If solution is not valid or stress reconstruction fails return nan
     if (not valid) or (not success):
         fevphi = np.nan
+        res = np.full(np.sum(np.multiply(nvfs,nf)),np.nan)
+    else:
+        res = np.concatenate(res)
+
+        # Keep virtual work of last successful evaluation
+        ctx['ivw'],ctx['evw'] = ivw,evw
 
     # Compute total cost function
     phi = np.sum(fevphi)
 
-    # Save best cost function
-    if (bestphi == None) or (phi < np.sum(bestphi)):
-        bestphi = fevphi
+    # Save best cost function and keep stress of best solution
+    if (ctx['bestphi'] is None) or (phi < np.sum(ctx['bestphi'])):
+        ctx['bestphi'] = fevphi
+        _funcs.keep_results(engine['store'],fcnprops,nt,engine)
 
-    # Print variables and cost function progress to screen and log file
-    _funcs.print_progress(it,fevit,x,fevphi,nvars,nt,fout,dirout,'fe')
+    # Log variables and cost function progress
+    _funcs.print_progress(ctx['it'],ctx['fevit'],x,fevphi,nvars,nt,ctx['elog'],
+                          'fe')
 
-    # Write variables and cost function progress to file
-    _funcs.write_progress(it,fevit,x,fevphi,nvars,nt,fout,dirout)
+    # Queue variables and cost function progress to file
+    _funcs.submit_progress(ctx['writer'],ctx['it'],ctx['fevit'],x,fevphi,
+                           nvars,nt,fout,dirout)
 
     # Update number of iteration after initial evaluation
-    if it == 0: it += 1
+    if ctx['it'] == 0: ctx['it'] += 1
+
+    return res
+
+def fcn(x,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,nstatev,
+        nvfs,nf,nt,nprops,props,vars,nvars,constr,nlgeom,fout,dirout,engine,
+        ctx):
+
+    # Compute residuals of current solution
+    res = fcn_residuals(x,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,
+                        ntens,nstatev,nvfs,nf,nt,nprops,props,vars,nvars,
+                        constr,nlgeom,fout,dirout,engine,ctx)
+
+    # Compute total cost function
+    phi = np.sum(res**2)
 
     return phi
 
-def identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbginv,bcdofs,vfs,
+def fcn_population(func,population,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,
+                   ndi,nshr,ntens,nstatev,nvfs,nf,nt,nprops,props,vars,nvars,
+                   constr,nlgeom,fout,dirout,engine,ctx):
+
+    # Population of identification variables
+    population = np.array(list(population))
+    npop = len(population)
+
+    # Batch of material properties of population
+    fcnprops = np.tile(props,(npop,1))
+    fcnprops[:,vars] = population
+
+    # Apply user-defined properties constraints
+    for b in range(npop):
+        fcnprops[b] = _funcs.properties_constraints(fcnprops[b],constr)
+
+    # Perform vfm simulation with batch of material properties
+    pivw,pevw,_,pphi,success = history_simulation(strain,rot,dfgrd,rotm,force,
+                                                  vol,vfs,ne,dof,ndi,nshr,
+                                                  ntens,nstatev,nvfs,nf,nt,
+                                                  nprops,fcnprops,nlgeom,fout,
+                                                  engine,ctx)
+
+    # Log each candidate as a function evaluation
+    phi = np.zeros(npop)
+    for b in range(npop):
+
+        # Update number of total and iteration evaluations
+        ctx['fev'] += 1
+        ctx['fevit'] += 1
+
+        # Cost function of candidate, nan if stress reconstruction fails
+        if success[b]:
+            fevphi = np.array([pphi[t][b] for t in range(nt)])
+        else:
+            fevphi = np.nan
+
+        phi[b] = np.sum(fevphi)
+
+        # Save best cost function, virtual work and stress of best candidate
+        if (ctx['bestphi'] is None) or (phi[b] < np.sum(ctx['bestphi'])):
+            ctx['bestphi'] = fevphi
+            ctx['ivw'] = [pivw[t][b] for t in range(nt)]
+            ctx['evw'] = pevw
+            _funcs.keep_results(engine['store'],fcnprops[b],nt,engine)
+
+        # Log variables and cost function progress
+        _funcs.print_progress(ctx['it'],ctx['fevit'],population[b],fevphi,
+                              nvars,nt,ctx['elog'],'fe')
+
+        # Queue variables and cost function progress to file
+        _funcs.submit_progress(ctx['writer'],ctx['it'],ctx['fevit'],
+                               population[b],fevphi,nvars,nt,fout,dirout)
+
+        # Update number of iteration after initial evaluation
+        if ctx['it'] == 0: ctx['it'] += 1
+
+    # Failed candidates are never selected
+    phi[np.isnan(phi)] = np.inf
+
+    return phi
+
+def population_callback(xk,convergence,fcncb):
+
+    # Finish generation of population
+    fcncb(xk)
+
+    return
+
+def fcn_jacobian(x,strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
+                 nstatev,nvfs,nf,nt,nprops,props,vars,nvars,constr,nlgeom,fout,
+                 dirout,engine,ctx,fcncb):
+
+    # Finish iteration of previous jacobian evaluation
+    if ctx['njev'] > 0:
+        fcncb(x)
+
+    ctx['njev'] += 1
+
+    # Complex-step or forward finite differences depending on engine
+    cstep = engine['type'] in _funcs.complex_backends
+
+    # Batch of perturbed material properties, and current for differences
+    h = np.where(x != 0,np.abs(x),1)
+    if cstep:
+        h = 1e-20 * h
+        dprops = np.tile(props.astype(complex),(nvars,1))
+        dprops[:,vars] = x
+        dprops[np.arange(nvars),np.flatnonzero(vars)] += 1j*h
+    else:
+        h = 1e-6 * h
+        dprops = np.tile(props,(nvars+1,1))
+        dprops[:,vars] = x
+        dprops[np.arange(1,nvars+1),np.flatnonzero(vars)] += h
+
+    # Apply user-defined properties constraints
+    for b in range(len(dprops)):
+        dprops[b] = _funcs.properties_constraints(dprops[b],constr)
+
+    # Perform vfm simulation with batch of material properties
+    divw,_,_,_,success = history_simulation(strain,rot,dfgrd,rotm,force,vol,
+                                            vfs,ne,dof,ndi,nshr,ntens,nstatev,
+                                            nvfs,nf,nt,nprops,dprops,nlgeom,
+                                            fout,engine,ctx)
+
+    # If stress reconstruction fails return nan
+    if not np.all(success):
+        return np.full((np.sum(np.multiply(nvfs,nf)),nvars),np.nan)
+
+    dres = [None]*nt
+    for t in range(nt):
+
+        # Internal virtual work of current solution
+        ivw = np.real(divw[t][0])
+
+        # Scaling parameter of current solution for all perturbations
+        if 'sb' in list(vfs[t].keys()):
+            alpha = _funcs.scaling_virtual_fields(ivw,vfs[t]['sb']['scale'],
+                                                  nf[t])
+        else:
+            alpha = np.ones((nvfs[t],1))
+
+        # Derivatives of internal virtual work by complex step or finite
+        #   differences
+        if cstep:
+            divwt = np.imag(divw[t]) / h[:,None,None]
+        else:
+            divwt = (divw[t][1:] - ivw) / h[:,None,None]
+
+        # Derivatives of residuals of increments and virtual fields
+        dres[t] = np.swapaxes(alpha * divwt,-1,-2)
+        dres[t] = np.reshape(dres[t],(nvars,nvfs[t]*nf[t]))
+
+    # Compute jacobian of residuals
+    jac = np.concatenate(dres,-1).T
+
+    return jac
+
+def local_identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbglsq,
+                         bcdofs,vfs,nn,ne,dof,ndi,nshr,ntens,ncomp,nstatev,
+                         nvfs,nf,nt,nprops,nvars,props,vars,bounds,constr,
+                         nlgeom,test,fout,dirout,tol,maxiter,method,chkpt,
+                         engine,monitor=None):
+    """
+    Run the optimization algorithm of the identification from the current
+      material properties.
+
+    Parameters
+    ----------
+    monitor : callable or None
+        Monitor of iterations, called after each iteration with the number
+          of iterations and the best cost function, returning True to stop
+          the identification.
+
+    See Also
+    --------
+    identification : other parameters of identification.
+
+    Returns
+    -------
+    result : OptimizeResult
+        Result of the optimization algorithm, with the number of iterations
+          in nit and the refresh state of sensitivity-based virtual fields
+          of each test in refresh.
+    bestphi : (nt,) , float
+        Best cost function.
+
+    Notes
+    -----
+    Least-squares methods minimize the residuals of all tests with the
+      jacobian from one batched simulation of the perturbed identification
+      variables, by complex step for engines accepting complex material
+      properties or else by forward finite differences. In both cases the
+      scaling of sensitivity-based virtual fields is computed once at the
+      current solution and applied to all perturbed identification
+      variables, so that the jacobian does not include its derivative.
+
+    When resuming from a checkpoint, the identification algorithm is run
+      again from the start with the evaluations and the regenerated
+      sensitivity-based virtual fields of the checkpoint replayed from its
+      history instead of computed, which restores its state and output files
+      up to the checkpoint.
+
+    When the monitor stops the identification, the result holds the
+      identification variables of the last iteration.
+    """
+
+    # Initialize context of identification
+    ctx = identification_context(chkpt)
+
+    # Set monitor of iterations
+    ctx['monitor'] = monitor
+
+    # Open event log of identification progress
+    ctx['elog'] = _funcs.open_event_log(nvars,nt,fout,dirout)
+
+    # Start background writer of progress and virtual work
+    ctx['writer'] = _funcs.start_writer()
+
+    # Initialize refresh state of sensitivity-based virtual fields
+    ctx['refresh'] = _funcs.refresh_state(vfs,nt)
+
+    # Set arguments for identification function
+    args = (strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,nstatev,
+            nvfs,nf,nt,nprops,props,vars,nvars,constr,nlgeom,fout,dirout,
+            engine,ctx)
+
+    # Generate wrapper for callback function
+    fcncb = partial(fcn_callback,strain=strain,rot=rot,dfgrd=dfgrd,rotm=rotm,
+                                 time=time,bg=bg,mbglsq=mbglsq,bcdofs=bcdofs,
+                                 vfs=vfs,nn=nn,ne=ne,dof=dof,ndi=ndi,nshr=nshr,
+                                 ntens=ntens,ncomp=ncomp,nstatev=nstatev,
+                                 nvfs=nvfs,nf=nf,nt=nt,nprops=nprops,
+                                 props=props,vars=vars,nvars=nvars,
+                                 constr=constr,nlgeom=nlgeom,test=test,
+                                 fout=fout,dirout=dirout,engine=engine,
+                                 ctx=ctx)
+
+    # Run identification algorithm until stopped by monitor of iterations
+    try:
+
+        # Start least-squares identification algorithm
+        if method in least_squares_methods:
+
+            # Unbounded identification variables
+            lsbounds = np.where(np.isnan(bounds[vars]),[-np.inf,np.inf],
+                                bounds[vars])
+            if method == 'lm':
+                lsbounds = np.array([[-np.inf,np.inf]]*nvars)
+
+            result = least_squares(fcn_residuals,
+                                   x0 = props[vars],
+                                   jac = partial(fcn_jacobian,fcncb=fcncb),
+                                   bounds = (lsbounds[:,0],lsbounds[:,1]),
+                                   method = method,
+                                   ftol = tol,
+                                   xtol = tol,
+                                   gtol = tol,
+                                   x_scale = 'jac',
+                                   max_nfev = int(maxiter),
+                                   args = args,
+                                   )
+
+            nit = result.njev
+
+        # Start population-based identification algorithm
+        elif method == 'differential-evolution':
+
+            if not np.isfinite(bounds[vars]).all():
+                _utils.error('*Boundaries. Differential evolution requires boundaries of all identification variables.')
+
+            # Evaluate whole population of each generation in one batch
+            fcnpop = partial(fcn_population,strain=strain,rot=rot,
+                                            dfgrd=dfgrd,rotm=rotm,force=force,
+                                            vol=vol,vfs=vfs,ne=ne,dof=dof,
+                                            ndi=ndi,nshr=nshr,ntens=ntens,
+                                            nstatev=nstatev,nvfs=nvfs,nf=nf,
+                                            nt=nt,nprops=nprops,props=props,
+                                            vars=vars,nvars=nvars,
+                                            constr=constr,nlgeom=nlgeom,
+                                            fout=fout,dirout=dirout,
+                                            engine=engine,ctx=ctx)
+
+            # Finish generation of population in callback function
+            popcb = partial(population_callback,fcncb=fcncb)
+
+            result = differential_evolution(fcn,
+                                            bounds = bounds[vars],
+                                            args = args,
+                                            x0 = props[vars],
+                                            tol = tol,
+                                            maxiter = int(maxiter),
+                                            polish = False,
+                                            updating = 'deferred',
+                                            seed = ctx['seed'],
+                                            workers = fcnpop,
+                                            callback = popcb,
+                                            )
+
+            nit = result.nit
+
+        # Start identification algorithm
+        else:
+            result = minimize(fcn,
+                              args = args,
+                              x0 = props[vars],
+                              method = 'Nelder-Mead',
+                              bounds =  bounds[vars],
+                              tol = tol,
+                              options = {
+                                         'maxiter': maxiter,
+                                         'adaptive': True,
+                                        },
+                              callback = fcncb,
+                              )
+
+            nit = result.nit
+
+    # Identification stopped by monitor before algorithm handles it
+    except StopIteration:
+        result = OptimizeResult(nfev=ctx['fev'],njev=ctx['njev'],status=-1)
+
+    # Termination of identification stopped by monitor
+    if ctx['stop']:
+        nit = ctx['it'] - 1
+        result.x = ctx['x']
+        result.success = False
+        result.message = f'Stopped by monitor after {nit} iterations.'
+
+    # Number of iterations of identification algorithm
+    result.nit = nit
+
+    # Refresh state of sensitivity-based virtual fields
+    result.refresh = ctx['refresh']
+
+    # Write pending progress and virtual work
+    _funcs.stop_writer(ctx['writer'])
+
+    # Close event log and render identification progress to log file
+    _funcs.close_event_log(ctx['elog'],nvars,nt)
+
+    return result,ctx['bestphi']
+
+def identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbglsq,bcdofs,vfs,
                    nn,ne,dof,ndi,nshr,ntens,ncomp,nstatev,nvfs,nf,nt,nprops,
                    nvars,props,vars,bounds,constr,nlgeom,test,fout,dirout,tol,
-                   maxiter,st):
+                   maxiter,method,starts,chkpt,st,engine):
     """
     Perform identification of material properties.
 
@@ -137,10 +635,11 @@ def identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbginv,bcdofs,vfs,
         Time increments.
     vol : (nt,(ne,)) , float
         Elements volume.
-    bg : (nt, (ne*ncomp,nn*dof) ) , float
+    bg : (nt, (ne*ncomp,nn*dof) ) , sparse
         Global strain-displacement matrix.
-    mbginv : (nt, (ne*ncomp,nn*dof) ) , float
-        Pseudo-inverse of modified global strain-displacement matrix.
+    mbglsq : (nt, {'mbg','mbgt','lu'} ) , dict
+        Factorized least-squares solver of modified global strain-displacement
+          matrix.
     bcdofs : {'fixed','active','parent','child'} , int
         Boundary conditions degrees of freedom.
     vfs : (nt, {(nvfs,ne,dof*dof), (nvfs,nn,dof)} ) , float
@@ -187,49 +686,53 @@ def identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbginv,bcdofs,vfs,
         Name of output folder.
     dirout : str
         Directory of project to export output files.
+    tol : float
+        Tolerance criterion.
+    maxiter : int
+        Maximum number of iterations.
+    method : str
+        Optimization method.
+    starts : {'n','sampling','nproc','budget','margin'} or None , dict
+        Multi-start settings.
+    chkpt : {'every','resume'} , dict
+        Checkpoint settings.
     st : float
         Start time in seconds since epoch.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
     props : (nprops,) , float
         Final solution of material properties.
-    """
-
-    # Declare global variables
-    global fev,fevit,it,fevphi,bestphi
 
-    # Initialize global variables
-    fev,it,fevit = 0,0,0
-    fevphi,bestphi = None,None
-
-    # Set arguments for identification function
-    args = (strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,nstatev,
-            nvfs,nf,nt,nprops,props,vars,nvars,constr,nlgeom,fout,dirout)
+    See Also
+    --------
+    local_identification : optimization algorithm of identification.
+    multistart_identification : identification from several starting points.
+    """
 
-    # Generate wrapper for callback function
-    fcncb = partial(fcn_callback,strain=strain,rot=rot,dfgrd=dfgrd,rotm=rotm,
-                                 time=time,bg=bg,mbginv=mbginv,bcdofs=bcdofs,
-                                 vfs=vfs,nn=nn,ne=ne,dof=dof,ndi=ndi,nshr=nshr,
-                                 ntens=ntens,ncomp=ncomp,nstatev=nstatev,
-                                 nvfs=nvfs,nf=nf,nt=nt,nprops=nprops,
-                                 props=props,vars=vars,nvars=nvars,
-                                 constr=constr,nlgeom=nlgeom,test=test,
-                                 fout=fout,dirout=dirout)
-
-    # Start identification algorithm
-    result = minimize(fcn,
-                      args = args,
-                      x0 = props[vars],
-                      method = 'Nelder-Mead',
-                      bounds =  bounds[vars],
-                      tol = tol,
-                      options = {
-                                 'maxiter': maxiter,
-                                 'adaptive': True,
-                                },
-                      callback = fcncb,
-                      )
+    # Start identification from several starting points
+    if starts is not None:
+        return _funcs.multistart_identification(strain,rot,dfgrd,rotm,force,
+                                                time,vol,bg,mbglsq,bcdofs,vfs,
+                                                nn,ne,dof,ndi,nshr,ntens,ncomp,
+                                                nstatev,nvfs,nf,nt,nprops,
+                                                nvars,props,vars,bounds,constr,
+                                                nlgeom,test,fout,dirout,tol,
+                                                maxiter,method,starts,chkpt,
+                                                st,engine)
+
+    # Checkpoint file of identification
+    chkpt = dict(chkpt,file=_funcs.checkpoint_file(fout,dirout))
+
+    # Start identification algorithm from initial material properties
+    result,bestphi = local_identification(strain,rot,dfgrd,rotm,force,time,vol,
+                                          bg,mbglsq,bcdofs,vfs,nn,ne,dof,ndi,
+                                          nshr,ntens,ncomp,nstatev,nvfs,nf,nt,
+                                          nprops,nvars,props,vars,bounds,
+                                          constr,nlgeom,test,fout,dirout,tol,
+                                          maxiter,method,chkpt,engine)
 
     # Get identification results
     x = result.x
@@ -244,4 +747,7 @@ def identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbginv,bcdofs,vfs,
     _funcs.print_result_identification(nit,nfev,x,bestphi,tmsg,nvars,nt,
                                        fout,dirout,st)
 
+    # Print refresh events of sensitivity-based virtual fields to log
+    _funcs.print_result_refresh(result.refresh,nt,fout,dirout)
+
     return props
\ No newline at end of file
@@ -4,7 +4,7 @@ import _funcs
 import _utils
 
 def internal_virtual_work(strain,rot,dfgrd,rotm,vol,vfs,ne,dof,ndi,nshr,ntens,
-                          nstatev,nvfs,nf,nprops,props,nlgeom,fout):
+                          nstatev,nvfs,nf,t,nprops,props,nlgeom,fout,engine):
     """
     Compute the internal virtual work.
 
@@ -38,27 +38,31 @@ def internal_virtual_work(strain,rot,dfgrd,rotm,vol,vfs,ne,dof,ndi,nshr,ntens,
         Number of virtual fields.
     nf : int
         Number of increments.
+    t : int
+        Test number.
     nprops : int
         Number of material properties.
-    props : (nprops) , float
-        Material properties.
+    props : (nprops,) or (nbatch,nprops) , float
+        Material properties, or batch of material properties.
     nlgeom : bool
         Flag for small or large deformation framework (False/True).
     fout : str
         Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
-    ivw : (nvfs,nf) , float
+    ivw : ([nbatch],nvfs,nf) , float
         Internal virtual work.
-    success : bool
+    success : bool or (nbatch,) , bool
         Variable to monitor the sucess of stress reconstruction (False/True).
     """
 
     # Compute cauchy stress on global csys
     stress,_,de33,success = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,
-                                                 nshr,ntens,nstatev,nf,nprops,
-                                                 props,fout)
+                                                 nshr,ntens,nstatev,nf,t,
+                                                 nprops,props,fout,engine)
 
     # # Compute hydrostatic stress on global csys
     # hydstress = _funcs.hydrostatic_stress(stress)
@@ -66,31 +70,60 @@ def internal_virtual_work(strain,rot,dfgrd,rotm,vol,vfs,ne,dof,ndi,nshr,ntens,
     # # Compute deviatoric stress on global csys
     # devstress = _funcs.deviatoric_stress(stress,hydstress,dof)
 
-    # Large deformation formulation
-    if nlgeom:
+    # Add batch dimension of single material properties
+    batch = np.ndim(props) == 2
+    if not batch:
+        stress,de33 = stress[None],de33[None]
 
-        # Compute 1st piola-kirchhoff stress
-        pkstress = _funcs.piola_kirchhoff_stress(stress,de33,dfgrd,ne,dof,nf)
+    nbatch = stress.shape[0]
 
-        # Compute internal virtual work
-        ivw = pkstress[None] * vfs * vol[None,None,:,None]
+    # Initialize internal virtual work
+    ivw = np.zeros((nbatch,nvfs,nf),dtype=stress.dtype)
 
-        # Sum internal virtual work along ne and ncomp
-        ivw = np.nansum(ivw,(2,3))
+    # Loop over batch of material properties and blocks of increments
+    for b in range(nbatch):
+        for blk in _utils.increment_blocks(nf,engine):
 
-    # Small deformation formulation
-    else:
+            # Number of increments in block
+            nb = blk.stop - blk.start
 
-        # Transform cauchy stress tensor to voigt notation
-        stress = _utils.tensor_to_voigt(stress,ne,ndi,ntens,nf)
+            # Virtual fields of increments in block
+            if vfs.shape[1] > 1:
+                vfsb = vfs[:,blk]
+            else:
+                vfsb = vfs
 
-        # Transform virtual fields tensor to voigt notation
-        vfs = _utils.tensor_to_voigt(vfs,ne,ndi,ntens,nvfs)
+            # Large deformation formulation
+            if nlgeom:
 
-        # Compute internal virtual work
-        ivw = stress[:,None] * vfs[None] * vol[None,None,:,None]
+                # Compute 1st piola-kirchhoff stress
+                pkstress = _funcs.piola_kirchhoff_stress(stress[b,blk],
+                                                         de33[b,blk],
+                                                         dfgrd[blk],ne,dof,nb)
 
-        # Sum internal virtual work along ne and ntens
-        ivw = np.nansum(ivw,(2,3))
+                # Compute internal virtual work
+                ivwb = pkstress[None] * vfsb * vol[None,None,:,None]
+
+                # Sum internal virtual work along ne and ncomp
+                ivw[b,:,blk] = np.nansum(ivwb,(2,3))
+
+            # Small deformation formulation
+            else:
+
+                # Transform cauchy stress tensor to voigt notation
+                stressv = _utils.tensor_to_voigt(stress[b,blk],ne,ndi,ntens,nb)
+
+                # Transform virtual fields tensor to voigt notation
+                vfsv = _utils.tensor_to_voigt(vfsb,ne,ndi,ntens,nvfs)
+
+                # Compute internal virtual work
+                ivwb = stressv[:,None] * vfsv[None] * vol[None,None,:,None]
+
+                # Sum internal virtual work along ne and ntens
+                ivw[b,:,blk] = np.nansum(ivwb,(2,3)).T
+
+    # Remove batch dimension of single material properties
+    if not batch:
+        ivw = ivw[0]
 
     return ivw,success
\ No newline at end of file
@@ -1,12 +1,78 @@
 import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 import _funcs
+import _utils
 
-def load_data(prjnm,test,nt):
+def load_csv(filesdir,t,pool,engine):
+    """
+    Load raw test data from per-increment CSV files.
+
+    Parameters
+    ----------
+    filesdir : str
+        Test data files directory and prefix.
+    t : int
+        Test number.
+    pool : ProcessPoolExecutor or None
+        Pool of processes parsing displacements files, or None to parse them
+          serially.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    data : {'time','thk','ori','force','nodes','coord','conn','displ','ingest'}
+        Raw test data, and size in MB and time in seconds of loading of
+          displacements.
+    """
+
+    data = {}
+
+    # Load time increments
+    filename = f'{filesdir}_Time.csv'
+    data['time'] = np.loadtxt(filename,skiprows=1,delimiter=';')
+
+    # Load specimen thickness
+    filename = f'{filesdir}_Thickness.csv'
+    data['thk'] = float(np.loadtxt(filename,skiprows=1,delimiter=';'))
+
+    # Load material orientation
+    filename = f'{filesdir}_Orientation.csv'
+    data['ori'] = float(np.loadtxt(filename,skiprows=1,delimiter=';'))
+
+    # Load global forces
+    filename = f'{filesdir}_Force.csv'
+    data['force'] = np.loadtxt(filename,skiprows=1,delimiter=';')
+
+    # Load nodes labels and reference coordinates
+    filename = f'{filesdir}_Nodes.csv'
+    nodes = np.loadtxt(filename,skiprows=1,delimiter=';')
+    data['nodes'] = nodes[:,0]
+    data['coord'] = nodes[:,1:]
+
+    # Load elements connectivity
+    filename = f'{filesdir}_Elements.csv'
+    data['conn'] = np.loadtxt(filename,int,skiprows=1,delimiter=';')[:,1:]
+
+    # Load nodal displacements through cache file of displacements
+    fdispl = f'{filesdir}_Cache_U.npy'
+    data['displ'],size,dt = _funcs.load_displacements(filesdir,data['nodes'],
+                                                      len(data['time']),
+                                                      data['coord'].shape[1],
+                                                      t,fdispl,pool,engine)
+    data['ingest'] = (size,dt)
+
+    return data
+
+def load_data(prjnm,test,nt,fout,dirout,engine):
     """
     Load coordinates, connectivity, and displacements.
 
+    The data of each test is read from a single-file container (`test`.h5 or
+      `test`.npz) if available, otherwise from the per-increment CSV files.
+
     Parameters
     ----------
     prjname : str
@@ -15,6 +81,12 @@ def load_data(prjnm,test,nt):
         List of tests name.
     nt : int
         Number of tests.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
@@ -52,6 +124,9 @@ def load_data(prjnm,test,nt):
     # Set project directory
     dir = os.path.join(os.getcwd(),'input',prjnm)
 
+    # Pool of processes parsing displacements files, created on first use
+    pool = None
+
     for t in range(nt):
 
         # Set test name
@@ -60,32 +135,52 @@ def load_data(prjnm,test,nt):
         # Set files test directory
         filesdir = os.path.join(dir,tnm,tnm)
 
-        # Load time increments
-        filename = f'{filesdir}_Time.csv'
-        time[t] = np.loadtxt(filename,skiprows=1,delimiter=';')
+        # Load raw test data from single-file container
+        fcont = _funcs.find_container(filesdir)
+        if fcont is not None:
+            data = _funcs.read_container(fcont,t,engine)
+
+        # Load raw test data from per-increment CSV files
+        else:
+
+            # Load test data from cache if source files are unchanged
+            key = _funcs.cache_key(filesdir)
+            data = _funcs.load_cache(filesdir,key,engine)
+            if data is not None:
+                coord[t],conn[t],displ[t] = data['coord'],data['conn'],data['displ']
+                force[t],time[t],centr[t] = data['force'],data['time'],data['centr']
+                thk[t],ori[t] = data['thk'],data['ori']
+                nf[t] = len(time[t])
+                continue
+
+            # Create pool of processes parsing displacements files
+            if (pool is None) and ((os.cpu_count() or 1) > 1):
+                pool = ProcessPoolExecutor(os.cpu_count())
+
+            data = load_csv(filesdir,t,pool,engine)
+
+            # Print displacements ingest throughput to log file
+            _funcs.print_ingest(t,*data['ingest'],fout,dirout)
+
+        # Set time increments, global forces, connectivity and displacements
+        time[t],force[t] = data['time'],data['force']
+        conn[t],displ[t] = data['conn'],data['displ']
 
         # Get number of time increments
         nf[t] = len(time[t])
 
-        # Load specimen thickness
-        filename = f'{filesdir}_Thickness.csv'
-        thk[t] = float(np.loadtxt(filename,skiprows=1,delimiter=';'))
+        # Set specimen thickness
+        thk[t] = data['thk']
 
-        # Load material orientation
-        filename = f'{filesdir}_Orientation.csv'
-        ori[t] = 90 - float(np.loadtxt(filename,skiprows=1,delimiter=';'))
-
-        # Load global forces
-        filename = f'{filesdir}_Force.csv'
-        force[t] = np.loadtxt(filename,skiprows=1,delimiter=';')
+        # Set material orientation
+        ori[t] = 90 - data['ori']
 
         # Check if force increments is equal to time increments
         if len(force[t]) != nf[t]:
-            _funcs.error(f'number of force increments is different from time increments in test {t+1}.')
+            _utils.error(f'number of force increments is different from time increments in test {t+1}.')
 
-        # Load nodal coordinates
-        filename = f'{filesdir}_Nodes.csv'
-        coord[t] = np.loadtxt(filename,skiprows=1,delimiter=';')[:,1:]
+        # Set nodal coordinates
+        coord[t] = np.array(data['coord'],dtype=float)
 
         # Translate xy origin to center of specimen
         xymin = np.nanmin(coord[t][:,:2],0)
@@ -98,17 +193,18 @@ def load_data(prjnm,test,nt):
             zmax = np.nanmax(coord[t][:,2],0)
             coord[t][:,2] = thk[t] * (coord[t][:,2] - zmin) / (zmax - zmin)
 
-        # Load elements connectivity
-        filename = f'{filesdir}_Elements.csv'
-        conn[t] = np.loadtxt(filename,int,skiprows=1,delimiter=';')[:,1:]
-
-        # Load nodal displacements
-        displ[t] = np.zeros((nf[t],coord[t].shape[0],coord[t].shape[1]))
-        for f in range(nf[t]):
-            filename = f'{filesdir}_U_{f}.csv'
-            displ[t][f] = np.loadtxt(filename,skiprows=1,delimiter=';')[:,1:]
-
         # Compute elements centroid
         centr[t] = np.mean(coord[t][conn[t]],1)
 
+        # Save test data to cache, with displacements already in cache file
+        if fcont is None:
+            _funcs.save_cache(filesdir,key,{'coord': coord[t],'conn': conn[t],
+                                            'force': force[t],'time': time[t],
+                                            'thk': thk[t],'ori': ori[t],
+                                            'centr': centr[t]})
+
+    # Shut down pool of processes parsing displacements files
+    if pool is not None:
+        pool.shutdown()
+
     return coord,displ,conn,centr,force,time,thk,ori,nf
\ No newline at end of file
@@ -0,0 +1,129 @@
+import os
+import time
+import numpy as np
+
+import _utils
+
+def read_increment(filename,fdispl,f,nodes):
+    """
+    Read nodal displacements of one increment into displacements file.
+
+    Parameters
+    ----------
+    filename : str
+        Displacements file of increment.
+    fdispl : str
+        Memory-mapped file of displacements of all increments.
+    f : int
+        Increment number.
+    nodes : (nn,) , float
+        Nodes labels in reference coordinates file.
+
+    Returns
+    -------
+    f : int
+        Increment number.
+    size : int
+        Size of displacements file in bytes.
+    valid : bool
+        Flag for matching nodes ordering (False/True).
+    """
+
+    # Map displacements file of all increments
+    displ = np.load(fdispl,mmap_mode='r+')
+
+    nn,dof = displ.shape[1],displ.shape[2]
+
+    # Parse displacements file with the C tokenizer of numpy
+    try:
+        rows = np.loadtxt(filename,skiprows=1,delimiter=';',ndmin=2)
+    except ValueError:
+        rows = np.zeros((0,dof+1))
+
+    # Check nodes ordering and write increment to displacements file
+    valid = (rows.shape == (nn,dof+1)) and (rows[:,0] == nodes).all()
+    if valid:
+        displ[f] = rows[:,1:]
+        displ.flush()
+    del displ
+
+    return f,os.path.getsize(filename),valid
+
+def load_displacements(filesdir,nodes,nf,dof,t,fdispl,pool,engine):
+    """
+    Load nodal displacements of all increments with a pool of processes.
+
+    Parameters
+    ----------
+    filesdir : str
+        Test data files directory and prefix.
+    nodes : (nn,) , float
+        Nodes labels in reference coordinates file.
+    nf : int
+        Number of increments.
+    dof : int
+        Number of degrees of freedom.
+    t : int
+        Test number.
+    fdispl : str
+        Cache file of displacements.
+    pool : ProcessPoolExecutor or None
+        Pool of processes parsing displacements files, or None to parse them
+          serially.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    displ : (nf,nn,dof) , float
+        Nodes displacements.
+    size : float
+        Size of displacements files in MB.
+    dt : float
+        Time of loading in seconds.
+
+    Notes
+    -----
+    The processes parse the displacements files straight into the cache file
+      of displacements, which is then memory-mapped or loaded in memory as
+      when read from the cache.
+    """
+
+    # Get start time
+    st = time.time()
+
+    # Check if there is one displacements file for each time increment
+    files = [f'{filesdir}_U_{f}.csv' for f in range(nf)]
+    for f in range(nf):
+        if not os.path.isfile(files[f]):
+            _utils.error(f'displacements file of increment {f} not found in test {t+1}.')
+
+    # Preallocate displacements array in cache file
+    shape = (int(nf),len(nodes),int(dof))
+    np.lib.format.open_memmap(fdispl,mode='w+',shape=shape).flush()
+
+    # Read displacements files of all increments
+    args = (files,[fdispl]*nf,range(nf),[nodes]*nf)
+    if pool is not None:
+        nworkers = os.cpu_count() or 1
+        results = list(pool.map(read_increment,*args,
+                                chunksize=max(1,nf//(4*nworkers))))
+    else:
+        results = list(map(read_increment,*args))
+
+    # Check if nodes ordering is equal to reference coordinates file
+    for f,_,valid in results:
+        if not valid:
+            _utils.error(f'nodes of displacements file of increment {f} do not match nodes file in test {t+1}.')
+
+    # Load displacements in memory or memory-mapped
+    if engine['nblk'] is None:
+        displ = np.load(fdispl)
+    else:
+        displ = np.load(fdispl,mmap_mode='r')
+
+    # Size of displacements files and time of loading
+    size = sum([r[1] for r in results]) / 1024**2
+    dt = max(time.time() - st,1e-9)
+
+    return displ,size,dt
\ No newline at end of file
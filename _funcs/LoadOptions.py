@@ -2,6 +2,7 @@ import os
 import re
 import numpy as np
 
+import _funcs
 import _utils
 
 def load_tests(data,ln):
@@ -42,7 +43,7 @@ def load_tests(data,ln):
 
 def load_output(data,ln,prjnm):
     """
-    Load output folder name.
+    Load output folder name and export settings.
 
     Parameters
     ----------
@@ -57,14 +58,61 @@ def load_output(data,ln,prjnm):
     -------
     fout : str
         Name of output folder.
+    output : {'precision','fields','every','increments'} , dict
+        Precision and names of fields exported to paraview, and interval or
+          list of exported increments.
     """
 
+    kw = '*Output.'
+
+    output = {'precision': 'double',
+              'fields': list(_funcs.export_fields),
+              'every': 1,
+              'increments': None}
+
     if ln != -1:
         fout = data[ln+1]
+
+        # Precision of exported fields
+        if (len(data) > ln+2) and (not data[ln+2].startswith('*')):
+            output['precision'] = data[ln+2].lower()
+
+        # Names of exported fields
+        if (len(data) > ln+3) and (not data[ln+3].startswith('*')):
+            fields = data[ln+3].lower().split(',')
+            if fields != ['all']:
+                output['fields'] = fields
+
+        # Interval or list of exported increments
+        if (len(data) > ln+4) and (not data[ln+4].startswith('*')):
+            ldata = data[ln+4].lower().split(',')
+            try:
+                if ldata[0] == 'every':
+                    output['every'] = int(ldata[1])
+                elif ldata[0] == 'list':
+                    output['increments'] = [int(f) for f in ldata[1:]]
+                else:
+                    _utils.error(f'{kw} Selection of increments {ldata[0]} '
+                                 'not available.')
+            except (IndexError,ValueError):
+                _utils.error(f'{kw} Exported increments are not defined.')
     else:
         fout = prjnm
 
-    return fout
+    if output['precision'] not in _funcs.export_precision:
+        _utils.error(f'{kw} Precision {output["precision"]} not available.')
+
+    for field in output['fields']:
+        if field not in _funcs.export_fields:
+            _utils.error(f'{kw} Field {field} not available.')
+
+    if output['every'] < 1:
+        _utils.error(f'{kw} Interval of exported increments must be positive.')
+
+    if (output['increments'] is not None) and (len(output['increments']) == 0):
+        _utils.error(f'{kw} Exported increments are not defined.')
+
+    return fout,output
 
 
 def load_optimization(data,ln):
@@ -80,12 +128,17 @@ def load_optimization(data,ln):
 
     Returns
     -------
-    fout : str
-        Name of output folder.
+    tol : float
+        Tolerance criterion.
+    maxiter : int
+        Maximum number of iterations.
+    method : str
+        Optimization method.
     """
     kw = '*Optimization.'
 
     tol,maxiter = None,None
+    method = 'nelder-mead'
 
     if ln != -1:
         try:
@@ -93,11 +146,122 @@ def load_optimization(data,ln):
         except:
             if (tol is None) or (maxiter is None):
                 _utils.error(f'{kw} Tolerance or maximum number of iterations is not defined.')
+
+        # Optimization method
+        if (len(data) > ln+2) and (not data[ln+2].startswith('*')):
+            method = data[ln+2].strip().lower()
+
+        if method not in _funcs.optimization_methods:
+            _utils.error(f'{kw} Optimization method not available.')
     else:
         tol = 1e-8
         maxiter = 500
 
-    return tol,maxiter
+    return tol,maxiter,method
+
+def load_multistart(data,ln):
+    """
+    Load multi-start identification settings.
+
+    Parameters
+    ----------
+    data : (), str
+        Options file data contents.
+    ln : int
+        Line number of multi-start option in data file.
+
+    Returns
+    -------
+    starts : {'n','sampling','nproc','budget','margin'} or None , dict
+        Multi-start settings, or None for a single start.
+    """
+    kw = '*Multistart.'
+
+    if ln == -1:
+        return None
+
+    ldata = data[ln+1].split(',')
+
+    # Number of starting points
+    try:
+        n = int(ldata[0])
+    except:
+        _utils.error(f'{kw} Number of starting points is not defined.')
+
+    if n < 1:
+        _utils.error(f'{kw} Number of starting points should be positive.')
+
+    # Sampling of starting points
+    sampling = 'lhs'
+    if len(ldata) > 1:
+        sampling = ldata[1].strip().lower()
+
+    if sampling not in _funcs.multistart_samplings:
+        _utils.error(f'{kw} Sampling of starting points not available.')
+
+    # Number of worker processes, all available cores by default
+    nproc = 0
+    if len(ldata) > 2:
+        try:
+            nproc = int(ldata[2])
+        except:
+            _utils.error(f'{kw} Number of worker processes is not defined.')
+
+    if nproc == 0:
+        nproc = os.cpu_count() or 1
+    elif nproc < 0:
+        _utils.error(f'{kw} Number of worker processes should be positive.')
+
+    # Budget of iterations and relative margin of cost to prune starts
+    budget,margin = 0,np.inf
+    if (len(data) > ln+2) and (not data[ln+2].startswith('*')):
+        try:
+            budget = int(data[ln+2].split(',')[0])
+            margin = float(data[ln+2].split(',')[1])
+        except:
+            _utils.error(f'{kw} Budget or margin of pruning is not defined.')
+
+    starts = {'n': n,
+              'sampling': sampling,
+              'nproc': min(nproc,n),
+              'budget': budget,
+              'margin': margin}
+
+    return starts
+
+def load_checkpoint_interval(data,ln):
+    """
+    Load checkpoint settings of identification.
+
+    Parameters
+    ----------
+    data : (), str
+        Options file data contents.
+    ln : int
+        Line number of checkpoint option in data file.
+
+    Returns
+    -------
+    chkpt : {'every','resume'} , dict
+        Checkpoint settings, with the interval of iterations between
+          checkpoints (0 to disable) and the flag to resume identification.
+    """
+    kw = '*Checkpoint.'
+
+    every = 0
+    if ln != -1:
+        try:
+            every = int(data[ln+1])
+        except:
+            _utils.error(f'{kw} Interval of iterations is not defined.')
+
+        if every < 0:
+            _utils.error(f'{kw} Interval of iterations should be positive.')
+
+    chkpt = {'every': every,
+             'resume': False}
+
+    return chkpt
 
 def load_nlgeom(data,ln):
     """
@@ -171,7 +335,32 @@ def load_virtual_fields(data,ln,nt):
                     except:
                         scale = 0.3
 
-                    vfs[t] = {'sb': {'dx': dx, 'scale': scale}}
+                    try:
+                        mode = ldata[4].strip().lower()
+                    except:
+                        mode = 'fd'
+
+                    if mode not in ['fd','cs']:
+                        _utils.error(f'{kw} Test {t+1} stress sensitivity method not available.')
+
+                    try:
+                        check = bool(int(ldata[5]))
+                    except:
+                        check = False
+
+                    try:
+                        rtol = float(ldata[6])
+                    except:
+                        rtol = 0.0
+
+                    try:
+                        nevery = int(ldata[7])
+                    except:
+                        nevery = 0
+
+                    vfs[t] = {'sb': {'dx': dx, 'scale': scale, 'mode': mode,
+                                     'check': check, 'rtol': rtol,
+                                     'nevery': nevery}}
 
                 else:
                     _utils.error(f'{kw} Test {t+1} type of virtual fields not available.')
@@ -365,6 +554,155 @@ def load_constraints(data,ln,nprops):
 
     return constr
 
+def load_memory_map(data,ln):
+    """
+    Load settings for memory-mapped storage of displacements and kinematics.
+
+    Parameters
+    ----------
+    data : (), str
+        Options file data contents.
+    ln : int
+        Line number of memory map option in data file.
+
+    Returns
+    -------
+    engine : {'nblk','dir'} , dict
+        Computation engine settings.
+    """
+
+    kw = '*Memory Map.'
+
+    engine = {'nblk': None, 'dir': None}
+
+    if ln != -1:
+        try:
+            engine['nblk'] = int(data[ln+1])
+        except:
+            _utils.error(f'{kw} Number of increments per block is not defined.')
+
+        if engine['nblk'] < 1:
+            _utils.error(f'{kw} Number of increments per block should be positive.')
+
+        # Scratch directory of memory-mapped files
+        if (len(data) > ln+2) and (not data[ln+2].startswith('*')):
+            engine['dir'] = data[ln+2]
+
+    return engine
+
+def load_engine(data,ln):
+    """
+    Load stress integration engine.
+
+    Parameters
+    ----------
+    data : (), str
+        Options file data contents.
+    ln : int
+        Line number of engine option in data file.
+
+    Returns
+    -------
+    type : str
+        Name of stress integration backend.
+    """
+
+    kw = '*Engine.'
+
+    # Default to UMMDp library if available
+    if ln != -1:
+        try:
+            type = data[ln+1].lower()
+        except:
+            _utils.error(f'{kw} Stress integration backend is not defined.')
+    elif _funcs.ummdp_vfm is not None:
+        type = 'ummdp'
+    else:
+        type = 'numpy'
+
+    if type not in _funcs.stress_backends:
+        _utils.error(f'{kw} Stress integration backend {type} not available.')
+    elif (type == 'ummdp') and (_funcs.ummdp_vfm is None):
+        _utils.error(f'{kw} UMMDp library not available on this platform (use numpy).')
+
+    return type
+
+def load_parallel(data,ln):
+    """
+    Load number of worker processes of stress integration and flag for
+      concurrent evaluation of tests.
+
+    Parameters
+    ----------
+    data : (), str
+        Options file data contents.
+    ln : int
+        Line number of parallel option in data file.
+
+    Returns
+    -------
+    workers : int
+        Number of worker processes.
+    tests : bool
+        Flag to evaluate tests concurrently in worker processes (False/True).
+    """
+
+    kw = '*Parallel.'
+
+    workers = 1
+    tests = False
+    if ln != -1:
+        try:
+            workers = int(data[ln+1])
+        except:
+            _utils.error(f'{kw} Number of worker processes is not defined.')
+
+        # Use all available cores
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        elif workers < 0:
+            _utils.error(f'{kw} Number of worker processes should be positive.')
+
+        # Concurrent evaluation of tests
+        if (len(data) > ln+2) and (not data[ln+2].startswith('*')):
+            try:
+                tests = bool(int(data[ln+2]))
+            except:
+                _utils.error(f'{kw} Flag for concurrent tests should be 0 or 1.')
+
+    return workers,tests
+
+def load_stress_cache(data,ln):
+    """
+    Load memory budget of cache of stress integration results.
+
+    Parameters
+    ----------
+    data : (), str
+        Options file data contents.
+    ln : int
+        Line number of cache option in data file.
+
+    Returns
+    -------
+    budget : int
+        Memory budget of cache in bytes.
+    """
+
+    kw = '*Cache.'
+
+    budget = 256
+    if ln != -1:
+        try:
+            budget = float(data[ln+1])
+        except:
+            _utils.error(f'{kw} Memory budget of cache is not defined.')
+
+        if budget < 0:
+            _utils.error(f'{kw} Memory budget of cache should be positive.')
+
+    return int(budget * 1024**2)
+
 def load_options(prjnm):
     """
     Load options for virtual fields method.
@@ -412,6 +750,12 @@ def load_options(prjnm):
     lvars = -1
     lbounds = -1
     lconstr = -1
+    lmmap = -1
+    lengine = -1
+    lpar = -1
+    lcache = -1
+    lstarts = -1
+    lchkpt = -1
 
     l = 0
     for line in data:
@@ -440,6 +784,18 @@ def load_options(prjnm):
             lbounds = l
         elif '*constraints' in line:
             lconstr = l
+        elif '*memorymap' in line:
+            lmmap = l
+        elif '*engine' in line:
+            lengine = l
+        elif '*parallel' in line:
+            lpar = l
+        elif '*cache' in line:
+            lcache = l
+        elif '*multistart' in line:
+            lstarts = l
+        elif '*checkpoint' in line:
+            lchkpt = l
 
         l += 1
 
@@ -456,11 +812,17 @@ def load_options(prjnm):
     # Load number and name of tests
     tests,nt = load_tests(data,ltest)
 
-    # Load output folder name
-    fout = load_output(data,lfout,prjnm)
+    # Load output folder name and export settings
+    fout,output = load_output(data,lfout,prjnm)
 
     # Load optimization seetings
-    tol,maxiter = load_optimization(data,lopti)
+    tol,maxiter,method = load_optimization(data,lopti)
+
+    # Load multi-start identification settings
+    starts = load_multistart(data,lstarts)
+
+    # Load checkpoint settings of identification
+    chkpt = load_checkpoint_interval(data,lchkpt)
 
     # Load flag for small or large (default) deformation framework
     nlgeom = load_nlgeom(data,lnlgeom)
@@ -483,4 +845,14 @@ def load_options(prjnm):
     # Load identification properties constraints
     constr = load_constraints(data,lconstr,nprops)
 
-    return run,tests,fout,tol,maxiter,props,vars,bounds,constr,nlgeom,vfs,bc,nprops,nvars,nt
\ No newline at end of file
+    # Load computation engine settings
+    engine = load_memory_map(data,lmmap)
+    engine['type'] = load_engine(data,lengine)
+    engine['workers'],engine['tests'] = load_parallel(data,lpar)
+    engine['pool'] = None
+    engine['testpools'] = None
+    engine['abort'] = None
+    engine['cache'] = _funcs.stress_cache(load_stress_cache(data,lcache))
+    engine['store'] = _funcs.result_store()
+
+    return run,tests,fout,output,tol,maxiter,method,starts,chkpt,props,vars,bounds,constr,nlgeom,vfs,bc,nprops,nvars,nt,engine
\ No newline at end of file
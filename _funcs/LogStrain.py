@@ -3,9 +3,9 @@ import numpy as np
 import _funcs
 import _utils
 
-def log_strain(coord,displ,conn,rotm,thk,ne,npe,dof,ndi,ntens,nf):
+def log_strain(coord,displ,conn,rotm,thk,ne,npe,dof,ndi,ntens,nf,engine):
     """
-    Compute the logarithmic strain in local csys by the polar 
+    Compute the logarithmic strain in local csys by the closed-form polar
       decomposition of the deformation gradient.
 
     Parameters
@@ -32,6 +32,8 @@ def log_strain(coord,displ,conn,rotm,thk,ne,npe,dof,ndi,ntens,nf):
         Number of tensor components.
     nf : int
         Number of increments.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
@@ -51,18 +53,26 @@ def log_strain(coord,displ,conn,rotm,thk,ne,npe,dof,ndi,ntens,nf):
     elif npe == 8:
         dNdnr,jac,vol = _funcs.el_hex8r(coord[conn])
 
-    # Deformaton gradient
-    dfgrd = _funcs.deformation_gradient(displ[:,conn],dNdnr,jac,dof)
+    # Initialize strain, rotation tensor and deformation gradient
+    strain = _utils.memory_map((nf,ne,ntens),engine)
+    rot = _utils.memory_map((nf,ne,dof,dof),engine)
+    dfgrd = _utils.memory_map((nf,ne,dof,dof),engine)
 
-    # Polar decomposition of deformation gradient to left stretch tensor
-    rot,strch = _funcs.polar_decomposition(dfgrd,side='left')
+    # Loop over blocks of increments
+    for blk in _utils.increment_blocks(nf,engine):
 
-    # Logarithmic strain in global csys
-    eigv,eigpr = np.linalg.eig(strch)
-    strain = eigpr * np.log(eigv[...,None,:]) @ np.linalg.inv(eigpr)
+        # Number of increments in block
+        nb = blk.stop - blk.start
 
-    # Rotate strain to corotational material csys and convert to voigt
-    strain = _utils.rotate_tensor(strain,rot,rotm,ne,dof,ndi,ntens,nf,
-                                  dir=-1,voigt=True,eng=True)
+        # Deformaton gradient
+        dfgrd[blk] = _funcs.deformation_gradient(displ[blk][:,conn],dNdnr,jac,
+                                                 dof)
+
+        # Closed-form polar decomposition and logarithmic strain in global csys
+        rot[blk],_,lnstrch = _funcs.polar_logarithm(dfgrd[blk])
+
+        # Rotate strain to corotational material csys and convert to voigt
+        strain[blk] = _utils.rotate_tensor(lnstrch,rot[blk],rotm,ne,dof,ndi,
+                                           ntens,nb,dir=-1,voigt=True,eng=True)
 
     return strain,rot,dfgrd,vol
\ No newline at end of file
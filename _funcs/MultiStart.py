@@ -0,0 +1,491 @@
+import os
+import sys
+import copy
+import time
+import warnings
+import numpy as np
+import multiprocessing as mp
+from functools import partial
+from scipy.stats import qmc
+from concurrent.futures import ProcessPoolExecutor,wait,FIRST_COMPLETED
+
+import _funcs
+import _utils
+
+# Available samplings of starting points
+multistart_samplings = ['lhs','sobol']
+
+# Data of identification resident in worker process
+resident_identification = {}
+
+# Seconds between checks of costs of starting points at budget
+multistart_poll = 0.5
+
+def sample_starts(x0,bounds,starts):
+    """
+    Sample starting points of identification variables inside boundaries.
+
+    Parameters
+    ----------
+    x0 : (nvars,) , float
+        Initial identification variables.
+    bounds : (nvars,2) , float
+        Boundaries for identification variables.
+    starts : {'n','sampling','nproc','budget','margin'} , dict
+        Multi-start settings.
+
+    Returns
+    -------
+    xs : (n,nvars) , float
+        Starting points of identification variables.
+
+    Notes
+    -----
+    The first starting point is the initial identification variables, and
+      the remaining are sampled by Latin hypercube or scrambled Sobol
+      sequence.
+    """
+
+    nvars = len(x0)
+
+    # Sampler of unit hypercube
+    if starts['sampling'] == 'sobol':
+        sampler = qmc.Sobol(nvars)
+    else:
+        sampler = qmc.LatinHypercube(nvars)
+
+    # Sobol sequence warns if number of points is not a power of two
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        sample = sampler.random(starts['n']-1)
+
+    # Scale sample to boundaries
+    xs = np.vstack((x0,qmc.scale(sample,bounds[:,0],bounds[:,1])))
+
+    return xs
+
+def load_identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbglsq,bcdofs,
+                        vfs,nn,ne,dof,ndi,nshr,ntens,ncomp,nstatev,nvfs,nf,nt,
+                        nprops,nvars,props,vars,bounds,constr,nlgeom,test,fout,
+                        tol,method,engine,costs,prune):
+    """
+    Keep data and settings of identification resident in worker process.
+
+    Parameters
+    ----------
+    costs : (n,) , float
+        Shared cost of each starting point at budget of iterations.
+    prune : (n,) , bool
+        Shared flags of pruned starting points.
+
+    See Also
+    --------
+    identification : other parameters of identification.
+
+    Notes
+    -----
+    The factorizations of the least-squares solvers are computed again in
+      the worker process, and its output to the command window is discarded.
+      Memory-mapped kinematics are given as names of scratch files, which are
+      mapped by the worker process instead of being copied in memory.
+    """
+
+    # Discard output of worker process to command window
+    sys.stdout = open(os.devnull,'w')
+
+    # Map kinematics in files of memory-mapped arrays
+    strain,rot,dfgrd = [[np.load(array,mmap_mode='r')
+                         if isinstance(array,str) else array
+                         for array in arrays] for arrays in (strain,rot,dfgrd)]
+
+    # Factorize least-squares solvers of sensitivity-based virtual fields
+    mbglsq = [None if m is None else _funcs.least_squares_factorization(m['mbg'])
+              for m in mbglsq]
+
+    resident_identification.update({'strain': strain, 'rot': rot,
+                                    'dfgrd': dfgrd, 'rotm': rotm,
+                                    'force': force, 'time': time, 'vol': vol,
+                                    'bg': bg, 'mbglsq': mbglsq,
+                                    'bcdofs': bcdofs, 'vfs': vfs, 'nn': nn,
+                                    'ne': ne, 'dof': dof, 'ndi': ndi,
+                                    'nshr': nshr, 'ntens': ntens,
+                                    'ncomp': ncomp, 'nstatev': nstatev,
+                                    'nvfs': nvfs, 'nf': nf, 'nt': nt,
+                                    'nprops': nprops, 'nvars': nvars,
+                                    'props': props, 'vars': vars,
+                                    'bounds': bounds, 'constr': constr,
+                                    'nlgeom': nlgeom, 'test': test,
+                                    'fout': fout, 'tol': tol,
+                                    'method': method, 'engine': engine,
+                                    'costs': costs, 'prune': prune})
+
+    return
+
+def start_monitor(k,budget,nit,bestphi):
+    """
+    Report cost of starting point at budget of iterations and check if it is
+      pruned.
+
+    Parameters
+    ----------
+    k : int
+        Starting point number.
+    budget : int
+        Budget of iterations.
+    nit : int
+        Number of iterations.
+    bestphi : (nt,) , float
+        Best cost function.
+
+    Returns
+    -------
+    stop : bool
+        Flag to stop pruned starting point (False/True).
+    """
+
+    r = resident_identification
+
+    # Report cost at budget of iterations, infinite if not available
+    if nit == budget:
+        cost = np.inf if bestphi is None else np.sum(bestphi)
+        r['costs'][k] = np.inf if np.isnan(cost) else cost
+
+    return bool(r['prune'][k])
+
+def identification_start(k,x,maxiter,budget,dirstart,chkpt):
+    """
+    Run the identification of one starting point in worker process.
+
+    Parameters
+    ----------
+    k : int
+        Starting point number.
+    x : (nvars,) , float
+        Starting point of identification variables.
+    maxiter : int
+        Maximum number of iterations.
+    budget : int
+        Budget of iterations at which the cost is reported, or None if the
+          starting points are not pruned.
+    dirstart : str
+        Directory of starting point to export output files.
+    chkpt : {'every','resume','file'} , dict
+        Checkpoint settings of starting point.
+
+    Returns
+    -------
+    x : (nvars,) , float
+        Best identification variables.
+    bestphi : (nt,) , float
+        Best cost function.
+    nit : int
+        Number of iterations.
+    nfev : int
+        Number of function evaluations.
+    tmsg : str
+        Algorithm termination message.
+    success : bool
+        Flag for convergence of identification algorithm (False/True).
+    results : {t: {key: (stress,statev,de33)}} , dict
+        Stress integration results of best evaluation of each test, with
+          arrays in memory or names of scratch files.
+
+    Notes
+    -----
+    A starting point already pruned when taken from the queue of the pool
+      is not run, and returns its starting point without iterations.
+    """
+
+    r = resident_identification
+
+    # Skip starting point pruned while queued
+    if r['prune'][k]:
+        return x,np.nan,0,0,'Pruned before start.',False,{}
+
+    # Monitor reporting cost at budget and stopping pruned starting point
+    monitor = None
+    if budget is not None:
+        monitor = partial(start_monitor,k,budget)
+    st = time.time()
+
+    # Create output folders of starting point
+    os.makedirs(dirstart,exist_ok=True)
+    if r['nt'] > 1:
+        for t in range(r['nt']):
+            os.makedirs(os.path.join(dirstart,r['test'][t]),exist_ok=True)
+
+    # Material properties and virtual fields of starting point
+    props = np.copy(r['props'])
+    props[r['vars']] = x
+    vfs = copy.deepcopy(r['vfs'])
+
+    # Start identification algorithm from starting point
+    result,bestphi = _funcs.local_identification(r['strain'],r['rot'],
+                                                 r['dfgrd'],r['rotm'],
+                                                 r['force'],r['time'],
+                                                 r['vol'],r['bg'],
+                                                 r['mbglsq'],r['bcdofs'],vfs,
+                                                 r['nn'],r['ne'],r['dof'],
+                                                 r['ndi'],r['nshr'],
+                                                 r['ntens'],r['ncomp'],
+                                                 r['nstatev'],r['nvfs'],
+                                                 r['nf'],r['nt'],r['nprops'],
+                                                 r['nvars'],props,r['vars'],
+                                                 r['bounds'],r['constr'],
+                                                 r['nlgeom'],r['test'],
+                                                 r['fout'],dirstart,r['tol'],
+                                                 maxiter,r['method'],chkpt,
+                                                 r['engine'],monitor)
+
+    # Print summary of identification results to log of starting point
+    _funcs.print_result_identification(result.nit,result.nfev,result.x,
+                                       bestphi,result.message,r['nvars'],
+                                       r['nt'],r['fout'],dirstart,st)
+    _funcs.print_result_refresh(result.refresh,r['nt'],r['fout'],dirstart)
+
+    # Stress integration results of best evaluation sent to main process
+    results = _funcs.resident_results(r['engine']['store'],r['engine'])
+
+    return (result.x,bestphi,result.nit,result.nfev,result.message,
+            bool(result.success),results)
+
+def write_starts(xs,results,nvars,nt,fout,dirout):
+    """
+    Write summary of starting points to file.
+
+    Parameters
+    ----------
+    xs : (n,nvars) , float
+        Starting points of identification variables.
+    results : (n, {'x','phi','nit','nfev','status'} ) , dict
+        Results of identification of each starting point.
+    nvars : int
+        Number of identification variables.
+    nt : int
+        Number of tests.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    fname = os.path.join(dirout,f'{fout}_Starts.csv')
+
+    # Generate header
+    head = ['start','status','nit','nfev','phi']
+    head += [f'x0{i+1}' for i in range(nvars)]
+    head += [f'x{i+1}' for i in range(nvars)]
+
+    # Generate results of each starting point
+    lines = []
+    for k,res in enumerate(results):
+        line = [f'{k+1}',res['status'],f'{res["nit"]}',f'{res["nfev"]}',
+                f'{np.sum(res["phi"]):.12e}']
+        line += [f'{v:.12e}' for v in xs[k]]
+        line += [f'{v:.12e}' for v in res['x']]
+        lines.append(';'.join(line))
+
+    with open(fname,'w') as f:
+        f.write(';'.join(head)+'\n')
+        f.write('\n'.join(lines))
+
+    return
+
+def multistart_identification(strain,rot,dfgrd,rotm,force,time,vol,bg,mbglsq,
+                              bcdofs,vfs,nn,ne,dof,ndi,nshr,ntens,ncomp,
+                              nstatev,nvfs,nf,nt,nprops,nvars,props,vars,
+                              bounds,constr,nlgeom,test,fout,dirout,tol,
+                              maxiter,method,starts,chkpt,st,engine):
+    """
+    Perform identification of material properties from several starting
+      points run concurrently in a pool of processes.
+
+    See Also
+    --------
+    identification : parameters and returns of identification.
+
+    Notes
+    -----
+    Each starting point writes its progress to its own output folder. With
+      a budget of iterations, each start reports its cost after the budget
+      and continues its run. Each time a start reports, the starts whose
+      cost is above the best cost reported so far by more than the relative
+      margin are pruned, and are stopped at their next iteration. Queued
+      starts are compared once they report, so that the first starts do not
+      wait for the queued ones before being pruned. Each worker process
+      integrates the stress serially with its own cache of stress
+      integration results, and the results of the best evaluation of the
+      best start are kept in the main process. Each starting point writes its
+      own checkpoint.
+    """
+
+    kw = '*Multistart.'
+
+    if not np.isfinite(bounds[vars]).all():
+        _utils.error(f'{kw} Multi-start requires boundaries of all identification variables.')
+
+    # Sample starting points inside boundaries, or reload them to resume
+    chk = None
+    if chkpt['resume']:
+        chk = _funcs.load_checkpoint(_funcs.checkpoint_file(fout,dirout))
+
+    if chk is not None:
+        xs = chk['xs']
+    else:
+        xs = sample_starts(props[vars],bounds[vars],starts)
+        if chkpt['every'] > 0:
+            _funcs.write_checkpoint(_funcs.checkpoint_file(fout,dirout),
+                                    {'xs': xs})
+    n = starts['n']
+
+    # Engine settings of worker processes
+    wengine = {'nblk': engine['nblk'],
+               'dir': engine['dir'],
+               'type': engine['type'],
+               'workers': 1,
+               'tests': False,
+               'pool': None,
+               'testpools': None,
+               'abort': None,
+               'cache': _funcs.stress_cache(engine['cache']['budget']),
+               'store': _funcs.result_store()}
+
+    # Least-squares solvers without factorization, which cannot be pickled
+    wmbglsq = [None if m is None else {'mbg': m['mbg']} for m in mbglsq]
+
+    # Budget of iterations after which starts are pruned
+    budget = starts['budget']
+    if (budget <= 0) or (budget >= maxiter):
+        budget = None
+
+    results = [{'x': xs[k], 'phi': np.nan, 'nit': 0, 'nfev': 0,
+                'status': 'running', 'tmsg': ''} for k in range(n)]
+
+    # Shared costs of starts at budget and flags of pruned starts
+    costs = mp.Array('d',[np.nan]*n)
+    prune = mp.Array('b',[False]*n)
+
+    # Kinematics sent to worker processes, memory-mapped ones as scratch files
+    kin = [[_funcs.resident_array(array,engine) for array in arrays]
+           for arrays in (strain,rot,dfgrd)]
+    files = [array for arrays in kin for array in arrays
+             if isinstance(array,str)]
+
+    # Cost and stress integration results of best start so far
+    bestcost,bestresults = np.inf,{}
+
+    try:
+        with ProcessPoolExecutor(starts['nproc'],initializer=load_identification,
+                                 initargs=(*kin,rotm,force,time,vol,bg,
+                                           wmbglsq,bcdofs,vfs,nn,ne,dof,ndi,nshr,
+                                           ntens,ncomp,nstatev,nvfs,nf,nt,nprops,
+                                           nvars,props,vars,bounds,constr,nlgeom,
+                                           test,fout,tol,method,wengine,costs,
+                                           prune)) as pool:
+
+            # Run each start once up to maximum number of iterations
+            futures = {}
+            for k in range(n):
+                dirstart = os.path.join(dirout,f'Start{k+1}')
+                kchkpt = dict(chkpt,file=_funcs.checkpoint_file(fout,dirstart))
+                future = pool.submit(identification_start,k,xs[k],maxiter,budget,
+                                     dirstart,kchkpt)
+                futures[future] = k
+
+            # Gather starts as completed, pruning as starts report their cost
+            pending = set(futures)
+            while pending:
+                done,pending = wait(pending,timeout=multistart_poll,
+                                    return_when=FIRST_COMPLETED)
+                for future in done:
+                    k = futures[future]
+                    x,phi,nit,nfev,tmsg,success,kresults = future.result()
+
+                    res = results[k]
+                    res['x'],res['phi'],res['tmsg'] = x,phi,tmsg
+                    res['nit'],res['nfev'] = nit,nfev
+                    res['status'] = 'finished'
+                    if prune[k] and (not success):
+                        res['status'] = 'pruned'
+
+                    # Cost of start finished before budget of iterations
+                    if np.isnan(costs[k]):
+                        cost = np.sum(phi)
+                        costs[k] = np.inf if np.isnan(cost) else cost
+
+                    # Keep stress integration results of best start so far
+                    cost = np.sum(phi)
+                    if cost < bestcost:
+                        _funcs.remove_results(bestresults)
+                        bestcost,bestresults = cost,kresults
+                    else:
+                        _funcs.remove_results(kresults)
+
+                    # Print progress of starting point to screen and log file
+                    _funcs.print_progress_start(k,res['status'],res['nit'],
+                                                res['nfev'],res['phi'],fout,
+                                                dirout)
+
+                # Prune starts trailing best reported cost by more than margin
+                reported = np.array(costs[:])
+                if (budget is not None) and np.isfinite(reported).any():
+                    best = np.min(reported[np.isfinite(reported)])
+                    for k in range(n):
+                        if reported[k] > best + starts['margin']*np.abs(best):
+                            prune[k] = True
+
+        # Keep stress integration results of best start in main process
+        _funcs.keep_worker_results(bestresults,engine)
+        bestresults = {}
+
+    finally:
+        # Remove scratch files of kinematics and results of best start
+        for filename in files:
+            os.remove(filename)
+        _funcs.remove_results(bestresults)
+
+    # Best starting point
+    costs = np.array([np.sum(res['phi']) for res in results])
+    costs[np.isnan(costs)] = np.inf
+    kbest = int(np.argmin(costs))
+    best = results[kbest]
+
+    # Update material properties with best identification variables
+    props[vars] = best['x']
+    fcnprops = _funcs.properties_constraints(np.copy(props),constr)
+
+    # Update sensitivity-based virtual fields with best material properties
+    for t in range(nt):
+        if 'sb' in list(vfs[t].keys()):
+            vfs[t] = _funcs.sensivity_based_virtual_fields(strain[t],rot[t],
+                                                           dfgrd[t],rotm[t],
+                                                           time[t],bg[t],
+                                                           mbglsq[t],
+                                                           bcdofs[t],vfs[t],
+                                                           nn[t],ne[t],dof[t],
+                                                           ndi[t],nshr[t],
+                                                           ntens[t],ncomp[t],
+                                                           nstatev[t],nvfs[t],
+                                                           nf[t],t,nprops,
+                                                           fcnprops,vars,
+                                                           nlgeom,fout,dirout,
+                                                           engine)
+
+    # Write virtual work of best material properties
+    ivw,evw,_,_,_ = _funcs.simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,
+                                      dof,ndi,nshr,ntens,nstatev,nvfs,nf,nt,
+                                      nprops,fcnprops,nlgeom,fout,engine)
+    for t in range(nt):
+        _funcs.write_virtual_work(ivw[t],evw[t],test[t],nvfs[t],nf[t],nt,
+                                  fout,dirout)
+
+    # Write and print summary of starting points
+    write_starts(xs,results,nvars,nt,fout,dirout)
+    _funcs.print_result_multistart(results,kbest,fout,dirout)
+
+    # Print summary of identification results of best starting point to log
+    nfev = np.sum([res['nfev'] for res in results])
+    _funcs.print_result_identification(best['nit'],nfev,best['x'],best['phi'],
+                                       best['tmsg'],nvars,nt,fout,dirout,st)
+
+    return props
\ No newline at end of file
@@ -0,0 +1,404 @@
+import os
+import atexit
+import numpy as np
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor,as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import _funcs
+import _utils
+
+def integration_pool(engine):
+    """
+    Get the persistent pool of processes of stress integration.
+
+    Parameters
+    ----------
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    pool : {'pool','strains','shms','files','exit'} , dict
+        Pool of processes, created on first use and kept in engine settings,
+          strain of each test shared with the processes, shared memory
+          blocks and scratch files holding it, and exit handler shutting it
+          down if the run fails.
+    """
+
+    if engine['pool'] is None:
+        engine['pool'] = {'pool': ProcessPoolExecutor(engine['workers']),
+                          'strains': {}, 'shms': [], 'files': [],
+                          'exit': partial(close_integration_pool,engine)}
+        atexit.register(engine['pool']['exit'])
+
+    return engine['pool']
+
+def close_integration_pool(engine,wait=True):
+    """
+    Shut down the persistent pool of processes of stress integration and
+      release the shared strain.
+
+    Parameters
+    ----------
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    wait : bool
+        Flag to wait for pending blocks of elements (False/True).
+    """
+
+    if engine['pool'] is not None:
+        engine['pool']['pool'].shutdown(wait=wait)
+
+        # Release shared memory blocks and scratch files of strain
+        for shm in engine['pool']['shms']:
+            shm.close()
+            shm.unlink()
+        for filename in engine['pool']['files']:
+            os.remove(filename)
+
+        atexit.unregister(engine['pool']['exit'])
+        engine['pool'] = None
+
+    return
+
+def shared_strain(strain,pool,engine):
+    """
+    Get the strain shared with the pool of processes, sharing the whole
+      strain of the test on first use.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys, or block of increments of it.
+    pool : {'pool','strains','shms','files'} , dict
+        Persistent pool of processes of stress integration.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    source : {'name','file','shape','dtype','inc'} , dict
+        Name of shared memory block or of scratch file of whole strain, its
+          shape and data type, and block of increments of strain.
+
+    Notes
+    -----
+    The whole strain is found from the base arrays of a block of increments.
+      Strain in memory is copied once to a shared memory block, and
+      memory-mapped strain is copied once in blocks of increments to a
+      scratch file mapped by the processes.
+    """
+
+    # Whole strain of test of which strain is a block of increments
+    whole = strain
+    while (isinstance(whole.base,np.ndarray) and
+           (whole.base.shape[1:] == strain.shape[1:]) and
+           (whole.base.strides == strain.strides)):
+        whole = whole.base
+
+    # First increment of block in whole strain
+    offset = (strain.__array_interface__['data'][0] -
+              whole.__array_interface__['data'][0])
+    if (whole.strides[0] == 0) or (offset % whole.strides[0] != 0):
+        whole,offset = strain,0
+    f = offset // max(1,whole.strides[0])
+    inc = slice(f,f+len(strain))
+
+    # Share whole strain on first use, keeping it referenced by the pool
+    key = id(whole)
+    if key not in pool['strains']:
+        if isinstance(whole,np.memmap):
+            name = _funcs.resident_array(whole,engine)
+            pool['files'].append(name)
+        else:
+            shm,array = _utils.shared_array(whole.shape,whole.dtype)
+            array[...] = whole
+            pool['shms'].append(shm)
+            name = shm.name
+        pool['strains'][key] = (whole,{'name': name,
+                                       'file': isinstance(whole,np.memmap),
+                                       'shape': whole.shape,
+                                       'dtype': whole.dtype})
+
+    source = dict(pool['strains'][key][1],inc=inc)
+
+    return source
+
+def element_blocks(ne,nblk):
+    """
+    Split elements into contiguous blocks.
+
+    Parameters
+    ----------
+    ne : int
+        Number of elements.
+    nblk : int
+        Number of blocks.
+
+    Returns
+    -------
+    blocks : (nblk,) , slice
+        Slices of elements of each block.
+    """
+
+    bounds = np.linspace(0,ne,min(nblk,ne)+1).astype(int)
+
+    return [slice(bounds[i],bounds[i+1]) for i in range(len(bounds)-1)]
+
+def integrate_elements(source,names,shapes,dtype,b,blk,props,statev0,ndi,nshr,
+                       ntens,nstatev,nprops,nf,fout,type):
+    """
+    Integrate the stress of a block of elements of a batch member in shared
+      memory.
+
+    Parameters
+    ----------
+    source : {'name','file','shape','dtype','inc'} , dict
+        Name of shared memory block or of scratch file of whole strain, its
+          shape and data type, and block of increments of strain.
+    names : (3,) , str
+        Names of shared memory blocks of stress, statev and de33.
+    shapes : (3,) , tuple
+        Shapes of stress, statev and de33 arrays.
+    dtype : type
+        Data type of shared arrays of results.
+    b : int
+        Batch member of material properties.
+    blk : slice
+        Block of elements.
+    props : (nprops,) or (ne,nprops) , float
+        Material properties of batch member, either common or per element.
+    statev0 : (ne,nstatev) , float
+        Internal state variables of block of elements at start of first
+          increment, or None to start from the undeformed state.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    fout : str
+        Name of output folder.
+    type : str
+        Name of stress integration backend.
+    """
+
+    # Attach to shared arrays
+    shms,arrays = [],[]
+    if source['file']:
+        arrays.append(np.load(source['name'],mmap_mode='r'))
+    else:
+        shm,array = _utils.shared_array(source['shape'],source['dtype'],
+                                        source['name'])
+        shms.append(shm)
+        arrays.append(array)
+    for name,shape in zip(names,shapes):
+        shm,array = _utils.shared_array(shape,dtype,name)
+        shms.append(shm)
+        arrays.append(array)
+
+    try:
+        strain,stress,statev,de33 = arrays
+        strain = strain[source['inc']]
+
+        # Material properties of block
+        if np.ndim(props) == 2:
+            props = props[blk]
+
+        # Stress integration of block of elements
+        ne = blk.stop - blk.start
+        backend = _funcs.stress_backends[type]
+        s,sv,d = backend(strain[:,blk],ne,ndi,nshr,ntens,nstatev,props,nprops,
+                         nf,fout,statev0)
+        stress[b,:,blk],statev[b,:,blk],de33[b,:,blk] = s,sv,d
+
+    finally:
+        # Detach from shared arrays
+        strain = stress = statev = de33 = array = arrays = None
+        for shm in shms:
+            shm.close()
+
+    return
+
+def parallel_batch_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,
+                               nf,fout,engine,statev0=None):
+    """
+    Integrate the stress in corotational material csys for a batch of
+      material properties, with blocks of elements of all batch members
+      distributed over a persistent pool of processes.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nbatch,nprops) or (nbatch,ne,nprops) , float
+        Batch of material properties, either common or per element.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    statev0 : (nbatch,ne,nstatev) , float
+        Internal state variables at start of first increment, or None to
+          start from the undeformed state.
+
+    Returns
+    -------
+    stress : (nbatch,nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nbatch,nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nbatch,nf,ne) , float
+        Strain in thickness direction (plane stress).
+    success : (nbatch,) , bool
+        Sucess of stress integration of each material properties.
+
+    Notes
+    -----
+    The strain of each test is shared once with the pool and kept until the
+      pool is shut down, and all batch members read it. Each member is split
+      in enough blocks of elements to keep all workers busy, and the
+      remaining blocks of a member are cancelled on its first failure.
+    """
+
+    nbatch = len(props)
+
+    # Shapes and data type of shared arrays of results
+    shapes = [(nbatch,nf,ne,ntens),(nbatch,nf,ne,nstatev),(nbatch,nf,ne)]
+    dtype = np.result_type(strain.dtype,np.asarray(props).dtype,float)
+
+    # Allocate results in shared memory
+    shms,arrays = [],[]
+    try:
+        pool = integration_pool(engine)
+        source = shared_strain(strain,pool,engine)
+        for shape in shapes:
+            shm,array = _utils.shared_array(shape,dtype)
+            shms.append(shm)
+            arrays.append(array)
+        names = [shm.name for shm in shms]
+
+        # Submit blocks of elements of each batch member to pool of processes
+        nblk = -(-engine['workers'] // nbatch)
+        futures = {}
+        for b in range(nbatch):
+            for blk in element_blocks(ne,nblk):
+                statevb = None if statev0 is None else statev0[b][blk]
+                future = pool['pool'].submit(integrate_elements,source,names,
+                                             shapes,dtype,b,blk,props[b],
+                                             statevb,ndi,nshr,ntens,nstatev,
+                                             nprops,nf,fout,engine['type'])
+                futures[future] = b
+
+        # Stop remaining blocks of batch member on its first failure
+        success = np.ones(nbatch,dtype=bool)
+        for future in as_completed(futures):
+            b = futures[future]
+            if future.cancelled() or (future.exception() is None):
+                continue
+            if isinstance(future.exception(),BrokenProcessPool):
+                raise future.exception()
+            success[b] = False
+            for other,ob in futures.items():
+                if ob == b:
+                    other.cancel()
+
+        # Gather results from shared memory
+        stress,statev,de33 = [np.array(array) for array in arrays]
+
+    except BrokenProcessPool:
+        # Discard pool after abnormal termination of a process
+        close_integration_pool(engine,wait=False)
+        raise
+
+    finally:
+        array = arrays = None
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    return stress,statev,de33,success
+
+def parallel_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,
+                         fout,engine,statev0=None):
+    """
+    Integrate the stress in corotational material csys with blocks of
+      elements distributed over a persistent pool of processes.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nprops,) or (ne,nprops) , float
+        Material properties, either common or per element.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    statev0 : (ne,nstatev) , float
+        Internal state variables at start of first increment, or None to
+          start from the undeformed state.
+
+    Returns
+    -------
+    stress : (nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nf,ne) , float
+        Strain in thickness direction (plane stress).
+
+    Raises
+    ------
+    Exception
+        If the stress integration fails in any block of elements.
+    """
+
+    # Integrate material properties as batch of one member
+    props = np.asarray(props)[None]
+    if statev0 is not None:
+        statev0 = np.asarray(statev0)[None]
+    stress,statev,de33,success = parallel_batch_integration(strain,ne,ndi,
+                                                            nshr,ntens,
+                                                            nstatev,props,
+                                                            nprops,nf,fout,
+                                                            engine,statev0)
+
+    if not success[0]:
+        raise Exception('stress integration failed in pool of processes')
+
+    return stress[0],statev[0],de33[0]
\ No newline at end of file
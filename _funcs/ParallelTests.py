@@ -0,0 +1,538 @@
+import os
+import atexit
+import tempfile
+import numpy as np
+import multiprocessing as mp
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor,wait,FIRST_COMPLETED
+
+import _funcs
+import _utils
+
+# Kinematics and settings of test resident in worker process
+resident_test = {}
+
+# Number of blocks of elements between checks of abort flag of tests
+abort_element_blocks = 8
+
+def load_test(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
+              nstatev,nvfs,nf,t,engine):
+    """
+    Keep kinematics and settings of one test resident in worker process.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float or str
+        Strain in corotational material csys, or name of its file.
+    rot : (nf,ne,dof,dof) , float or str
+        Rotation tensor, or name of its file.
+    dfgrd : (nf,ne,dof,dof) , float or str
+        Deformation gradient, or name of its file.
+    rotm : (dof,dof) , float
+        Material rotation tensor.
+    force : (nf,dof) , float
+        Global loading force.
+    vol : (ne,) , float
+        Elements volume.
+    vfs : {(nvfs,nf,ne,dof,dof), (nvfs,nf,nn,dof)} , float
+        Settings and generated virtual fields.
+    ne : int
+        Number of elements.
+    dof : int
+        Number of degrees of freedom.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    nvfs : int
+        Number of virtual fields.
+    nf : int
+        Number of increments.
+    t : int
+        Test number.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings of worker process.
+    """
+
+    # Map kinematics in files of memory-mapped arrays
+    strain,rot,dfgrd = [np.load(array,mmap_mode='r') if isinstance(array,str)
+                        else array for array in (strain,rot,dfgrd)]
+
+    resident_test.update({'strain': strain, 'rot': rot, 'dfgrd': dfgrd,
+                          'rotm': rotm, 'force': force, 'vol': vol,
+                          'vfs': vfs, 'ne': ne, 'dof': dof, 'ndi': ndi,
+                          'nshr': nshr, 'ntens': ntens, 'nstatev': nstatev,
+                          'nvfs': nvfs, 'nf': nf, 't': t, 'engine': engine})
+
+    return
+
+def evaluate_test(vfs,nprops,props,nlgeom,fout,best):
+    """
+    Compute the principle of virtual work of the test resident in worker
+      process.
+
+    Parameters
+    ----------
+    vfs : {(nvfs,nf,ne,dof,dof), (nvfs,nf,nn,dof)} or None , float
+        Updated settings and generated virtual fields, or None if unchanged.
+    nprops : int
+        Number of material properties.
+    props : (nprops,) or (nbatch,nprops) , float
+        Material properties, or batch of material properties.
+    nlgeom : bool
+        Flag for small or large deformation framework (0/1).
+    fout : str
+        Name of output folder.
+    best : (nprops,) , float or None
+        Material properties of best evaluation, or None if not available.
+
+    Returns
+    -------
+    ivw : ([nbatch],nvfs,nf) , float
+        Internal virtual work.
+    evw : (nvfs,nf) , float
+        External virtual work.
+    res : ([nbatch],nvfs*nf) , float
+        Cost function residuals for time increments and virtual fields.
+    phi : float or (nbatch,) , float
+        Cost function.
+    success : bool or (nbatch,) , bool
+        Variable to monitor the sucess of stress reconstruction (False/True).
+    """
+
+    # Update virtual fields regenerated in main process
+    if vfs is not None:
+        resident_test['vfs'] = vfs
+
+    r = resident_test
+
+    # Keep results of best evaluation before integrating the next ones
+    if best is not None:
+        _funcs.keep_test_results(r['engine']['store'],best,r['t'],
+                                 r['engine'])
+
+    return _funcs.vfm_core(r['strain'],r['rot'],r['dfgrd'],r['rotm'],
+                           r['force'],r['vol'],r['vfs'],r['ne'],r['dof'],
+                           r['ndi'],r['nshr'],r['ntens'],r['nstatev'],
+                           r['nvfs'],r['nf'],r['t'],nprops,props,nlgeom,fout,
+                           r['engine'])
+
+def test_results(props):
+    """
+    Get stress integration results of the test resident in worker process.
+
+    Parameters
+    ----------
+    props : (nprops,) , float
+        Material properties of best evaluation.
+
+    Returns
+    -------
+    results : {t: {key: (stress,statev,de33)}} , dict
+        Stress integration results of best evaluation of test.
+    """
+
+    r = resident_test
+    store = r['engine']['store']
+
+    _funcs.keep_test_results(store,props,r['t'],r['engine'])
+
+    return resident_results(store,r['engine'])
+
+def abortable_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,
+                          fout,engine,statev0=None):
+    """
+    Integrate the stress in corotational material csys one block of elements
+      at a time, until aborted by the failure of another test.
+
+    See Also
+    --------
+    stress_integration : parameters and returns of stress integration.
+
+    Raises
+    ------
+    Exception
+        If the abort flag of tests is set before the last block of elements.
+    """
+
+    backend = _funcs.stress_backends[engine['type']]
+    dtype = np.result_type(strain.dtype,props.dtype,float)
+
+    # Initialize stress, internal state variables and thickness strain
+    stress = np.zeros((nf,ne,ntens),dtype=dtype)
+    statev = np.zeros((nf,ne,nstatev),dtype=dtype)
+    de33 = np.zeros((nf,ne),dtype=dtype)
+
+    for blk in _funcs.element_blocks(ne,abort_element_blocks):
+
+        # Stop integration when another test failed
+        if engine['abort'].is_set():
+            raise Exception('stress integration aborted')
+
+        # Material properties and initial state variables of block
+        propsb = props[blk] if props.ndim == 2 else props
+        statevb = None if statev0 is None else statev0[blk]
+
+        nb = blk.stop - blk.start
+        s,sv,d = backend(strain[:,blk],nb,ndi,nshr,ntens,nstatev,propsb,nprops,
+                         nf,fout,statevb)
+        stress[:,blk],statev[:,blk],de33[:,blk] = s,sv,d
+
+    return stress,statev,de33
+
+def resident_array(array,engine):
+    """
+    Get array to send to worker process of test.
+
+    Parameters
+    ----------
+    array : (nf,...) , float
+        Array of kinematics of test.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    array : (nf,...) , float or str
+        Array in memory, or name of scratch file to which memory-mapped array
+          is copied in blocks of increments.
+    """
+
+    if not isinstance(array,np.memmap):
+        return array
+
+    # Create scratch file in directory of memory-mapped arrays
+    fd,filename = tempfile.mkstemp(suffix='.npy',dir=engine['dir'])
+    os.close(fd)
+
+    # Copy memory-mapped array in blocks of increments
+    copy = np.lib.format.open_memmap(filename,mode='w+',dtype=array.dtype,
+                                     shape=array.shape)
+    for blk in _utils.increment_blocks(len(array),engine):
+        copy[blk] = array[blk]
+    copy.flush()
+    del copy
+
+    return filename
+
+def resident_results(store,engine):
+    """
+    Get stress integration results of best evaluation in result store of
+      worker process to send to main process.
+
+    Parameters
+    ----------
+    store : {t: {slot: {key: (stress,statev,de33)}}} , dict
+        Store of stress integration results of worker process.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings of worker process.
+
+    Returns
+    -------
+    results : {t: {key: (stress,statev,de33)}} , dict
+        Stress integration results of best evaluation of each test, with
+          arrays in memory or names of scratch files to which memory-mapped
+          arrays are copied.
+    """
+
+    results = {}
+    for t,slots in store.items():
+        results[t] = {key: tuple([resident_array(array,engine)
+                                  for array in value])
+                      for key,value in slots.get('best',{}).items()}
+
+    return results
+
+def keep_worker_results(results,engine):
+    """
+    Keep stress integration results sent by worker process as results of best
+      evaluation of result store.
+
+    Parameters
+    ----------
+    results : {t: {key: (stress,statev,de33)}} , dict
+        Stress integration results of best evaluation of each test, with
+          arrays in memory or names of scratch files.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings.
+
+    Notes
+    -----
+    Scratch files are copied in blocks of increments to arrays allocated in
+      memory or in memory-mapped scratch files, and removed.
+    """
+
+    for t,slot in results.items():
+        kept = {}
+        for key,value in slot.items():
+            arrays = []
+            for array in value:
+                if isinstance(array,str):
+                    filename = array
+                    mapped = np.load(filename,mmap_mode='r')
+                    array = _utils.memory_map(mapped.shape,engine,mapped.dtype)
+                    for blk in _utils.increment_blocks(len(mapped),engine):
+                        array[blk] = mapped[blk]
+                    del mapped
+                    os.remove(filename)
+                arrays.append(array)
+            kept[key] = tuple(arrays)
+        _funcs.result_store_put(engine['store'],t,'best',kept)
+
+    return
+
+def remove_results(results):
+    """
+    Remove scratch files of stress integration results sent by worker process.
+
+    Parameters
+    ----------
+    results : {t: {key: (stress,statev,de33)}} , dict
+        Stress integration results of best evaluation of each test, with
+          arrays in memory or names of scratch files.
+    """
+
+    for slot in results.values():
+        for value in slot.values():
+            for array in value:
+                if isinstance(array,str):
+                    os.remove(array)
+
+    return
+
+def test_pools(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
+               nstatev,nvfs,nf,nt,engine):
+    """
+    Get the persistent worker processes of tests, each one holding the
+      kinematics of one test.
+
+    Parameters
+    ----------
+    strain : (nt, (nf,ne,ntens) ) , float
+        Strain in corotational material csys.
+    rot : (nt, (nf,ne,dof,dof) ) , float
+        Rotation tensor.
+    dfgrd : (nt, (nf,ne,dof,dof) ) , float
+        Deformation gradient.
+    rotm : (nt, (dof,dof) ) , float
+        Material rotation tensor.
+    force : (nt, (nf,dof) ) , float
+        Global loading force.
+    vol : (nt, (ne) ) , float
+        Elements volume.
+    vfs : (nt, {'e': (nvfs,ne,dof*dof), 'u': (nvfs,nn,dof)} ) , float
+        Settings and generated virtual fields.
+    ne : (nt) , int
+        Number of elements.
+    dof : (nt) , int
+        Number of degrees of freedom.
+    ndi : (nt) , int
+        Number of normal tensor components.
+    nshr : (nt) , int
+        Number of shear tensor components.
+    ntens : (nt) , int
+        Number of tensor components.
+    nstatev : (nt) , int
+        Number of internal state variables.
+    nvfs : (nt) , int
+        Number of virtual fields.
+    nf : (nt) , int
+        Number of increments.
+    nt : int
+        Number of tests.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    pools : {'pools','vfs','files','abort','best','exit'} , dict
+        Pool of one process per test, created on first use and kept in engine
+          settings, virtual fields held by each process, scratch files of
+          kinematics, flag shared by the processes to abort their evaluation,
+          material properties of best evaluation and exit handler shutting
+          them down if the run fails.
+
+    Notes
+    -----
+    Each test integrates the stress serially in its own process, with its
+      own cache of stress integration results, checking the abort flag
+      between blocks of elements. Memory-mapped kinematics are
+      sent as names of scratch files mapped by the process, instead of being
+      copied in memory.
+    """
+
+    if engine['testpools'] is None:
+
+        # Flag shared by worker processes to abort their evaluation
+        abort = mp.Event()
+
+        # Engine settings of worker processes
+        wengine = {'nblk': engine['nblk'],
+                   'dir': engine['dir'],
+                   'type': engine['type'],
+                   'workers': 1,
+                   'tests': False,
+                   'pool': None,
+                   'testpools': None,
+                   'abort': abort,
+                   'cache': _funcs.stress_cache(engine['cache']['budget']),
+                   'store': _funcs.result_store()}
+
+        # Start one process per test with its kinematics
+        pools,files = [],[]
+        for t in range(nt):
+            kin = [resident_array(array,engine)
+                   for array in (strain[t],rot[t],dfgrd[t])]
+            files += [array for array in kin if isinstance(array,str)]
+            pools.append(ProcessPoolExecutor(1,initializer=load_test,
+                                             initargs=(*kin,rotm[t],force[t],
+                                                       vol[t],vfs[t],ne[t],
+                                                       dof[t],ndi[t],nshr[t],
+                                                       ntens[t],nstatev[t],
+                                                       nvfs[t],nf[t],t,
+                                                       wengine)))
+
+        engine['testpools'] = {'pools': pools,
+                               'vfs': [vfs[t].get('e') for t in range(nt)],
+                               'files': files, 'abort': abort,
+                               'best': None,
+                               'exit': partial(close_test_pools,engine)}
+        atexit.register(engine['testpools']['exit'])
+
+    return engine['testpools']
+
+def close_test_pools(engine,wait=True):
+    """
+    Shut down the persistent worker processes of tests.
+
+    Parameters
+    ----------
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    wait : bool
+        Flag to wait for pending evaluations of tests (False/True).
+    """
+
+    if engine['testpools'] is not None:
+        for pool in engine['testpools']['pools']:
+            pool.shutdown(wait=wait)
+
+        # Remove scratch files of kinematics
+        for filename in engine['testpools']['files']:
+            os.remove(filename)
+
+        atexit.unregister(engine['testpools']['exit'])
+        engine['testpools'] = None
+
+    return
+
+def parallel_simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,
+                        ntens,nstatev,nvfs,nf,nt,nprops,props,nlgeom,fout,
+                        engine):
+    """
+    Simulation with tests evaluated concurrently in persistent worker
+      processes.
+
+    See Also
+    --------
+    simulation : parameters and returns of simulation.
+
+    Notes
+    -----
+    The virtual fields are sent again to a worker process only when they
+      were regenerated, and are recorded as held by the process once its
+      evaluation succeeds. As in the serial simulation, the remaining tests
+      are abandoned as soon as the stress reconstruction of one test fails:
+      their processes are aborted at their next block of elements, and the
+      abort flag is cleared once they stopped. If the evaluation of a test
+      raises an error, the worker processes are discarded with their
+      scratch files before the error is raised again. The material properties of
+      the best evaluation are sent with the next evaluation, so that each
+      process keeps its stress integration results.
+    """
+
+    ivw,evw,res,phi = [None]*nt,[None]*nt,[None]*nt,[None]*nt
+    success = True
+
+    pools = test_pools(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,
+                       ntens,nstatev,nvfs,nf,nt,engine)
+
+    try:
+        # Submit tests to their worker processes
+        futures = {}
+        for t in range(nt):
+
+            # Send virtual fields only if regenerated since last evaluation
+            tvfs = None
+            if vfs[t].get('e') is not pools['vfs'][t]:
+                tvfs = vfs[t]
+
+            future = pools['pools'][t].submit(evaluate_test,tvfs,nprops,props,
+                                              nlgeom,fout,pools['best'])
+            futures[future] = t
+
+        # Gather tests as completed
+        pending = set(futures)
+        while pending:
+            done,pending = wait(pending,return_when=FIRST_COMPLETED)
+            for future in done:
+                t = futures[future]
+                ivw[t],evw[t],res[t],phi[t],tsuccess = future.result()
+
+                # Virtual fields held by worker process after evaluation
+                pools['vfs'][t] = vfs[t].get('e')
+
+                # Update success of all tests
+                success = success & tsuccess
+
+            # Abort remaining tests if one test is not successful reconstructed
+            if not np.any(success):
+                pools['abort'].set()
+                wait(pending)
+                pools['abort'].clear()
+                break
+
+    except Exception:
+        # Discard worker processes and scratch files of kinematics after the
+        #   failure of a test or abnormal termination of a process, aborting
+        #   the remaining tests
+        pools['abort'].set()
+        close_test_pools(engine,wait=False)
+        raise
+
+    return ivw,evw,res,phi,success
+
+def fetch_test_results(props,nt,engine):
+    """
+    Keep stress integration results of best evaluation of tests evaluated in
+      persistent worker processes in result store of main process.
+
+    Parameters
+    ----------
+    props : (nprops,) , float
+        Material properties of best evaluation.
+    nt : int
+        Number of tests.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings.
+    """
+
+    pools = engine['testpools']
+    if pools is None:
+        return
+
+    futures = [pools['pools'][t].submit(test_results,props) for t in range(nt)]
+    wait(futures)
+
+    # Keep results of all tests before raising the failure of any test
+    for future in futures:
+        if future.exception() is None:
+            keep_worker_results(future.result(),engine)
+    for future in futures:
+        future.result()
+
+    return
\ No newline at end of file
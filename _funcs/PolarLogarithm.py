@@ -0,0 +1,185 @@
+import numpy as np
+
+def symmetric_eigenvalues(tensor):
+    """
+    Compute the eigenvalues of symmetric 2x2 or 3x3 tensors in closed form.
+
+    Parameters
+    ----------
+    tensor : (...,dof,dof) , float
+        Symmetric tensor.
+
+    Returns
+    -------
+    eigv : (...,dof) , float
+        Eigenvalues sorted in descending order.
+
+    Theory
+    ------
+    For 3x3 tensors the eigenvalues are given by the trigonometric solution
+      of the characteristic equation (Smith, 1961) applied to the deviatoric
+      part of the tensor, so that no iterative eigensolver is needed.
+    """
+
+    dof = tensor.shape[-1]
+
+    # 2x2 tensor
+    if dof == 2:
+        m = (tensor[...,0,0] + tensor[...,1,1]) / 2
+        d = np.sqrt(((tensor[...,0,0] - tensor[...,1,1])/2)**2 + tensor[...,0,1]**2)
+        eigv = np.stack((m + d,m - d),-1)
+
+    # 3x3 tensor
+    elif dof == 3:
+        q = (tensor[...,0,0] + tensor[...,1,1] + tensor[...,2,2]) / 3
+
+        # Deviatoric tensor components and norm
+        a00 = tensor[...,0,0] - q
+        a11 = tensor[...,1,1] - q
+        a22 = tensor[...,2,2] - q
+        a01,a02,a12 = tensor[...,0,1],tensor[...,0,2],tensor[...,1,2]
+
+        p = np.sqrt((a00**2 + a11**2 + a22**2 + 2*(a01**2 + a02**2 + a12**2)) / 6)
+        ps = np.where(p > 0,p,1)
+
+        # Half determinant of normalized deviatoric tensor
+        r = (a00*(a11*a22 - a12**2)
+           - a01*(a01*a22 - a12*a02)
+           + a02*(a01*a12 - a11*a02)) / (2*ps**3)
+        phi = np.arccos(np.clip(r,-1,1)) / 3
+
+        # Eigenvalues in descending order
+        eig1 = q + 2*p*np.cos(phi)
+        eig3 = q + 2*p*np.cos(phi + 2*np.pi/3)
+        eig2 = 3*q - eig1 - eig3
+        eigv = np.stack((eig1,eig2,eig3),-1)
+
+    return eigv
+
+def isotropic_tensor_function(tensor,eigv,fcn,dfcn,ddfcn,tol=1e-6):
+    """
+    Evaluate an isotropic function of symmetric tensors by its Newton
+      interpolation polynomial on the eigenvalues.
+
+    Parameters
+    ----------
+    tensor : (...,dof,dof) , float
+        Symmetric tensor.
+    eigv : (...,dof) , float
+        Eigenvalues sorted in descending order.
+    fcn, dfcn, ddfcn : callable
+        Scalar function and its first and second derivatives.
+    tol : float
+        Relative tolerance to treat eigenvalues as coincident.
+
+    Returns
+    -------
+    ftensor : (...,dof,dof) , float
+        Function of tensor.
+
+    Theory
+    ------
+    The function is written as
+        f(A) = f[l1] I + f[l1,l2] (A - l1 I) + f[l1,l2,l3] (A - l1 I)(A - l2 I),
+      where f[...] are the divided differences of f on the eigenvalues. When
+      eigenvalues coincide the divided differences are replaced by the
+      derivatives of f, so repeated eigenvalues need no special treatment.
+    """
+
+    dof = tensor.shape[-1]
+    eye = np.identity(dof)
+
+    # Reference scale of eigenvalues
+    scale = tol * np.maximum(np.abs(eigv[...,0]),1e-300)
+
+    # First divided difference
+    def first_divided_difference(a,b):
+        gap = a - b
+        distinct = gap > scale
+        gap = np.where(distinct,gap,1)
+        return np.where(distinct,(fcn(a) - fcn(b))/gap,dfcn((a + b)/2))
+
+    # Constant and linear terms
+    d1 = first_divided_difference(eigv[...,0],eigv[...,1])
+    a1 = tensor - eigv[...,0,None,None]*eye
+    ftensor = fcn(eigv[...,0])[...,None,None]*eye + d1[...,None,None]*a1
+
+    # Quadratic term
+    if dof == 3:
+        d2 = first_divided_difference(eigv[...,1],eigv[...,2])
+        gap = eigv[...,0] - eigv[...,2]
+        distinct = gap > scale
+        gap = np.where(distinct,gap,1)
+        d12 = np.where(distinct,(d1 - d2)/gap,ddfcn(np.mean(eigv,-1))/2)
+        a12 = a1 @ (tensor - eigv[...,1,None,None]*eye)
+        ftensor = ftensor + d12[...,None,None]*a12
+
+    return ftensor
+
+def polar_logarithm(dfgrd):
+    """
+    Compute the polar decomposition of the deformation gradient and the
+      logarithm of the left stretch tensor in closed form.
+
+    Parameters
+    ----------
+    dfgrd : (nf,ne,dof,dof) , float
+        Deformation gradient.
+
+    Returns
+    -------
+    rot : (nf,ne,dof,dof) , float
+        Rigid-body rotation tensor.
+    strch : (nf,ne,dof,dof) , float
+        Deformation left stretch tensor.
+    lnstrch : (nf,ne,dof,dof) , float
+        Logarithm of left stretch tensor.
+
+    Notes
+    -----
+    nf : int
+        Number of increments.
+    ne : int
+        Number of elements.
+
+    See Also
+    --------
+    polar_decomposition : polar decomposition by singular value decomposition.
+
+    Theory
+    ------
+    The left Cauchy-Green tensor B = FF' = V^2 is symmetric, so that
+        V = B^(1/2), V^(-1) = B^(-1/2), ln(V) = ln(B)/2 and R = V^(-1)F
+      are all isotropic functions of B evaluated from its closed-form
+      eigenvalues, avoiding matrix inversions and general eigensolvers.
+    """
+
+    # Left Cauchy-Green deformation tensor
+    b = dfgrd @ np.swapaxes(dfgrd,-1,-2)
+    b = (b + np.swapaxes(b,-1,-2)) / 2
+
+    # Eigenvalues of left Cauchy-Green deformation tensor
+    eigv = symmetric_eigenvalues(b)
+
+    # Left stretch tensor
+    strch = isotropic_tensor_function(b,eigv,
+                                      lambda x: np.sqrt(x),
+                                      lambda x: 0.5/np.sqrt(x),
+                                      lambda x: -0.25/x**1.5)
+
+    # Inverse of left stretch tensor
+    strchinv = isotropic_tensor_function(b,eigv,
+                                         lambda x: 1/np.sqrt(x),
+                                         lambda x: -0.5/x**1.5,
+                                         lambda x: 0.75/x**2.5)
+
+    # Logarithm of left stretch tensor
+    lnstrch = isotropic_tensor_function(b,eigv,
+                                        lambda x: 0.5*np.log(x),
+                                        lambda x: 0.5/x,
+                                        lambda x: -0.5/x**2)
+
+    # Rigid-body rotation tensor
+    rot = strchinv @ dfgrd
+
+    return rot,strch,lnstrch
\ No newline at end of file
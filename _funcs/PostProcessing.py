@@ -4,8 +4,8 @@ import _funcs
 import _utils
 
 def post_processing(coord,displ,conn,strain,rot,dfgrd,vol,time,rotm,vfs,ne,dof,
-                    ndi,nshr,ntens,ncomp,nstatev,nvfs,nf,test,nt,nprops,props,
-                    vars,nlgeom,fout,dirout,vfsu):
+                    ndi,nshr,ntens,ncomp,nstatev,nvfs,nf,t,test,nt,nprops,
+                    props,vars,nlgeom,fout,dirout,vfsu,output,engine):
     """
     Post-processing of best solution data and export. 
 
@@ -49,6 +49,8 @@ def post_processing(coord,displ,conn,strain,rot,dfgrd,vol,time,rotm,vfs,ne,dof,
         Number of virtual fields.
     nf : int
         Number of increments.
+    t : int
+        Test number.
     ivfs : {'ud' or 'sb'} , dict
         List of selected virtual fields.
     test : str
@@ -67,39 +69,98 @@ def post_processing(coord,displ,conn,strain,rot,dfgrd,vol,time,rotm,vfs,ne,dof,
         Name of output folder.
     dirout : str
         Directory of project to export output files.
+    vfsu : (nvfs,1,nn,dof) or None , float
+        User-defined virtual displacements, None for sensitivity-based
+          virtual fields.
+    output : {'precision','fields','every','increments'} , dict
+        Export settings.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings.
+
+    Notes
+    -----
+    The stress of the best solution is taken from the result store of the
+      engine settings when kept from the last or best evaluation of the
+      simulation or identification, without integrating the stress again.
+      The stress sensitivities are taken from the result store when the last
+      stress sensitivity of the test was computed at the best solution, or
+      else from the cache within its memory budget.
     """
 
+    # Exported fields and increments
+    fields = output['fields']
+    incs = _funcs.export_increments(output,nf,test)
+    nfo = len(incs)
+
     # Compute stress sensitivities of best solution
     ss,iss = None,None
-    if 'sb' in list(vfs.keys()):
+    if ('sb' in list(vfs.keys())) and ('ss' in fields):
         ss,iss = _funcs.stress_sensitivity(strain,rot,dfgrd,rotm,time,
-                                           vfs['sb']['dx'],ne,dof,ndi,nshr,
-                                           ntens,ncomp,nstatev,nf,nprops,
-                                           props,vars,nvfs,nlgeom,fout,0)
+                                           vfs['sb'],ne,dof,ndi,nshr,
+                                           ntens,ncomp,nstatev,nf,t,nprops,
+                                           props,vars,nvfs,nlgeom,fout,dirout,
+                                           engine,0)
+        ss,iss = ss[:,incs],iss[:,incs]
+
+    # Compute cauchy stress of best solution if any stress field is exported
+    stress,statev,de33 = None,None,None
+    if any(field in fields for field in ['s','peeq','pe','pk','de33']):
+        stress,statev,de33,_ = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,
+                                                    nshr,ntens,nstatev,nf,t,
+                                                    nprops,props,fout,engine,
+                                                    voigt=False)
+
+    # Initialize output fields of best solution at exported increments
+    pstrain,pkstress,stressv,straing = None,None,None,None
+    if 'pe' in fields:
+        pstrain = _utils.memory_map((nfo,ne,ntens),engine)
+    if 'pk' in fields:
+        pkstress = _utils.memory_map((nfo,ne,dof,dof),engine)
+    if 's' in fields:
+        stressv = _utils.memory_map((nfo,ne,ntens),engine)
+    if 'le' in fields:
+        straing = _utils.memory_map((nfo,ne,ntens),engine)
+
+    # Loop over blocks of exported increments
+    for blk in _utils.increment_blocks(nfo,engine):
+
+        # Number and indices of increments in block
+        nb = blk.stop - blk.start
+        inc = incs[blk]
 
-    # Compute cauchy stress of best solution
-    stress,statev,de33,_ = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,
-                                                nshr,ntens,nstatev,nf,nprops,
-                                                props,fout,voigt=False)
+        # Rotate plastic strain to global csys
+        if pstrain is not None:
+            pstrain[blk] = _utils.rotate_tensor(statev[inc,...,1:],rot[inc],
+                                                rotm,ne,dof,ndi,ntens,nb,dir=1,
+                                                voigt=True,eng=True)
 
-    # Rotate plastic strain to global csys
-    pstrain = _utils.rotate_tensor(statev[...,1:],rot,rotm,ne,dof,ndi,
-                                   ntens,nf,dir=1,voigt=True,eng=True)
+        # Compute 1st piola-kirchhoff stress of best solution
+        if pkstress is not None:
+            pkstress[blk] = _funcs.piola_kirchhoff_stress(stress[inc],
+                                                          de33[inc],
+                                                          dfgrd[inc],ne,dof,
+                                                          nb,flat=False)
 
-    # Compute 1st piola-kirchhoff stress of best solution
-    pkstress = _funcs.piola_kirchhoff_stress(stress,de33,dfgrd,ne,dof,
-                                             nf,flat=False)
+        # Convert cauchy stress to voigt form
+        if stressv is not None:
+            stressv[blk] = _utils.tensor_to_voigt(stress[inc],ne,ndi,ntens,nb)
 
-    # Convert cauchy stress to voigt form
-    stress = _utils.tensor_to_voigt(stress,ne,ndi,ntens,nf)
+        # Rotate strain to global csys
+        if straing is not None:
+            straing[blk] = _utils.rotate_tensor(strain[inc],rot[inc],rotm,ne,
+                                                dof,ndi,ntens,nb,dir=1,
+                                                voigt=True,eng=True)
 
-    # Rotate strain to global csys
-    strain = _utils.rotate_tensor(strain,rot,rotm,ne,dof,ndi,ntens,nf,
-                                  dir=1,voigt=True,eng=True)
+    # Equivalent plastic strain and thickness strain at exported increments
+    peeq,de33o = None,None
+    if 'peeq' in fields:
+        peeq = statev[incs,...,0]
+    if ('de33' in fields) and (dof == 2):
+        de33o = de33[incs]
 
     # Export model of best solution to paraview
-    _funcs.export_paraview(coord,displ,conn,strain,vol,stress,statev[...,0],
-                           pstrain,de33,pkstress,vfs,ss,iss,ne,dof,nvfs,nf,
-                           test,nt,fout,dirout,vfsu)
+    _funcs.export_paraview(coord,displ,conn,straing,vol,stressv,peeq,pstrain,
+                           de33o,pkstress,vfs,ss,iss,ne,dof,nvfs,nf,test,nt,
+                           fout,dirout,vfsu,incs,output)
 
     return
\ No newline at end of file
@@ -1,5 +1,7 @@
 import os
 import sys
+import json
+import time
 import numpy as np
 
 spc = ' '
@@ -20,26 +22,28 @@ def open_log_file(fout,dirout,mode='a'):
 
     return open(os.path.join(dirout,f'{fout}.log'),mode)
 
-def print_iteration(it,fout,dirout):
+# Minimum time in seconds between progress updates in command window
+console_interval = 0.5
+
+def event_log_file(fout,dirout):
+
+    return os.path.join(dirout,f'{fout}_Events.jsonl')
+
+def format_iteration(it):
     """
-    Print and write iteration header to command window and log file.
+    Format iteration header of identification progress.
 
     Parameters
     ----------
     it : int
         Iteration number.
-    fout : str
-        Name of output folder.
-    dirout : str
-        Directory of project to export output files.
-    """
 
-    # Open log file
-    flog = open_log_file(fout,dirout)
-
-    print_write('\n',flog)
+    Returns
+    -------
+    out : str
+        Iteration header.
+    """
 
-    # Print iteration header
     if it == 0:
         ithead = f' Initial '
         lit = -3
@@ -49,21 +53,19 @@ def print_iteration(it,fout,dirout):
 
     sep = '-'*len(ithead)
 
-    print_write(f'{spc*(15-lit)}{sep}',flog)
-    print_write(f'{spc*(15-lit)}{ithead}',flog)
+    out = '\n\n'
+    out += f'{spc*(15-lit)}{sep}\n'
+    out += f'{spc*(15-lit)}{ithead}\n'
     if it == 0:
-        print_write(f'{spc*(15-lit)}{sep}',flog,end='')
+        out += f'{spc*(15-lit)}{sep}'
     else:
-        print_write(f'{spc*(15-lit)}{sep}\n',flog)
+        out += f'{spc*(15-lit)}{sep}\n\n'
 
-    # Close log file
-    close_log_file(flog)
+    return out
 
-    return
-
-def print_progress(it,fevit,x,phi,nvars,nt,fout,dirout,type):
+def format_progress(it,fevit,x,phi,nvars,nt):
     """
-    Print and write identification progress to command window and log file.
+    Format identification progress of a function evaluation or iteration.
 
     Parameters
     ----------
@@ -79,17 +81,60 @@ def print_progress(it,fevit,x,phi,nvars,nt,fout,dirout,type):
         Number of identification variables.
     nt : int
         Number of tests.
+
+    Returns
+    -------
+    out : str
+        Identification progress.
+    """
+
+    out = ''
+
+    # Current number of evaluations in iteration
+    if it > 0:
+        lfeit = len(str(fevit))
+        out += f'  Evaluations {spc*(13-lfeit)}{fevit}'
+
+    # Variables
+    out += f'\n\n  Variables\n\n'
+    for i in range(nvars):
+        vl = len(str(i+1))
+        out += f'  {i+1}{spc*(5+vl)}{x[i]:{fmt}}\n'
+
+    # Cost function, nan for all tests if stress reconstruction fails
+    phi = np.broadcast_to(phi,(nt,))
+    if nt > 1:
+        out += f'\n  Cost\n\n'
+        for i in range(nt):
+            cl = len(str(i+1))
+            out += f'  {i+1}{spc*(5+cl)}{phi[i]:{fmt}}\n'
+
+        out += f' \n  Total  {np.sum(phi):{fmt}}\n'
+    else:
+        out += f'\n  Cost{spc*3}{np.sum(phi):{fmt}}\n'
+
+    return out
+
+def open_event_log(nvars,nt,fout,dirout):
+    """
+    Open the event log of identification progress for the whole run.
+
+    Parameters
+    ----------
+    nvars : int
+        Number of identification variables.
+    nt : int
+        Number of tests.
     fout : str
         Name of output folder.
     dirout : str
         Directory of project to export output files.
-    """
 
-    # Open log file for read
-    flog = open_log_file(fout,dirout,mode='r+')
-
-    # Read log file contents
-    fdata = flog.readlines()
+    Returns
+    -------
+    elog : {'file','fout','dirout','cursor','last','shown','up'} , dict
+        Line-buffered event log, and state of progress in command window.
+    """
 
     # Set number of lines to bring cursor up
     if nt > 1:
@@ -97,50 +142,175 @@ def print_progress(it,fevit,x,phi,nvars,nt,fout,dirout,type):
     else:
         cursor = 6 + nvars
 
-    # Write log file contents without last evaluation
-    if fevit != 1 and (not (fevit == 2 and it == 1)):
+    elog = {'file': open(event_log_file(fout,dirout),'a',buffering=1),
+            'fout': fout,
+            'dirout': dirout,
+            'cursor': cursor,
+            'last': -np.inf,
+            'shown': None,
+            'up': False}
 
-        # Open log file for write
-        flog = open_log_file(fout,dirout,mode='w')
+    return elog
 
-        # Write log file contents up to cursor line
-        flog.writelines(fdata[:-cursor])
+def print_progress(it,fevit,x,phi,nvars,nt,elog,type):
+    """
+    Append identification progress to event log and print it to command
+      window at a limited rate.
 
-    # Open log file for append
-    flog = open_log_file(fout,dirout,mode='a')
+    Parameters
+    ----------
+    it : int
+        Iteration number.
+    fevit : int
+        Current number of function evaluations in iteration.
+    x : (nvars,) , float
+        Current iteration identification variables.
+    phi : (nt,) , float
+        Current iteratiom cost function.
+    nvars : int
+        Number of identification variables.
+    nt : int
+        Number of tests.
+    elog : {'file','fout','dirout','cursor','last','shown','up'} , dict
+        Event log of identification progress.
+    type : str
+        Type of progress, function evaluation or iteration ('fe'/'it').
+    """
 
-    # Print current number of evaluations in iteration
-    if it > 0:
-        lfeit = len(str(fevit))
-        feithead = f'  Evaluations {spc*(13-lfeit)}{fevit}'
-        print_write(feithead,flog,end='')
+    # Append progress event as one json line
+    event = {'type': type,
+             'it': it,
+             'fevit': fevit,
+             'x': np.asarray(x,dtype=float).tolist(),
+             'phi': np.broadcast_to(phi,(nt,)).astype(float).tolist()}
+    elog['file'].write(json.dumps(event)+'\n')
 
-    # Print variables
-    varhead = f'\n\n  Variables\n'
-    print_write(varhead,flog)
-    for i in range(nvars):
-        vl = len(str(i+1))
-        var = f' {i+1}{spc*(5+vl)}{x[i]:{fmt}}'
-        print_write(f' {var}',flog)
+    # Print progress at limited rate, and always close an updated iteration
+    now = time.perf_counter()
+    if (now - elog['last'] < console_interval) and \
+       (not ((type == 'it') and elog['up'])):
+        return
 
-    # Print cost function
-    if nt > 1:
-        costhead = f'\n  Cost\n'
-        print_write(costhead,flog)
-        for i in range(nt):
-            cl = len(str(i+1))
-            cost = f' {i+1}{spc*(5+cl)}{phi[i]:{fmt}}'
-            print_write(f' {cost}',flog)
+    # Print iteration header
+    out = ''
+    if elog['shown'] != it:
+        out += format_iteration(it)
+        elog['shown'] = it
 
-        cost = f'\n  Total  {np.sum(phi):{fmt}}'
-        print_write(f' {cost}',flog)
-    else:
-        costhead = f'\n  Cost{spc*3}{np.sum(phi):{fmt}}'
-        print_write(costhead,flog)
+    out += format_progress(it,fevit,x,phi,nvars,nt)
+    sys.stdout.write(out)
 
     # Move console cursor to evaluations line during iteration
-    if (it > 0) and (type == 'fe'):
-        sys.stdout.write("\033[F"*cursor)
+    elog['up'] = (it > 0) and (type == 'fe')
+    if elog['up']:
+        sys.stdout.write("\033[F"*elog['cursor'])
+
+    sys.stdout.flush()
+    elog['last'] = now
+
+    return
+
+def render_event_log(nvars,nt,fout,dirout):
+    """
+    Render identification progress of event log in log file format.
+
+    Parameters
+    ----------
+    nvars : int
+        Number of identification variables.
+    nt : int
+        Number of tests.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+
+    Returns
+    -------
+    out : str
+        Iteration headers and last progress of each iteration.
+    """
+
+    out = ''
+    if not os.path.isfile(event_log_file(fout,dirout)):
+        return out
+
+    # Keep last event of each iteration
+    last = {}
+    with open(event_log_file(fout,dirout),'r') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break
+            last[event['it']] = event
+
+    for it,event in last.items():
+        out += format_iteration(it)
+        out += format_progress(it,event['fevit'],event['x'],
+                               np.array(event['phi']),nvars,nt)
+
+    return out
+
+def close_event_log(elog,nvars,nt):
+    """
+    Close the event log of identification progress and render it to log
+      file.
+
+    Parameters
+    ----------
+    elog : {'file','fout','dirout','cursor','last','shown','up'} , dict
+        Event log of identification progress.
+    nvars : int
+        Number of identification variables.
+    nt : int
+        Number of tests.
+    """
+
+    elog['file'].close()
+
+    # Move console cursor below progress of last iteration
+    if elog['up']:
+        sys.stdout.write(f"\033[{elog['cursor']}B")
+        elog['up'] = False
+
+    # Append rendered progress to log file
+    flog = open_log_file(elog['fout'],elog['dirout'])
+    flog.write(render_event_log(nvars,nt,elog['fout'],elog['dirout']))
+    close_log_file(flog)
+
+    return
+
+def print_progress_start(k,status,nit,nfev,phi,fout,dirout):
+    """
+    Print and write progress of a starting point of multi-start
+      identification to command window and log file.
+
+    Parameters
+    ----------
+    k : int
+        Starting point number.
+    status : str
+        Status of starting point (running/finished).
+    nit : int
+        Number of iterations.
+    nfev : int
+        Number of function evaluations.
+    phi : (nt,) , float
+        Best cost function of starting point.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    # Open log file
+    flog = open_log_file(fout,dirout)
+
+    # Print iterations, evaluations and total cost function of starting point
+    starthead = (f'  Start {k+1:<4d}{status:<10s}{nit:>6d} it {nfev:>8d} fe'
+                 f'{spc*3}{np.sum(phi):{fmt}}')
+    print_write(starthead,flog)
 
     # Close log file
     close_log_file(flog)
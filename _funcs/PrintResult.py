@@ -55,15 +55,6 @@ def print_result_identification(nit,nfev,bestx,bestphi,tmsg,nvars,nt,fout,
     # Open log file
     f = open(os.path.join(dirout,f'{fout}.log'),'a')
 
-    # Set number of lines to bring cursor up
-    if nt > 1:
-        cursor = 6 + nvars + 3 + nt
-    else:
-        cursor = 6 + nvars
-
-    # Move console cursor to evaluations line during iteration
-    sys.stdout.write(f"\033[{cursor}B")
-
     print_write('\n',f)
 
     # Print summary header
@@ -117,6 +108,114 @@ def print_result_identification(nit,nfev,bestx,bestphi,tmsg,nvars,nt,fout,
 
     return
 
+def print_result_cache(cache,fout,dirout):
+    """
+    Print and write usage of stress integration cache to command window and
+      log file.
+
+    Parameters
+    ----------
+    cache : {'entries','nbytes','budget','hits','misses'} , dict
+        Stress integration cache.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    if cache['budget'] <= 0:
+        return
+
+    # Open log file
+    f = open(os.path.join(dirout,f'{fout}.log'),'a')
+
+    # Print cache hits, misses and size
+    size = cache['nbytes'] / 1024**2
+    cachehead = (f'\n  Stress Cache : {cache["hits"]} hits, '
+                 f'{cache["misses"]} misses ({size:.1f} MB)')
+    print_write(cachehead,f)
+
+    # Close log file
+    f.close()
+
+    return
+
+def print_result_refresh(state,nt,fout,dirout):
+    """
+    Print and write refresh events of sensitivity-based virtual fields to
+      command window and log file.
+
+    Parameters
+    ----------
+    state : (nt, {'it','nrefresh','nskip','saved'} or None ) , dict
+        Refresh state of sensitivity-based virtual fields of each test.
+    nt : int
+        Number of tests.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    # Open log file
+    f = open(os.path.join(dirout,f'{fout}.log'),'a')
+
+    # Print refreshes, skipped refreshes and time saved of each test
+    for t in range(nt):
+        if state[t] is not None:
+            sb = state[t]
+            refreshhead = (f'\n  Test {t+1} Virtual Fields : '
+                           f'{sb["nrefresh"]} refreshes, {sb["nskip"]} '
+                           f'skipped ({convert_time(sb["saved"])} saved)')
+            print_write(refreshhead,f)
+
+    # Close log file
+    f.close()
+
+    return
+
+def print_result_multistart(results,kbest,fout,dirout):
+    """
+    Print and write summary of starting points of multi-start identification
+      to command window and log file.
+
+    Parameters
+    ----------
+    results : (n, {'x','phi','nit','nfev','status'} ) , dict
+        Results of identification of each starting point.
+    kbest : int
+        Best starting point.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    # Open log file
+    f = open(os.path.join(dirout,f'{fout}.log'),'a')
+
+    print_write('\n',f)
+
+    # Print summary header
+    ithead = f' Starts '
+    sep = '-'*len(ithead)
+    print_write(f'{spc*18}{sep}',f)
+    print_write(f'{spc*18}{ithead}',f)
+    print_write(f'{spc*18}{sep}\n',f)
+
+    # Print status, iterations, evaluations and cost of each starting point
+    for k,res in enumerate(results):
+        best = '*' if k == kbest else ' '
+        starthead = (f' {best}Start {k+1:<4d}{res["status"]:<10s}'
+                     f'{res["nit"]:>6d} it {res["nfev"]:>8d} fe'
+                     f'{spc*3}{np.sum(res["phi"]):{fmt}}')
+        print_write(starthead,f)
+
+    # Close log file
+    f.close()
+
+    return
+
 def print_result_simulation(phi,nt,fout,dirout,st):
     """
     Print and write results to command window and log file.
@@ -49,4 +49,29 @@ def print_start(prjname,fout,dirout):
         print(stime)
         f.write(f'\n{stime}')
 
-    return st
\ No newline at end of file
+    return st
+
+def print_ingest(t,size,dt,fout,dirout):
+    """
+    Print and write displacements ingest throughput to log file.
+
+    Parameters
+    ----------
+    t : int
+        Test number.
+    size : float
+        Size of displacements files in MB.
+    dt : float
+        Time of loading in seconds.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    with open(os.path.join(dirout,f'{fout}.log'),'a') as f:
+        ingest = f'  Displacements Test {t+1} : {size:.1f} MB in {dt:.2f} s ({size/dt:.1f} MB/s)'
+        print(ingest)
+        f.write(f'\n{ingest}')
+
+    return
\ No newline at end of file
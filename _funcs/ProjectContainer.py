@@ -0,0 +1,244 @@
+import os
+import zipfile
+import numpy as np
+
+import _funcs
+import _utils
+
+def find_container(filesdir):
+    """
+    Find single-file container of test data.
+
+    Parameters
+    ----------
+    filesdir : str
+        Test data files directory and prefix.
+
+    Returns
+    -------
+    filename : str or None
+        Container file of test data, or None if not found.
+    """
+
+    for ext in ['h5','npz']:
+        filename = f'{filesdir}.{ext}'
+        if os.path.isfile(filename):
+            return filename
+
+    return None
+
+def read_npz_displacements(filename,engine):
+    """
+    Read nodal displacements of NPZ container in blocks of increments.
+
+    Parameters
+    ----------
+    filename : str
+        Container file of test data.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    displ : (nf,nn,dof) , float
+        Nodal displacements, in memory or memory-mapped file.
+
+    Notes
+    -----
+    The displacements array is read sequentially from its member of the
+      archive, compressed or not, so that only one block of increments is
+      held in memory at a time.
+    """
+
+    with zipfile.ZipFile(filename) as z, z.open('displacement.npy') as f:
+
+        # Read header of displacements array
+        version = np.lib.format.read_magic(f)
+        if version == (1,0):
+            shape,fortran,dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape,fortran,dtype = np.lib.format.read_array_header_2_0(f)
+
+        if fortran or (len(shape) != 3):
+            _utils.error(f'displacement of {os.path.basename(filename)} must be a C-ordered array of shape (increments, nodes, dof).')
+
+        # Copy nodal displacements in blocks of increments
+        nbytes = int(np.prod(shape[1:])) * dtype.itemsize
+        displ = _utils.memory_map(shape,engine)
+        for blk in _utils.increment_blocks(shape[0],engine):
+            nb = blk.stop - blk.start
+            array = np.frombuffer(f.read(nb*nbytes),dtype=dtype)
+            displ[blk] = array.reshape((nb,)+tuple(shape[1:]))
+
+    return displ
+
+def read_container(filename,t,engine):
+    """
+    Read raw test data from single-file HDF5 or NPZ container.
+
+    Parameters
+    ----------
+    filename : str
+        Container file of test data.
+    t : int
+        Test number.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    data : {'time','thk','ori','force','nodes','coord','conn','displ'}
+        Raw test data.
+    """
+
+    data = {}
+
+    # HDF5 container
+    if filename.endswith('.h5'):
+        try:
+            import h5py
+        except ImportError:
+            _utils.error('h5py is required to read HDF5 project files.')
+
+        with h5py.File(filename,'r') as f:
+
+            # Load time increments, thickness, orientation and forces
+            data['time'] = f['time'][...]
+            data['thk'] = float(f['thickness'][()])
+            data['ori'] = float(f['orientation'][()])
+            data['force'] = f['force'][...]
+
+            # Load nodes labels, reference coordinates and connectivity
+            data['nodes'] = f['nodes'][...]
+            data['coord'] = f['coord'][...]
+            data['conn'] = f['elements'][...]
+
+            # Load nodes labels of nodal displacements
+            dnodes = f['displacement_nodes'][...]
+
+            # Load nodal displacements in blocks of increments
+            dset = f['displacement']
+            nf = dset.shape[0]
+            data['displ'] = _utils.memory_map(dset.shape,engine)
+            for blk in _utils.increment_blocks(nf,engine):
+                data['displ'][blk] = dset[blk]
+
+    # NPZ container
+    elif filename.endswith('.npz'):
+        with np.load(filename,allow_pickle=False) as f:
+            data['time'] = f['time']
+            data['thk'] = float(f['thickness'])
+            data['ori'] = float(f['orientation'])
+            data['force'] = f['force']
+            data['nodes'] = f['nodes']
+            data['coord'] = f['coord']
+            data['conn'] = f['elements']
+            dnodes = f['displacement_nodes']
+
+            # Load nodal displacements in memory
+            if engine['nblk'] is None:
+                data['displ'] = f['displacement']
+
+        # Load nodal displacements in blocks of increments
+        if engine['nblk'] is not None:
+            data['displ'] = read_npz_displacements(filename,engine)
+
+    # Check if nodes ordering of displacements is equal to nodes
+    if not np.array_equal(dnodes,data['nodes']):
+        _utils.error(f'nodes of displacements do not match nodes in container of test {t+1}.')
+
+    # Check if displacements are given for all increments, nodes and dof
+    shape = (len(data['time']),len(data['nodes']),data['coord'].shape[1])
+    if data['displ'].shape != shape:
+        _utils.error(f'displacements of shape {data["displ"].shape} do not match increments, nodes and dof {shape} in container of test {t+1}.')
+
+    return data
+
+def write_container(filename,data,engine):
+    """
+    Write raw test data to single-file HDF5 or NPZ container.
+
+    Parameters
+    ----------
+    filename : str
+        Container file of test data.
+    data : {'time','thk','ori','force','nodes','coord','conn','displ'}
+        Raw test data.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    """
+
+    # Datasets names
+    dsets = {'time': data['time'],
+             'thickness': data['thk'],
+             'orientation': data['ori'],
+             'force': data['force'],
+             'nodes': data['nodes'],
+             'displacement_nodes': data['nodes'],
+             'coord': data['coord'],
+             'elements': data['conn']}
+
+    # HDF5 container
+    if filename.endswith('.h5'):
+        try:
+            import h5py
+        except ImportError:
+            _utils.error('h5py is required to write HDF5 project files.')
+
+        with h5py.File(filename,'w') as f:
+            for name in dsets:
+                f.create_dataset(name,data=dsets[name])
+
+            # Write nodal displacements chunked along increments
+            nf,nn,dof = data['displ'].shape
+            dset = f.create_dataset('displacement',shape=(nf,nn,dof),
+                                    dtype=float,chunks=(1,nn,dof))
+            for blk in _utils.increment_blocks(nf,engine):
+                dset[blk] = data['displ'][blk]
+
+    # NPZ container
+    elif filename.endswith('.npz'):
+        with open(filename,'wb') as f:
+            np.savez(f,displacement=data['displ'],**dsets)
+
+    return
+
+def convert_project(prjnm,test,nt,fmt,engine):
+    """
+    Convert per-increment CSV files of project tests to single-file containers.
+
+    Parameters
+    ----------
+    prjnm : str
+        Name of current project.
+    test : (nt,) , str
+        List of tests name.
+    nt : int
+        Number of tests.
+    fmt : str
+        Format of container ('h5' or 'npz').
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    """
+
+    if fmt not in ['h5','npz']:
+        _utils.error(f'container format {fmt} not available (h5 or npz).')
+
+    # Set project directory
+    dir = os.path.join(os.getcwd(),'input',prjnm)
+
+    for t in range(nt):
+
+        # Set files test directory
+        filesdir = os.path.join(dir,test[t],test[t])
+
+        # Load raw test data from CSV files
+        data = _funcs.load_csv(filesdir,t,engine)
+
+        # Write raw test data to container
+        filename = f'{filesdir}.{fmt}'
+        write_container(filename,data,engine)
+
+        print(f'  Test {t+1} : {filename}')
+
+    return
\ No newline at end of file
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+
+def refresh_state(vfs,nt):
+    """
+    Initialize refresh state of sensitivity-based virtual fields of each test.
+
+    Parameters
+    ----------
+    vfs : (nt,{'ud' or 'sb'}) , dict
+        Settings and generated virtual fields.
+    nt : int
+        Number of tests.
+
+    Returns
+    -------
+    state : (nt, {'it','nrefresh','nskip','saved'} or None ) , dict
+        Iteration of last refresh, number of refreshes and skipped
+          refreshes, and time saved by skipped refreshes of each test with
+          sensitivity-based virtual fields.
+    """
+
+    state = [None]*nt
+    for t in range(nt):
+        if 'sb' in list(vfs[t].keys()):
+            state[t] = {'it': 0, 'nrefresh': 0, 'nskip': 0, 'saved': 0.0}
+
+    return state
+
+def refresh_virtual_fields(x,it,vfs,state):
+    """
+    Check refresh policy of sensitivity-based virtual fields.
+
+    Parameters
+    ----------
+    x : (nvars,) , float
+        Current identification variables.
+    it : int
+        Iteration number.
+    vfs : {'sb','e','u','x','time'} , dict
+        Settings and generated virtual fields, with identification variables
+          and time of their generation.
+    state : {'it','nrefresh','nskip','saved'} , dict
+        Refresh state of sensitivity-based virtual fields.
+
+    Returns
+    -------
+    refresh : bool
+        Flag to recompute sensitivity-based virtual fields (False/True).
+    change : float
+        Maximum relative change of identification variables since last
+          refresh.
+    """
+
+    sb = vfs['sb']
+
+    # Maximum relative change of identification variables since last refresh
+    xref = vfs['x']
+    change = np.max(np.abs(x - xref) / np.maximum(np.abs(xref),1e-30))
+
+    # Refresh when change exceeds tolerance or after given iterations
+    refresh = change > sb['rtol']
+    if (sb['nevery'] > 0) and (it - state['it'] >= sb['nevery']):
+        refresh = True
+
+    # Update refresh counters and time saved by skipped refreshes
+    if refresh:
+        state['it'] = it
+        state['nrefresh'] += 1
+    else:
+        state['nskip'] += 1
+        state['saved'] += vfs['time']
+
+    return refresh,change
+
+def write_refresh_rows(rows,fout,dirout):
+    """
+    Write a batch of refresh events of sensitivity-based virtual fields.
+
+    Parameters
+    ----------
+    rows : (nrows, (it,t,refresh,change,time,saved) ) , tuple
+        Iteration number, test number, flag of recomputed virtual fields,
+          maximum relative change of identification variables since last
+          refresh, time of last generation and time saved by skipped
+          refreshes of each event.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
+    # Set output directory
+    fname = os.path.join(dirout,f'{fout}_Refresh.csv')
+
+    fmt = ['%d','%d','%d','%.12e','%.6e','%.6e']
+    louts = [[it,t+1,int(refresh),change,time,saved]
+             for it,t,refresh,change,time,saved in rows]
+
+    # If first event create file with header
+    if not os.path.exists(fname):
+        head = 'it;test;refresh;change;time;saved'
+        np.savetxt(fname,louts,header=head,fmt=fmt,delimiter=';',comments='')
+
+    # Append subsequent events
+    else:
+        with open(fname,'a') as f:
+            np.savetxt(f,louts,fmt=fmt,delimiter=';')
+
+    return
\ No newline at end of file
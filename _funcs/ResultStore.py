@@ -0,0 +1,142 @@
+import numpy as np
+
+import _funcs
+
+# Slots of result store keeping the results of whole batches
+result_batch_slots = ['sens']
+
+def result_store():
+    """
+    Create the store of stress integration results kept for post-processing.
+
+    Returns
+    -------
+    store : {t: {slot: {key: (stress,statev,de33)}}} , dict
+        Stress integration results of each test, by slot and key of material
+          properties.
+
+    Notes
+    -----
+    The slots hold the results of the last evaluation of single material
+      properties ('eval'), of the best evaluation of the identification
+      ('best') and of the batch of the last stress sensitivity ('sens'), so
+      that at most two results and one batch of each test are kept outside
+      the memory budget of the cache.
+    """
+
+    store = {}
+
+    return store
+
+def result_store_get(store,t,key):
+    """
+    Get stress integration results from store.
+
+    Parameters
+    ----------
+    store : {t: {slot: {key: (stress,statev,de33)}}} , dict
+        Store of stress integration results.
+    t : int
+        Test number.
+    key : tuple
+        Key of stress integration results.
+
+    Returns
+    -------
+    value : (stress,statev,de33) or None
+        Stored stress integration results, or None if not found.
+    """
+
+    for slot in store.get(t,{}).values():
+        if key in slot:
+            return slot[key]
+
+    return None
+
+def result_store_put(store,t,slot,results):
+    """
+    Replace stress integration results of slot of store.
+
+    Parameters
+    ----------
+    store : {t: {slot: {key: (stress,statev,de33)}}} , dict
+        Store of stress integration results.
+    t : int
+        Test number.
+    slot : str or None
+        Slot of store, or None to not keep the results.
+    results : {key: (stress,statev,de33)} , dict
+        Stress integration results by key of material properties, or empty
+          to release the slot.
+    """
+
+    if slot is None:
+        return
+
+    store.setdefault(t,{})[slot] = results
+
+    return
+
+def keep_test_results(store,props,t,engine):
+    """
+    Keep stress integration results of material properties of one test as
+      results of best evaluation.
+
+    Parameters
+    ----------
+    store : {t: {slot: {key: (stress,statev,de33)}}} , dict
+        Store of stress integration results.
+    props : (nprops,) , float
+        Material properties of best evaluation.
+    t : int
+        Test number.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings.
+    """
+
+    key = _funcs.stress_cache_key(props,t,engine)
+    value = result_store_get(store,t,key)
+    if value is None:
+        value = engine['cache']['entries'].get(key)
+
+    if value is None:
+        result_store_put(store,t,'best',{})
+    else:
+        result_store_put(store,t,'best',{key: value})
+
+    return
+
+def keep_results(store,props,nt,engine):
+    """
+    Keep stress integration results of last evaluation of material properties
+      as results of best evaluation.
+
+    Parameters
+    ----------
+    store : {t: {slot: {key: (stress,statev,de33)}}} , dict
+        Store of stress integration results.
+    props : (nprops,) , float
+        Material properties of best evaluation.
+    nt : int
+        Number of tests.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings.
+
+    Notes
+    -----
+    Results of batches of material properties other than stress
+      sensitivities are not stored, and are found in the cache within its
+      memory budget. Results not found in the store nor in the cache (e.g.
+      replayed from a checkpoint) release the previous best results of the
+      test. Tests evaluated in worker processes keep their results of the
+      best evaluation at their next evaluation.
+    """
+
+    for t in range(nt):
+        keep_test_results(store,props,t,engine)
+
+    # Best material properties sent to worker processes of tests
+    if engine['testpools'] is not None:
+        engine['testpools']['best'] = np.copy(props)
+
+    return
\ No newline at end of file
@@ -0,0 +1,383 @@
+import numpy as np
+
+import _utils
+
+def material_model(props):
+    """
+    Decode the elastic, yield function and isotropic hardening parameters
+      from UMMDp material properties.
+
+    Parameters
+    ----------
+    props : (nprops,) or (ne,nprops) , float
+        Material properties, either common or per element.
+
+    Returns
+    -------
+    mat : {'E','nu','yld','ntwh','hard'} , dict
+        Young's modulus, Poisson's ratio, Hill48 coefficients (F,G,H,L,M,N),
+          isotropic hardening law type and parameters.
+
+    Notes
+    -----
+    The layout of properties follows UMMDp,
+        [nvbs, ntela, elastic, ntyld, yield, ntwh, hardening, ntkh, ...],
+      where the available types are:
+        ntela : 0 (Young's modulus, Poisson's ratio), 1 (bulk and shear moduli).
+        ntyld : 0 (von Mises), 1 (Hill 1948: F, G, H, L, M, N).
+        ntwh : 0 (perfectly plastic), 1 (linear), 2 (Swift), 3 (Ludwik),
+               4 (Voce), 5 (Voce + linear), 6 (Voce + Swift).
+        ntkh : 0 (no kinematic hardening).
+    """
+
+    kw = '*Engine. numpy engine:'
+
+    mat = {}
+
+    # Type flag of properties at index
+    def ptype(i):
+        return int(np.real(props[...,i]).flat[0])
+
+    # Elasticity
+    ntela = ptype(1)
+    if ntela == 0:
+        mat['E'] = props[...,2]
+        mat['nu'] = props[...,3]
+    elif ntela == 1:
+        k,g = props[...,2],props[...,3]
+        mat['E'] = 9*k*g / (3*k + g)
+        mat['nu'] = (3*k - 2*g) / (2*(3*k + g))
+    else:
+        _utils.error(f'{kw} elasticity type {ntela} not available.')
+    i = 4
+
+    # Yield function
+    ntyld = ptype(i)
+    if ntyld == 0:
+        mat['yld'] = [0.5,0.5,0.5,1.5,1.5,1.5]
+        i += 1
+    elif ntyld == 1:
+        mat['yld'] = [props[...,i+1+j] for j in range(6)]
+        i += 7
+    else:
+        _utils.error(f'{kw} yield function type {ntyld} not available.')
+
+    # Isotropic hardening law
+    mat['ntwh'] = ptype(i)
+    nhard = {0: 1, 1: 2, 2: 3, 3: 3, 4: 3, 5: 4, 6: 7}
+    if mat['ntwh'] not in nhard:
+        _utils.error(f'{kw} isotropic hardening type {mat["ntwh"]} not available.')
+    mat['hard'] = [props[...,i+1+j] for j in range(nhard[mat['ntwh']])]
+    i += 1 + nhard[mat['ntwh']]
+
+    # Kinematic hardening law
+    ntkh = ptype(i)
+    if ntkh != 0:
+        _utils.error(f'{kw} kinematic hardening type {ntkh} not available.')
+
+    return mat
+
+def elastic_stiffness(young,nu,ntens):
+    """
+    Isotropic elastic stiffness matrix in voigt notation.
+
+    Parameters
+    ----------
+    young : (...) , float
+        Young's modulus.
+    nu : (...) , float
+        Poisson's ratio.
+    ntens : int
+        Number of tensor components.
+
+    Returns
+    -------
+    ddsdde : (...,ntens,ntens) , float
+        Elastic stiffness matrix (plane stress if ntens is 3).
+    """
+
+    young,nu = np.broadcast_arrays(young,nu)
+    ddsdde = np.zeros(young.shape+(ntens,ntens),dtype=young.dtype)
+
+    # Plane stress
+    if ntens == 3:
+        c = young / (1 - nu**2)
+        ddsdde[...,0,0] = c
+        ddsdde[...,1,1] = c
+        ddsdde[...,0,1] = c * nu
+        ddsdde[...,1,0] = c * nu
+        ddsdde[...,2,2] = c * (1 - nu) / 2
+
+    # Three-dimensional
+    elif ntens == 6:
+        g = young / (2*(1 + nu))
+        lame = young * nu / ((1 + nu)*(1 - 2*nu))
+        for i in range(3):
+            for j in range(3):
+                ddsdde[...,i,j] = lame
+            ddsdde[...,i,i] = lame + 2*g
+            ddsdde[...,3+i,3+i] = g
+
+    return ddsdde
+
+def yield_matrix(yld,ntens):
+    """
+    Quadratic form matrix of the Hill 1948 yield function in voigt notation.
+
+    Parameters
+    ----------
+    yld : (6,(...)) , float
+        Hill 1948 coefficients (F,G,H,L,M,N).
+    ntens : int
+        Number of tensor components.
+
+    Returns
+    -------
+    pmat : (...,ntens,ntens) , float
+        Matrix such that the equivalent stress is se = sqrt(s'Ps).
+    """
+
+    f,g,h,l,m,n = np.broadcast_arrays(*yld)
+    pmat = np.zeros(f.shape+(ntens,ntens),dtype=np.result_type(f,float))
+
+    # Normal components
+    pmat[...,0,0] = g + h
+    pmat[...,1,1] = f + h
+    pmat[...,0,1] = -h
+    pmat[...,1,0] = -h
+
+    # Plane stress
+    if ntens == 3:
+        pmat[...,2,2] = 2*n
+
+    # Three-dimensional (11,22,33,12,13,23)
+    elif ntens == 6:
+        pmat[...,2,2] = f + g
+        pmat[...,0,2] = -g
+        pmat[...,2,0] = -g
+        pmat[...,1,2] = -f
+        pmat[...,2,1] = -f
+        pmat[...,3,3] = 2*n
+        pmat[...,4,4] = 2*m
+        pmat[...,5,5] = 2*l
+
+    return pmat
+
+def hardening_law(peeq,ntwh,hard):
+    """
+    Flow stress and hardening modulus of isotropic hardening law.
+
+    Parameters
+    ----------
+    peeq : (ne,) , float
+        Equivalent plastic strain.
+    ntwh : int
+        Type of isotropic hardening law.
+    hard : (nhard,(ne,)) , float
+        Parameters of isotropic hardening law.
+
+    Returns
+    -------
+    sy : (ne,) , float
+        Flow stress.
+    dsy : (ne,) , float
+        Derivative of flow stress wrt equivalent plastic strain.
+    """
+
+    zero = 0 * peeq
+
+    # Perfectly plastic
+    if ntwh == 0:
+        sy = hard[0] + zero
+        dsy = zero
+
+    # Linear
+    elif ntwh == 1:
+        sy = hard[0] + hard[1]*peeq
+        dsy = hard[1] + zero
+
+    # Swift
+    elif ntwh == 2:
+        c,e0,n = hard
+        sy = c * (e0 + peeq)**n
+        dsy = n * c * (e0 + peeq)**(n - 1)
+
+    # Ludwik
+    elif ntwh == 3:
+        sy0,c,n = hard
+        p = np.where(np.real(peeq) > 1e-12,peeq,1e-12)
+        sy = sy0 + c * peeq**n
+        dsy = n * c * p**(n - 1)
+
+    # Voce
+    elif ntwh == 4:
+        sy0,q,b = hard
+        sy = sy0 + q * (1 - np.exp(-b*peeq))
+        dsy = q * b * np.exp(-b*peeq)
+
+    # Voce and linear
+    elif ntwh == 5:
+        sy0,q,b,c = hard
+        sy = sy0 + q * (1 - np.exp(-b*peeq)) + c*peeq
+        dsy = q * b * np.exp(-b*peeq) + c
+
+    # Voce and Swift
+    elif ntwh == 6:
+        a,sy0,q,b,c,e0,n = hard
+        sy = a * (sy0 + q*(1 - np.exp(-b*peeq))) + (1 - a) * c*(e0 + peeq)**n
+        dsy = a * q*b*np.exp(-b*peeq) + (1 - a) * n*c*(e0 + peeq)**(n - 1)
+
+    return sy,dsy
+
+def return_mapping(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,
+                   statev0=None,tol=1e-10,maxiter=50):
+    """
+    Integrate the stress in corotational material csys for all elements at
+      once using the backward-Euler return mapping.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nprops,) or (ne,nprops) , float
+        Material properties, either common or per element.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    statev0 : (ne,nstatev) , float
+        Internal state variables at start of first increment, or None to
+          start from the undeformed state.
+    tol : float
+        Relative tolerance of return mapping.
+    maxiter : int
+        Maximum number of iterations of return mapping.
+
+    Returns
+    -------
+    stress : (nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nf,ne,nstatev) , float
+        Internal state variables (equivalent plastic strain and plastic
+          strain).
+    de33 : (nf,ne) , float
+        Strain in thickness direction (plane stress).
+
+    Raises
+    ------
+    Exception
+        If the return mapping does not converge.
+
+    Theory
+    ------
+    With an elastic predictor the trial stress s* = C(e - ep) is checked
+      against the yield condition se(s) = sy(p). If violated, the plastic
+      corrector solves with Newton-Raphson the system
+        s - s* + dp C n = 0 and se(s) - sy(p + dp) = 0,
+      where n = Ps/se is the associated flow direction. The computation is
+      complex-safe, so that it can be used with complex-step derivatives:
+      convergence is checked on the real part, and one more iteration
+      converges the imaginary part.
+    """
+
+    # Decode material model and broadcast parameters to all elements
+    mat = material_model(props)
+    dtype = np.result_type(strain.dtype,props.dtype,float)
+    expand = lambda x: np.broadcast_to(np.asarray(x,dtype=dtype),(ne,))
+    young,nu = expand(mat['E']),expand(mat['nu'])
+    hard = [expand(x) for x in mat['hard']]
+    ddsdde = elastic_stiffness(young,nu,ntens)
+    pmat = yield_matrix([expand(x) for x in mat['yld']],ntens)
+    eye = np.identity(ntens)
+
+    # Initialize stress, internal state variables and thickness strain
+    stress = np.zeros((nf,ne,ntens),dtype=dtype)
+    statev = np.zeros((nf,ne,nstatev),dtype=dtype)
+    de33 = np.zeros((nf,ne),dtype=dtype)
+
+    # Plastic strain and equivalent plastic strain
+    pstrain = np.zeros((ne,ntens),dtype=dtype)
+    peeq = np.zeros(ne,dtype=dtype)
+    if statev0 is not None:
+        pstrain[...] = statev0[:,1:ntens+1]
+        peeq[...] = statev0[:,0]
+
+    for f in range(nf):
+
+        # Elastic predictor
+        strial = np.einsum('eij,ej->ei',ddsdde,strain[f] - pstrain)
+        se = np.sqrt(np.einsum('ei,eij,ej->e',strial,pmat,strial))
+        sy,_ = hardening_law(peeq,mat['ntwh'],hard)
+        active = np.nonzero(np.real(se - sy) > tol*np.real(sy))[0]
+
+        s = strial.copy()
+
+        # Plastic corrector of yielding elements
+        if len(active) > 0:
+            sa = strial[active]
+            dp = np.zeros(len(active),dtype=dtype)
+            c,p,hd = ddsdde[active],pmat[active],[x[active] for x in hard]
+
+            extra = False
+            for it in range(maxiter+np.iscomplexobj(sa)):
+
+                # Flow direction and flow stress
+                ps = np.einsum('eij,ej->ei',p,sa)
+                sea = np.sqrt(np.einsum('ei,ei->e',sa,ps))
+                n = ps / sea[:,None]
+                cn = np.einsum('eij,ej->ei',c,n)
+                sya,dsya = hardening_law(peeq[active]+dp,mat['ntwh'],hd)
+
+                # Residuals
+                r = np.zeros((len(active),ntens+1),dtype=dtype)
+                r[:,:ntens] = sa - strial[active] + dp[:,None]*cn
+                r[:,ntens] = sea - sya
+
+                # Check convergence of real part, with one more iteration to
+                #   converge the imaginary part of complex-step derivatives
+                if (np.abs(np.real(r)) <= tol*np.abs(np.real(sya))[:,None]).all():
+                    if extra or (not np.iscomplexobj(r)):
+                        break
+                    extra = True
+
+                # Jacobian
+                dn = (p - n[:,:,None]*n[:,None,:]) / sea[:,None,None]
+                jac = np.zeros((len(active),ntens+1,ntens+1),dtype=dtype)
+                jac[:,:ntens,:ntens] = eye + dp[:,None,None]*(c @ dn)
+                jac[:,:ntens,ntens] = cn
+                jac[:,ntens,:ntens] = n
+                jac[:,ntens,ntens] = -dsya
+
+                # Update stress and equivalent plastic strain increment
+                dx = np.linalg.solve(jac,-r[...,None])[...,0]
+                sa = sa + dx[:,:ntens]
+                dp = dp + dx[:,ntens]
+
+            else:
+                raise Exception('return mapping did not converge')
+
+            s[active] = sa
+            pstrain[active] += dp[:,None] * n
+            peeq[active] += dp
+
+        # Store stress and internal state variables
+        stress[f] = s
+        statev[f,:,0] = peeq
+        statev[f,:,1:ntens+1] = pstrain
+
+        # Thickness strain in plane stress
+        if ntens == 3:
+            de33[f] = (- nu/young*(s[:,0] + s[:,1])
+                       - (pstrain[:,0] + pstrain[:,1]))
+
+    return stress,statev,de33
\ No newline at end of file
@@ -1,10 +1,12 @@
 import numpy as np
+from time import perf_counter
 
 import _funcs
 
-def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,
+def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbglsq,bcdofs,
                                    vfs,nn,ne,dof,ndi,nshr,ntens,ncomp,nstatev,
-                                   nvfs,nf,nprops,props,vars,nlgeom,fout):
+                                   nvfs,nf,t,nprops,props,vars,nlgeom,fout,
+                                   dirout,engine):
     """
     Compute the sensitivity-based virtual fields.
 
@@ -18,10 +20,11 @@ def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,
         Material rotation tensor.
     time : (nf) , float
         Time increments.
-    bg : (ne*ncomp,nn*dof) , float
+    bg : (ne*ncomp,nn*dof) , sparse
         Global strain-displacement matrix.
-    mbginv : (ne*ncomp,nn*dof) , float
-        Pseudo-inverse of modified global strain-displacement matrix.
+    mbglsq : {'mbg','mbgt','lu'} , dict
+        Factorized least-squares solver of modified global strain-displacement
+          matrix.
     bcdofs : {'fixed','active','parent','child'} , int
         Boundary conditions degrees of freedom.
     vfs : 
@@ -46,6 +49,8 @@ def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,
         Number of virtual fields.
     nf : int
         Number of increments.
+    t : int
+        Test number.
     nprops : int
         Number of material properties.
     props : (nprops,) , float
@@ -56,22 +61,32 @@ def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,
         Flag for small or large deformation framework (0/1).
     fout : str
         Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
     vfs : {(nvfs,ne,dof*dof), (nvfs,nf,4,dof)} , float
-        Sensivity-based virtual fields.
+        Sensivity-based virtual fields, with identification variables and
+          time of their generation in 'x' and 'time'.
     """
 
+    # Start time of virtual fields generation
+    st = perf_counter()
+
     # Compute stress sensitivities
     ss,iss = _funcs.stress_sensitivity(strain,rot,dfgrd,rotm,time,
-                                       vfs['sb']['dx'],ne,dof, ndi,nshr,ntens,
-                                       ncomp,nstatev,nf,nprops,props,vars,nvfs,
-                                       nlgeom,fout)
+                                       vfs['sb'],ne,dof,ndi,nshr,ntens,
+                                       ncomp,nstatev,nf,t,nprops,props,vars,
+                                       nvfs,nlgeom,fout,dirout,engine)
 
     # Compute virtual displacements
     vu = np.zeros((nvfs,nf,nn*dof,1))
-    vu[...,bcdofs['active'],:] = mbginv[None,None] @ iss[...,None]
+    vua = _funcs.least_squares_displacement(mbglsq,
+                                            iss.reshape((nvfs*nf,ne*ncomp)).T)
+    vu[...,bcdofs['active'],0] = vua.T.reshape((nvfs,nf,-1))
 
     # Apply constant boundary conditions to virtual displacements
     for i in range(4):
@@ -80,8 +95,8 @@ def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,
                 mastervu = vu[...,bcdofs['parent'][i][j][0],:]
                 vu[...,bcdofs['child'][i][j],0] = mastervu
 
-    # Compute virtual strains
-    ve = bg[None,None] @ vu
+    # Compute virtual strains of all virtual fields and increments at once
+    ve = (bg @ vu.reshape((nvfs*nf,nn*dof)).T).T.reshape((nvfs,nf,ne*ncomp,1))
 
     # Reshape virtual displacements to virtual fields format
     vfs['u'] = np.zeros((nvfs,nf,4,dof))
@@ -94,4 +109,8 @@ def sensivity_based_virtual_fields(strain,rot,dfgrd,rotm,time,bg,mbginv,bcdofs,
     ielems = np.arange(0,ne*dof*dof).reshape(dof*dof,ne).T
     vfs['e'] = ve[...,ielems,:][...,0]
 
+    # Save identification variables and time of virtual fields generation
+    vfs['x'] = np.copy(props[vars])
+    vfs['time'] = perf_counter() - st
+
     return vfs
\ No newline at end of file
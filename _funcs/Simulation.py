@@ -1,7 +1,9 @@
+import numpy as np
+
 import _funcs
 
 def simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
-               nstatev,nvfs,nf,nt,nprops,props,nlgeom,fout):
+               nstatev,nvfs,nf,nt,nprops,props,nlgeom,fout,engine):
     """
     Simulation
 
@@ -39,12 +41,14 @@ def simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
         Number of increments.
     nprops : int
         Number of material properties.
-    props : (nprops) , float
-        Material properties.
+    props : (nprops,) or (nbatch,nprops) , float
+        Material properties, or batch of material properties.
     nlgeom : bool
         Flag for small or large deformation framework (0/1).
     fout : str
         Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
@@ -52,8 +56,13 @@ def simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
         Internal virtual work.
     evw : (nt, (nf,nvfs) ) , float
         External virtual work.
-    phi : (nt) , float
+    res : (nt, ([nbatch],nvfs*nf) ) , float
+        Cost function residuals for time increments and virtual fields.
+    phi : (nt) , float or (nt, (nbatch,) ) , float
         Cost function.
+    success : bool or (nbatch,) , bool
+        Variable to monitor the sucess of stress reconstruction in all tests
+          (False/True).
 
     Notes
     -----
@@ -61,23 +70,40 @@ def simulation(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
         Number of nodes per element.
     """
 
-    ivw,evw,phi,success = [None]*nt,[None]*nt,[None]*nt,[None]*nt
+    # Evaluate tests concurrently in worker processes
+    if engine['tests'] and (nt > 1):
+        return _funcs.parallel_simulation(strain,rot,dfgrd,rotm,force,vol,vfs,
+                                          ne,dof,ndi,nshr,ntens,nstatev,nvfs,
+                                          nf,nt,nprops,props,nlgeom,fout,
+                                          engine)
+
+    ivw,evw,res,phi = [None]*nt,[None]*nt,[None]*nt,[None]*nt
+    success = True
 
     # Loop over tests
     for t in range(nt):
 
         # Compute the principle of virtual work
-        ivw[t],evw[t],phi[t],success = _funcs.vfm_core(strain[t],rot[t],
-                                                       dfgrd[t],rotm[t],
-                                                       force[t],vol[t],vfs[t],
-                                                       ne[t],dof[t],ndi[t],
-                                                       nshr[t],ntens[t],
-                                                       nstatev[t],nvfs[t],
-                                                       nf[t],nprops,props,
-                                                       nlgeom,fout)
+        ivw[t],evw[t],res[t],phi[t],tsuccess = _funcs.vfm_core(strain[t],
+                                                               rot[t],
+                                                               dfgrd[t],
+                                                               rotm[t],
+                                                               force[t],
+                                                               vol[t],vfs[t],
+                                                               ne[t],dof[t],
+                                                               ndi[t],nshr[t],
+                                                               ntens[t],
+                                                               nstatev[t],
+                                                               nvfs[t],nf[t],
+                                                               t,nprops,props,
+                                                               nlgeom,fout,
+                                                               engine)
+
+        # Update success of all tests
+        success = success & tsuccess
 
         # Break loop if one test is not successful reconstructed
-        if not success:
+        if not np.any(success):
             break
 
-    return ivw,evw,phi,success
\ No newline at end of file
+    return ivw,evw,res,phi,success
\ No newline at end of file
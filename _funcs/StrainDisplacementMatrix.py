@@ -1,4 +1,6 @@
 import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
 
 import _funcs
 
@@ -29,10 +31,11 @@ def strain_displacement(coord,conn,bcdofs,nn,ne,npe,dof,ncomp,nlgeom):
 
     Returns
     -------
-    bg : (ne*ncomp,nn*dof) , float
-        Global strain-displacement matrix.
-    mbginv : (ne*ncomp,nn*dof) , float
-        Pseudo-inverse of modified global strain-displacement matrix.
+    bg : (ne*ncomp,nn*dof) , sparse
+        Global strain-displacement matrix in compressed sparse row format.
+    mbglsq : {'mbg','mbgt','lu'} , dict
+        Factorized least-squares solver of modified global strain-displacement
+          matrix.
     """
 
     # Partial derivatives of shape functions and jacobian
@@ -88,23 +91,99 @@ def strain_displacement(coord,conn,bcdofs,nn,ne,npe,dof,ncomp,nlgeom):
             be[:,5,idx+1] = dNdx[:,2,:]
             be[:,5,idx+2] = dNdx[:,1,:]
 
-    # Assembly global strain-displacement matrix
-    bg = np.zeros((ne*ncomp,nn*dof))
-    for i in range(ne):
+    # Columns dof index of each element
+    idofs = (conn[:,:,None]*dof + np.arange(dof)).reshape((ne,npe*dof))
 
-        # Columns dof index 
-        idofs = np.vstack((conn[i]*dof,conn[i]*dof+1)).T.flatten()
+    # Rows component index of each element
+    ielems = np.arange(ncomp)[None,:]*ne + np.arange(ne)[:,None]
 
-        # Rows element index
-        ielems = np.array([j*ne+i for j in range(ncomp)])[:,None]
-
-        # Assign element matrix to global matrix
-        bg[ielems,idofs] = be[i]
+    # Assembly global strain-displacement matrix from nonzero entries
+    rows = np.broadcast_to(ielems[:,:,None],be.shape)
+    cols = np.broadcast_to(idofs[:,None,:],be.shape)
+    nz = be != 0
+    bg = sparse.csr_matrix((be[nz],(rows[nz],cols[nz])),shape=(ne*ncomp,nn*dof))
 
     # Apply fixed boundary conditions to global strain-displacement matrix
-    mbg = np.delete(bg,bcdofs['fixed'],1)
+    mbg = bg[:,bcdofs['active']].tocsc()
+
+    # Factorize least-squares solver of modified strain-displacement matrix
+    mbglsq = least_squares_factorization(mbg)
+
+    return bg,mbglsq
+
+def least_squares_factorization(mbg,reg=1e-8):
+    """
+    Factorize the least-squares solver of the modified global
+      strain-displacement matrix.
+
+    Parameters
+    ----------
+    mbg : (ne*ncomp,nactive) , sparse
+        Modified global strain-displacement matrix.
+    reg : float
+        Regularization of normal equations relative to their largest
+          diagonal term.
+
+    Returns
+    -------
+    mbglsq : {'mbg','mbgt','lu'} , dict
+        Factorized least-squares solver of modified global strain-displacement
+          matrix.
+
+    Notes
+    -----
+    The factorization cannot be pickled, so it is computed again from mbg
+      when the solver is sent to another process.
+    """
+
+    mbg = mbg.tocsc()
+    mbgt = mbg.T.tocsr()
+
+    # Regularized normal equations of modified global strain-displacement matrix
+    mtm = (mbgt @ mbg).tocsc()
+    eps = reg * max(mtm.diagonal().max(),1e-30)
+    mtm = mtm + eps*sparse.identity(mtm.shape[0],format='csc')
+
+    # Factorize normal equations once for all right-hand sides
+    mbglsq = {'mbg': mbg,
+              'mbgt': mbgt,
+              'lu': splu(mtm)}
+
+    return mbglsq
+
+def least_squares_displacement(mbglsq,strain,nref=2):
+    """
+    Solve the minimum-norm least-squares displacements of a batch of strains
+      with the factorized modified global strain-displacement matrix.
+
+    Parameters
+    ----------
+    mbglsq : {'mbg','mbgt','lu'} , dict
+        Factorized least-squares solver of modified global strain-displacement
+          matrix.
+    strain : (ne*ncomp,nrhs) , float
+        Batch of global strains.
+    nref : int
+        Number of refinement steps of solution.
+
+    Returns
+    -------
+    displ : (nactive,nrhs) , float
+        Displacements of active degrees of freedom.
+
+    Notes
+    -----
+    The regularized normal equations are refined by iterated Tikhonov steps,
+      which converge to the pseudo-inverse solution also when the matrix is
+      rank deficient.
+    """
+
+    # Initial solution of regularized normal equations
+    displ = mbglsq['lu'].solve(np.asarray(mbglsq['mbgt'] @ strain))
 
-    # Compute the pseudo-inverse of modified global strain-displacement matrix
-    mbginv = np.linalg.pinv(mbg)
+    # Refine solution with residual of least-squares problem
+    for _ in range(nref):
+        res = strain - mbglsq['mbg'] @ displ
+        displ = displ + mbglsq['lu'].solve(np.asarray(mbglsq['mbgt'] @ res))
 
-    return bg,mbginv
\ No newline at end of file
+    return displ
\ No newline at end of file
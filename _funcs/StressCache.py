@@ -0,0 +1,230 @@
+import numpy as np
+from collections import OrderedDict
+
+import _funcs
+import _utils
+
+def stress_cache(budget):
+    """
+    Create the least-recently-used cache of stress integration results.
+
+    Parameters
+    ----------
+    budget : int
+        Memory budget of cache in bytes (0 to disable).
+
+    Returns
+    -------
+    cache : {'entries','nbytes','budget','hits','misses'} , dict
+        Cache entries, size in bytes, memory budget and hit/miss counters.
+    """
+
+    cache = {'entries': OrderedDict(),
+             'nbytes': 0,
+             'budget': budget,
+             'hits': 0,
+             'misses': 0}
+
+    return cache
+
+def stress_cache_key(props,t,engine):
+    """
+    Key of stress integration results in cache.
+
+    Parameters
+    ----------
+    props : (nprops,) , float
+        Material properties.
+    t : int
+        Test number.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    key : tuple
+        Test number, stress integration backend and material properties bytes.
+    """
+
+    props = np.ascontiguousarray(props)
+
+    return (t,engine['type'],props.dtype.str,props.tobytes())
+
+def stress_cache_get(cache,key):
+    """
+    Get stress integration results from cache.
+
+    Parameters
+    ----------
+    cache : {'entries','nbytes','budget','hits','misses'} , dict
+        Stress integration cache.
+    key : tuple
+        Key of stress integration results.
+
+    Returns
+    -------
+    value : (stress,statev,de33) or None
+        Cached stress integration results, or None if not found.
+    """
+
+    if cache['budget'] <= 0:
+        return None
+
+    value = cache['entries'].get(key)
+
+    # Update counters and mark entry as most recently used
+    if value is None:
+        cache['misses'] += 1
+    else:
+        cache['hits'] += 1
+        cache['entries'].move_to_end(key)
+
+    return value
+
+def stress_cache_put(cache,key,value):
+    """
+    Store stress integration results in cache, evicting least recently used
+      entries to fit the memory budget.
+
+    Parameters
+    ----------
+    cache : {'entries','nbytes','budget','hits','misses'} , dict
+        Stress integration cache.
+    key : tuple
+        Key of stress integration results.
+    value : (stress,statev,de33)
+        Stress integration results.
+    """
+
+    nbytes = sum([array.nbytes for array in value])
+
+    if (nbytes > cache['budget']) or (key in cache['entries']):
+        return
+
+    # Protect cached arrays from modification
+    value = tuple([np.array(array) for array in value])
+    for array in value:
+        array.flags.writeable = False
+
+    cache['entries'][key] = value
+    cache['nbytes'] += nbytes
+
+    # Evict least recently used entries
+    while cache['nbytes'] > cache['budget']:
+        _,old = cache['entries'].popitem(last=False)
+        cache['nbytes'] -= sum([array.nbytes for array in old])
+
+    return
+
+def cached_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,t,fout,
+                       engine,slot='eval'):
+    """
+    Integrate the stress in corotational material csys for a batch of
+      material properties, reusing stored and cached results.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nbatch,nprops) , float
+        Batch of material properties.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    t : int
+        Test number.
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache','store'} , dict
+        Computation engine settings.
+    slot : str or None
+        Slot of result store keeping the results of single material
+          properties, or of the whole batch for batch slots, or None to not
+          keep the results.
+
+    Returns
+    -------
+    stress : (nbatch,nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nbatch,nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nbatch,nf,ne) , float
+        Strain in thickness direction (plane stress).
+    success : (nbatch,) , bool
+        Sucess of stress integration of each material properties.
+    """
+
+    cache = engine['cache']
+    store = engine['store']
+    nbatch = len(props)
+
+    # Look up material properties of batch in result store and cache
+    keys = [stress_cache_key(props[b],t,engine) for b in range(nbatch)]
+    values = [_funcs.result_store_get(store,t,key) for key in keys]
+    values = [stress_cache_get(cache,keys[b]) if values[b] is None
+              else values[b] for b in range(nbatch)]
+    miss = [b for b in range(nbatch) if values[b] is None]
+
+    # Integrate material properties missing in store and cache
+    if len(miss) > 0:
+
+        # Release results of slot before integrating the next ones
+        _funcs.result_store_put(store,t,slot,{})
+
+        stressm,statevm,de33m,successm = _funcs.batch_integration(strain,ne,ndi,
+                                                                  nshr,ntens,
+                                                                  nstatev,
+                                                                  props[miss],
+                                                                  nprops,nf,
+                                                                  fout,engine)
+
+        # Store successful integrations in cache
+        for i,b in enumerate(miss):
+            if successm[i] and (cache['budget'] > 0):
+                stress_cache_put(cache,keys[b],(stressm[i],statevm[i],
+                                                de33m[i]))
+
+    # All material properties of batch integrated
+    if len(miss) == nbatch:
+        stress,statev,de33,success = stressm,statevm,de33m,successm
+
+    # Gather stored, cached and integrated results
+    else:
+        dtypes = [v[0].dtype for v in values if v is not None]
+        if len(miss) > 0:
+            dtypes.append(stressm.dtype)
+        dtype = np.result_type(*dtypes)
+        stress = _utils.memory_map((nbatch,nf,ne,ntens),engine,dtype)
+        statev = _utils.memory_map((nbatch,nf,ne,nstatev),engine,dtype)
+        de33 = _utils.memory_map((nbatch,nf,ne),engine,dtype)
+        success = np.ones(nbatch,dtype=bool)
+        for b in range(nbatch):
+            if values[b] is not None:
+                stress[b],statev[b],de33[b] = values[b]
+        if len(miss) > 0:
+            stress[miss],statev[miss],de33[miss],success[miss] = (stressm,
+                                                                  statevm,
+                                                                  de33m,
+                                                                  successm)
+
+    # Keep successful results of single material properties, or of whole
+    #   batch for batch slots, in slot of result store, leaving results of
+    #   other batches to the cache
+    if (nbatch == 1) or (slot in _funcs.result_batch_slots):
+        _funcs.result_store_put(store,t,slot,{keys[b]: (stress[b],statev[b],
+                                                        de33[b])
+                                              for b in range(nbatch)
+                                              if success[b]})
+
+    return stress,statev,de33,success
\ No newline at end of file
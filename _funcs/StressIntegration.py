@@ -0,0 +1,366 @@
+import numpy as np
+
+import _funcs
+import _utils
+
+def ummdp_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,fout,
+                      statev0=None):
+    """
+    Integrate the stress with the UMMDp f2py library.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nprops,) , float
+        Material properties.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    fout : str
+        Name of output folder.
+    statev0 : (ne,nstatev) , float
+        Internal state variables at start of first increment, or None to
+          start from the undeformed state.
+
+    Returns
+    -------
+    stress : (nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nf,ne) , float
+        Strain in thickness direction (plane stress).
+    """
+
+    # UMMDp library always starts from the undeformed state
+    if statev0 is not None:
+        raise Exception('initial state variables not available in ummdp')
+
+    # Initialize f2py external stop function
+    _funcs.ummdp_vfm.f2py_stop = _utils.f2py_stop
+
+    stress,statev,de33 = _funcs.ummdp_vfm.ummdp_vfm(np.asarray(strain),ne,ndi,
+                                                    nshr,ntens,nstatev,props,
+                                                    nprops,nf,fout)
+
+    return stress,statev,de33
+
+def numpy_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,fout,
+                      statev0=None):
+    """
+    Integrate the stress with the vectorized NumPy return mapping.
+
+    See Also
+    --------
+    ummdp_integration : parameters and returns of stress integration backends.
+    return_mapping : backward-Euler return mapping of all elements at once.
+    """
+
+    return _funcs.return_mapping(strain,ne,ndi,nshr,ntens,nstatev,props,
+                                 nprops,nf,statev0)
+
+# Available stress integration backends
+stress_backends = {'ummdp': ummdp_integration,
+                   'numpy': numpy_integration}
+
+# Backends accepting per-element material properties
+elementwise_backends = ['numpy']
+
+# Backends accepting complex material properties (complex-step derivatives)
+complex_backends = ['numpy']
+
+# Backends accepting initial internal state variables (blocks of increments)
+restart_backends = ['numpy']
+
+def stress_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,fout,
+                       engine,statev0=None):
+    """
+    Integrate the stress in corotational material csys with the selected
+      backend.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nprops,) , float
+        Material properties.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    statev0 : (ne,nstatev) , float
+        Internal state variables at start of first increment, or None to
+          start from the undeformed state.
+
+    Returns
+    -------
+    stress : (nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nf,ne) , float
+        Strain in thickness direction (plane stress).
+
+    Notes
+    -----
+    Backends are registered in stress_backends by name and share the
+      signature of ummdp_integration. Failures of stress integration are
+      signalled by raising an exception. With more than one worker the
+      elements are split in blocks integrated by a pool of processes. In
+      worker processes of tests, the elements are integrated one block at a
+      time until aborted by the failure of another test.
+    """
+
+    # Integrate blocks of elements in pool of processes
+    if engine['workers'] > 1:
+        return _funcs.parallel_integration(strain,ne,ndi,nshr,ntens,nstatev,
+                                           props,nprops,nf,fout,engine,statev0)
+
+    # Integrate blocks of elements in turn until aborted by other test
+    if engine['abort'] is not None:
+        return _funcs.abortable_integration(strain,ne,ndi,nshr,ntens,nstatev,
+                                            props,nprops,nf,fout,engine,
+                                            statev0)
+
+    backend = stress_backends[engine['type']]
+
+    return backend(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,fout,
+                   statev0)
+
+def block_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,fout,
+                      engine,statev0=None):
+    """
+    Integrate the stress in corotational material csys for a batch of
+      material properties over a block of increments.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys of block of increments.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nbatch,nprops) , float
+        Batch of material properties.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments of block.
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    statev0 : (nbatch,ne,nstatev) , float
+        Internal state variables at start of block, or None to start from
+          the undeformed state.
+
+    Returns
+    -------
+    stress : (nbatch,nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nbatch,nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nbatch,nf,ne) , float
+        Strain in thickness direction (plane stress).
+    success : (nbatch,) , bool
+        Sucess of stress integration of each material properties.
+
+    Notes
+    -----
+    With more than one worker, the blocks of elements of all members are
+      integrated at once in the pool of processes, sharing the strain of the
+      test. Otherwise, for backends accepting per-element material
+      properties, the batch is integrated in one pass as nbatch*ne elements.
+      If this fails, or for other backends, each material properties is
+      integrated in turn, so that only failed members of the batch are
+      flagged.
+    """
+
+    nbatch = len(props)
+    dtype = np.result_type(strain.dtype,props.dtype,float)
+
+    # Initialize stress, internal state variables and thickness strain
+    stress = np.zeros((nbatch,nf,ne,ntens),dtype=dtype)
+    statev = np.zeros((nbatch,nf,ne,nstatev),dtype=dtype)
+    de33 = np.zeros((nbatch,nf,ne),dtype=dtype)
+    success = np.zeros(nbatch,dtype=bool)
+
+    # Integrate whole batch as elements with per-element properties
+    if ((nbatch > 1) and (engine['type'] in elementwise_backends) and
+        (engine['workers'] == 1)):
+        strainb = np.broadcast_to(np.asarray(strain)[:,None],
+                                  (nf,nbatch,ne,ntens))
+        strainb = strainb.reshape((nf,nbatch*ne,ntens))
+        propsb = np.repeat(props,ne,axis=0)
+        if statev0 is None:
+            statevb = None
+        else:
+            statevb = np.reshape(statev0,(nbatch*ne,nstatev))
+        try:
+            s,sv,d = stress_integration(strainb,nbatch*ne,ndi,nshr,ntens,
+                                        nstatev,propsb,nprops,nf,fout,engine,
+                                        statevb)
+            stress[...] = np.moveaxis(s.reshape((nf,nbatch,ne,ntens)),1,0)
+            statev[...] = np.moveaxis(sv.reshape((nf,nbatch,ne,nstatev)),1,0)
+            de33[...] = np.moveaxis(d.reshape((nf,nbatch,ne)),1,0)
+            success[:] = True
+
+            return stress,statev,de33,success
+
+        except Exception:
+            pass
+
+    # Integrate blocks of elements of all batch members in pool of processes
+    if engine['workers'] > 1:
+        try:
+            return _funcs.parallel_batch_integration(strain,ne,ndi,nshr,ntens,
+                                                     nstatev,props,nprops,nf,
+                                                     fout,engine,statev0)
+        except Exception:
+            pass
+
+    # Integrate each material properties of batch
+    for b in range(nbatch):
+        statevb = None if statev0 is None else statev0[b]
+        try:
+            stress[b],statev[b],de33[b] = stress_integration(strain,ne,ndi,
+                                                             nshr,ntens,
+                                                             nstatev,props[b],
+                                                             nprops,nf,fout,
+                                                             engine,statevb)
+            success[b] = True
+
+        except Exception:
+            pass
+
+    return stress,statev,de33,success
+
+def batch_integration(strain,ne,ndi,nshr,ntens,nstatev,props,nprops,nf,fout,
+                      engine):
+    """
+    Integrate the stress in corotational material csys for a batch of
+      material properties.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    ne : int
+        Number of elements.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    props : (nbatch,nprops) , float
+        Batch of material properties.
+    nprops : int
+        Number of material properties.
+    nf : int
+        Number of increments.
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    stress : (nbatch,nf,ne,ntens) , float
+        Cauchy stress in corotational material csys.
+    statev : (nbatch,nf,ne,nstatev) , float
+        Internal state variables.
+    de33 : (nbatch,nf,ne) , float
+        Strain in thickness direction (plane stress).
+    success : (nbatch,) , bool
+        Sucess of stress integration of each material properties.
+
+    Notes
+    -----
+    With memory-mapped arrays, the results are written to memory-mapped
+      scratch files and, for backends accepting initial internal state
+      variables, the increments are integrated one block at a time, each
+      block starting from the internal state variables of the last
+      increment of the previous block. Members of the batch failing in one
+      block are not integrated in the next blocks.
+    """
+
+    # Integrate all increments at once in memory
+    if engine['nblk'] is None:
+        return block_integration(strain,ne,ndi,nshr,ntens,nstatev,props,
+                                 nprops,nf,fout,engine)
+
+    nbatch = len(props)
+    dtype = np.result_type(strain.dtype,props.dtype,float)
+
+    # Initialize stress, internal state variables and thickness strain
+    stress = _utils.memory_map((nbatch,nf,ne,ntens),engine,dtype)
+    statev = _utils.memory_map((nbatch,nf,ne,nstatev),engine,dtype)
+    de33 = _utils.memory_map((nbatch,nf,ne),engine,dtype)
+    success = np.ones(nbatch,dtype=bool)
+
+    # Blocks of increments integrated at once
+    if engine['type'] in restart_backends:
+        blocks = _utils.increment_blocks(nf,engine)
+    else:
+        blocks = [slice(0,nf)]
+
+    statev0 = None
+    for blk in blocks:
+
+        # Batch members successful in previous blocks
+        active = np.nonzero(success)[0]
+        if len(active) == 0:
+            break
+
+        # Integrate block of increments from last internal state variables
+        nb = blk.stop - blk.start
+        statevb = None if statev0 is None else statev0[active]
+        s,sv,d,ok = block_integration(strain[blk],ne,ndi,nshr,ntens,nstatev,
+                                      props[active],nprops,nb,fout,engine,
+                                      statevb)
+
+        # Write results of block to memory-mapped arrays
+        stress[active,blk],statev[active,blk],de33[active,blk] = s,sv,d
+        success[active] = ok
+
+        # Internal state variables carried to next block
+        statev0 = np.zeros((nbatch,ne,nstatev),dtype=dtype)
+        statev0[active] = sv[:,-1]
+
+    return stress,statev,de33,success
\ No newline at end of file
@@ -1,12 +1,15 @@
+import os
 import numpy as np
 
 import _funcs
+import _utils
 
-def stress_sensitivity(strain,rot,dfgrd,rotm,time,dx,ne,dof,ndi,nshr,ntens,
-                       ncomp,nstatev,nf,nprops,props,vars,nvfs,nlgeom,fout,
-                       flat=1):
+def finite_difference_sensitivity(strain,rot,dfgrd,rotm,dx,ne,dof,ndi,nshr,
+                                  ntens,nstatev,nf,t,nprops,props,vars,nvfs,
+                                  nlgeom,fout,engine,flat):
     """
-    Compute total and incremental stress sensitivity for sensivity-based virtual fields.
+    Compute total stress sensitivity by finite differences, integrating the
+      reference and the perturbed material properties in one batch.
 
     Parameters
     ----------
@@ -18,8 +21,6 @@ def stress_sensitivity(strain,rot,dfgrd,rotm,time,dx,ne,dof,ndi,nshr,ntens,
         Deformation gradient.
     rotm : (dof,dof) , float
         Material rotation tensor.
-    time : (nf,) , float
-        Time increments.
     dx : float
         Identification variables perturbation.
     ne : int
@@ -32,12 +33,12 @@ def stress_sensitivity(strain,rot,dfgrd,rotm,time,dx,ne,dof,ndi,nshr,ntens,
         Number of shear tensor components.
     ntens : int
         Number of tensor components.
-    ncomp : int
-        Number of tensor components depending on deformation formulation.
     nstatev : int
         Number of internal state variables.
     nf : int
         Number of increments.
+    t : int
+        Test number.
     nprops : int
         Number of material properties.
     props : (nprops,) , float
@@ -50,74 +51,252 @@ def stress_sensitivity(strain,rot,dfgrd,rotm,time,dx,ne,dof,ndi,nshr,ntens,
         Flag for small or large deformation framework (0/1).
     fout : str
         Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
     flat : bool
-        Flag to flatten stress sensitivities by elements and components (0/1).
+        Flag to flatten stress by components (0/1).
 
     Returns
     -------
-    ss : (nvfs,nf,ne*ncomp) or (nvfs,nf,ne,dof,dof) , float
+    ss : (nvfs,nf,ne,ncomp) or (nvfs,nf,ne,dof,dof) , float
         Total stress sensitivity.
-    iss : (nvfs,nf,ne*ncomp) or (nvfs,nf,ne,dof,dof) , float
-        Incremental stress sensitivity.
     """
 
     # Set form of cauchy stress depending on deformation framework
-    if nlgeom:
+    if nlgeom or (not flat):
         voigt = 0
     else:
         voigt = 1
 
-    # Compute reference cauchy stress on global csys
-    stressref,_,de33 = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,nshr,
-                                            ntens,nstatev,nf,nprops,props,fout,
-                                            voigt=voigt)
+    # Batch of reference and perturbed material properties
+    dprops = np.tile(props,(nvfs+1,1))
+    for i in range(nvfs):
+
+        # Add perturbation to identification variable
+        dprops[i+1,np.flatnonzero(vars)[i]] = props[vars][i] - dx*props[vars][i]
+
+    # Compute cauchy stress on global csys of all material properties
+    stress,_,de33,_ = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,nshr,
+                                           ntens,nstatev,nf,t,nprops,dprops,
+                                           fout,engine,voigt=voigt,slot='sens')
 
-    # Compute reference 1st piola-kirchhoff stress
+    # Compute 1st piola-kirchhoff stress of all material properties
     if nlgeom:
-        pkstressref = _funcs.piola_kirchhoff_stress(stressref,de33,dfgrd,ne,
-                                                    dof,nf,flat)
+        stress = np.stack([_funcs.piola_kirchhoff_stress(stress[i],de33[i],
+                                                         dfgrd,ne,dof,nf,flat)
+                           for i in range(nvfs+1)])
 
-    # Compute time increment
-    if flat:
-        dtime = (time[1:] - time[:-1])[:,None,None]
+    # Compute total stress sensitivity
+    ss = stress[0][None] - stress[1:]
+
+    return ss
+
+def complex_step_sensitivity(strain,rot,dfgrd,rotm,dx,ne,dof,ndi,nshr,ntens,
+                             nstatev,nf,t,nprops,props,vars,nvfs,nlgeom,fout,
+                             engine,flat):
+    """
+    Compute total stress sensitivity by complex-step differentiation of the
+      stress integration, in one pass for all identification variables.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    rot : (nf,ne,dof,dof) , float
+        Rotation tensor.
+    dfgrd : (nf,ne,dof,dof) , float
+        Deformation gradient.
+    rotm : (dof,dof) , float
+        Material rotation tensor.
+    dx : float
+        Identification variables perturbation.
+    ne : int
+        Number of elements.
+    dof : int
+        Number of degrees of freedom.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    nstatev : int
+        Number of internal state variables.
+    nf : int
+        Number of increments.
+    t : int
+        Test number.
+    nprops : int
+        Number of material properties.
+    props : (nprops,) , float
+        Material properties.
+    vars : (nprops,) , bool
+        Flags for identification variables.
+    nvfs : int
+        Number of virtual fields.
+    nlgeom : bool
+        Flag for small or large deformation framework (0/1).
+    fout : str
+        Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    flat : bool
+        Flag to flatten stress by components (0/1).
+
+    Returns
+    -------
+    ss : (nvfs,nf,ne,ncomp) or (nvfs,nf,ne,dof,dof) , float
+        Total stress sensitivity.
+
+    Notes
+    -----
+    The derivative of the stress with respect to each identification
+      variable is the imaginary part of the stress integrated with an
+      imaginary step on that variable, without subtractive cancellation.
+      It is scaled by dx times the variable, the first order term of the
+      finite difference sensitivity.
+    """
+
+    if engine['type'] not in _funcs.complex_backends:
+        _utils.error(f'Complex-step stress sensitivity not available for {engine["type"]} engine.')
+
+    # Set form of cauchy stress depending on deformation framework
+    if nlgeom or (not flat):
+        voigt = 0
     else:
-        dtime = (time[1:] - time[:-1])[:,None,None,None]
+        voigt = 1
 
-    # Initialize stress sensitivities
-    if flat:
-        ss = np.zeros((nvfs,nf,ne,ncomp))
-        iss = np.zeros((nvfs,nf,ne,ncomp))
+    # Imaginary step of identification variables
+    ivars = np.flatnonzero(vars)
+    pvars = props[ivars]
+    h = 1e-20 * np.where(pvars != 0,np.abs(pvars),1)
+
+    # Batch of material properties with imaginary step
+    dprops = np.tile(props.astype(complex),(nvfs,1))
+    dprops[np.arange(nvfs),ivars] += 1j*h
+
+    # Compute cauchy stress on global csys of all material properties
+    stress,_,de33,success = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,
+                                                 nshr,ntens,nstatev,nf,t,
+                                                 nprops,dprops,fout,engine,
+                                                 voigt=voigt,
+                                                 slot='sens')
+
+    if not np.all(success):
+        _utils.error('Complex-step stress sensitivity integration failed.')
+
+    # Compute 1st piola-kirchhoff stress of all material properties
+    if nlgeom:
+        stress = np.stack([_funcs.piola_kirchhoff_stress(stress[i],de33[i],
+                                                         dfgrd,ne,dof,nf,flat)
+                           for i in range(nvfs)])
+
+    # Compute total stress sensitivity
+    scale = dx * pvars / h
+    ss = np.imag(stress) * scale.reshape((nvfs,)+(1,)*(stress.ndim-1))
+
+    return ss
+
+def stress_sensitivity(strain,rot,dfgrd,rotm,time,sb,ne,dof,ndi,nshr,ntens,
+                       ncomp,nstatev,nf,t,nprops,props,vars,nvfs,nlgeom,
+                       fout,dirout,engine,flat=1):
+    """
+    Compute total and incremental stress sensitivity for sensivity-based virtual fields.
+
+    Parameters
+    ----------
+    strain : (nf,ne,ntens) , float
+        Strain in corotational material csys.
+    rot : (nf,ne,dof,dof) , float
+        Rotation tensor.
+    dfgrd : (nf,ne,dof,dof) , float
+        Deformation gradient.
+    rotm : (dof,dof) , float
+        Material rotation tensor.
+    time : (nf,) , float
+        Time increments.
+    sb : {'dx','scale','mode','check',...} , dict
+        Sensitivity-based virtual fields settings.
+    ne : int
+        Number of elements.
+    dof : int
+        Number of degrees of freedom.
+    ndi : int
+        Number of normal tensor components.
+    nshr : int
+        Number of shear tensor components.
+    ntens : int
+        Number of tensor components.
+    ncomp : int
+        Number of tensor components depending on deformation formulation.
+    nstatev : int
+        Number of internal state variables.
+    nf : int
+        Number of increments.
+    t : int
+        Test number.
+    nprops : int
+        Number of material properties.
+    props : (nprops,) , float
+        Material properties.
+    vars : (nprops,) , bool
+        Flags for identification variables.
+    nvfs : int
+        Number of virtual fields.
+    nlgeom : bool
+        Flag for small or large deformation framework (0/1).
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    flat : bool
+        Flag to flatten stress sensitivities by elements and components (0/1).
+
+    Returns
+    -------
+    ss : (nvfs,nf,ne*ncomp) or (nvfs,nf,ne,dof,dof) , float
+        Total stress sensitivity.
+    iss : (nvfs,nf,ne*ncomp) or (nvfs,nf,ne,dof,dof) , float
+        Incremental stress sensitivity.
+
+    Notes
+    -----
+    The stress integration results of the batch of material properties are
+      kept in the 'sens' slot of the result store until the next stress
+      sensitivity of the test, so that the stress sensitivities at the same
+      material properties are not integrated again.
+    """
+
+    args = (strain,rot,dfgrd,rotm,sb['dx'],ne,dof,ndi,nshr,ntens,nstatev,nf,t,
+            nprops,props,vars,nvfs,nlgeom,fout,engine,flat)
+
+    # Compute total stress sensitivity
+    if sb['mode'] == 'cs':
+        ss = complex_step_sensitivity(*args)
     else:
-        ss = np.zeros((nvfs,nf,ne,dof,dof))
-        iss = np.zeros((nvfs,nf,ne,dof,dof))
+        ss = finite_difference_sensitivity(*args)
 
-    # Loop over identification variables
-    for i in range(nvfs):
+    # Check complex-step against finite difference stress sensitivity
+    if sb['check'] and (sb['mode'] == 'cs'):
+        ssfd = finite_difference_sensitivity(*args)
+        axes = tuple(range(1,ss.ndim))
+        diff = np.max(np.abs(ss - ssfd),axis=axes)
+        diff = diff / np.maximum(np.max(np.abs(ssfd),axis=axes),1e-30)
 
-        # Copy reference material properties
-        dprops = np.copy(props)
+        f = open(os.path.join(dirout,f'{fout}.log'),'a')
+        for i in range(nvfs):
+            out = (f'  Test {t+1} Stress Sensitivity Check : variable {i+1} '
+                   f'relative difference {diff[i]:.3e}')
+            print(out)
+            f.write(f'{out}\n')
+        f.close()
 
-        # Add perturbation to identification variable
-        dprops[np.flatnonzero(vars)[i]] = props[vars][i] - dx*props[vars][i]
-
-        # Compute cauchy stress on global csys
-        stress,_,de33 = _funcs.cauchy_stress(strain,rot,rotm,ne,dof,ndi,nshr,
-                                             ntens,nstatev,nf,nprops,dprops,
-                                             fout,voigt=voigt)
-
-        # Compute 1st piola-kirchhoff stress
-        if nlgeom:
-            pkstress = _funcs.piola_kirchhoff_stress(stress,de33,dfgrd,ne,
-                                                     dof,nf,flat)
-
-        # Compute total stress sensitivity
-        if nlgeom:
-            ss[i] = pkstressref - pkstress
-        else:
-            ss[i] = stressref - stress
-
-        # Compute incremental stress sensitivity
-        iss[i,1:] = (ss[i,1:] - ss[i,:-1]) / dtime
+    # Compute incremental stress sensitivity
+    iss = np.zeros_like(ss)
+    dtime = (time[1:] - time[:-1]).reshape((-1,)+(1,)*(ss.ndim-2))
+    iss[:,1:] = (ss[:,1:] - ss[:,:-1]) / dtime
 
     # Flatten stress sensitivities by elements and components
     if flat:
@@ -3,7 +3,7 @@ import numpy as np
 import _funcs
 
 def vfm_core(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
-             nstatev,nvfs,nf,nprops,props,nlgeom,fout):
+             nstatev,nvfs,nf,t,nprops,props,nlgeom,fout,engine):
     """
     VFM Core Function
 
@@ -39,35 +39,38 @@ def vfm_core(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
         Number of virtual fields.
     nf : int
         Number of increments.
+    t : int
+        Test number.
     nprops : int
         Number of material properties.
-    props : (nprops,) , float
-        Material properties.
+    props : (nprops,) or (nbatch,nprops) , float
+        Material properties, or batch of material properties.
     nlgeom : bool
         Flag for small or large deformation framework (0/1).
-
     fout : str
         Name of output folder.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
 
     Returns
     -------
-    ivw : (nvfs,nf) , float
+    ivw : ([nbatch],nvfs,nf) , float
         Internal virtual work.
     evw : (nvfs,nf) , float
         External virtual work.
-    res : (nvfs*nf) , float
+    res : ([nbatch],nvfs*nf) , float
         Cost function residuals for time increments and virtual fields.
-    phi : float
+    phi : float or (nbatch,) , float
         Cost function.
-    success : bool
+    success : bool or (nbatch,) , bool
         Variable to monitor the sucess of stress reconstruction (False/True).
     """
 
     # Compute internal virtual work
     ivw,success = _funcs.internal_virtual_work(strain,rot,dfgrd,rotm,vol,
                                                vfs['e'],ne,dof,ndi,nshr,ntens,
-                                               nstatev,nvfs,nf,nprops,props,
-                                               nlgeom,fout)
+                                               nstatev,nvfs,nf,t,nprops,props,
+                                               nlgeom,fout,engine)
 
     # Compute external virtual work
     evw = _funcs.external_virtual_work(force,vfs['u'])
@@ -79,9 +82,10 @@ def vfm_core(strain,rot,dfgrd,rotm,force,vol,vfs,ne,dof,ndi,nshr,ntens,
         alpha = np.ones((nvfs,1))
 
     # Compute residuals of increments and virtual fields
-    res = np.ravel(alpha * (ivw - evw),order='F')
+    res = np.swapaxes(alpha * (ivw - evw),-1,-2)
+    res = np.reshape(res,res.shape[:-2]+(nvfs*nf,))
 
     # Compute cost function
-    phi = np.sum(res**2)
+    phi = np.sum(res**2,-1)
 
-    return ivw,evw,phi,success
\ No newline at end of file
+    return ivw,evw,res,phi,success
\ No newline at end of file
@@ -25,6 +25,30 @@ def write_progress(it,fevit,x,phi,nvars,nt,fout,dirout):
         Directory of project to export output files.
     """
 
+    write_progress_rows([(it,fevit,x,phi)],nvars,nt,fout,dirout)
+
+    return
+
+def write_progress_rows(rows,nvars,nt,fout,dirout):
+    """
+    Write a batch of rows of identification progress of variables and cost
+      function at once.
+
+    Parameters
+    ----------
+    rows : (nrows, (it,fevit,x,phi) ) , tuple
+        Iteration number, total number of function evaluations in iteration,
+          identification variables and cost function of each row.
+    nvars : int
+        Number of identification variables.
+    nt : int
+        Number of tests.
+    fout : str
+        Name of output folder.
+    dirout : str
+        Directory of project to export output files.
+    """
+
     # Set output directory
     fname = os.path.join(dirout,f'{fout}_Progress.csv')
 
@@ -36,24 +60,12 @@ def write_progress(it,fevit,x,phi,nvars,nt,fout,dirout):
     fmt.insert(0,'%d')
     fmt.insert(0,'%d')
 
-    # If first evaluation create file
-    if not os.path.exists(fname):
-
-        # Generate header
-        head = f'it;fe;phi'
+    # Generate iteration number, evaluations in iteration and cost function
+    louts = []
+    for it,fevit,x,phi in rows:
 
-        if nt > 1:
-            for i in range(nt):
-                head = head + f';phi{i+1}'
-
-        if len(x) > 9:
-            headx = [f'x{i+1}' for i in range(nvars)]
-        else:
-            headx = [f'x{i+1}' for i in range(nvars)]
-
-        head = f'{head};{";".join(headx)}'
-
-        # Insert cost function
+        # Insert cost function, nan for all tests if reconstruction fails
+        phi = np.broadcast_to(phi,(nt,))
         if nt > 1:
             lout = np.insert(x,0,phi)
             lout = np.insert(lout,0,np.sum(phi))
@@ -66,27 +78,28 @@ def write_progress(it,fevit,x,phi,nvars,nt,fout,dirout):
         # Insert iteration number
         lout = np.insert(lout,0,it)
 
-        # Write header and first iteration result
-        np.savetxt(fname,[lout],header=head,fmt=fmt,delimiter=';',comments='')
+        louts.append(lout)
 
-    # Append subsequent evaluations
-    else:
+    # If first evaluation create file
+    if not os.path.exists(fname):
+
+        # Generate header
+        head = f'it;fe;phi'
 
-        # Insert cost function
         if nt > 1:
-            lout = np.insert(x,0,phi)
-            lout = np.insert(lout,0,np.sum(phi))
-        else:
-            lout = np.insert(x,0,phi)
+            for i in range(nt):
+                head = head + f';phi{i+1}'
 
-        # Insert total number of evaluations in iteration
-        lout = np.insert(lout,0,fevit)
+        headx = [f'x{i+1}' for i in range(nvars)]
 
-        # Insert iteration number
-        lout = np.insert(lout,0,it)
+        head = f'{head};{";".join(headx)}'
 
-        # Append iteration result
+        # Write header and first iterations results
+        np.savetxt(fname,louts,header=head,fmt=fmt,delimiter=';',comments='')
+
+    # Append subsequent evaluations
+    else:
         with open(fname,'a') as f:
-            np.savetxt(f,[lout],fmt=fmt,delimiter=';')
+            np.savetxt(f,louts,fmt=fmt,delimiter=';')
 
     return
\ No newline at end of file
@@ -5,6 +5,9 @@ from .LoadOptions import *
 from .CreateDirectory import *
 from .PrintStart import *
 from .LoadData import *
+from .DataCache import *
+from .LoadDisplacements import *
+from .ProjectContainer import *
 from .MaterialProperties import *
 from .DimVars import * 
 from .MaterialRotation import *
@@ -13,20 +16,31 @@ from .ElQuad4R import *
 from .ElHex8R import *
 from .DeformationGradient import *
 from .PolarDecomposition import *
+from .PolarLogarithm import *
 from .Simulation import *
+from .ParallelTests import *
 from .Identification import *
+from .MultiStart import *
+from .Checkpoint import *
 from .CheckSolution import *
 from .WriteProgress import *
+from .BackgroundWriter import *
 from .PrintProgress import *
 from .PrintResult import *
 from .PropertiesConstraints import *
 from .VFMCore import *
 from .CauchyStress import *
+from .StressIntegration import *
+from .ParallelIntegration import *
+from .StressCache import *
+from .ResultStore import *
+from .ReturnMapping import *
 from .HydrostaticStress import *
 from .DeviatoricStress import *
 from .PiolaKirchhoffStress import *
 from .UserDefinedVirtualFields import *
 from .SensivityBasedVirtualFields import *
+from .RefreshVirtualFields import *
 from .BoundaryConditions import *
 from .StrainDisplacementMatrix import *
 from .StressSensitivity import *
@@ -39,4 +53,7 @@ from .PostProcessing import *
 from .ExportParaview import *
 
 # f2py
-import _funcs.ummdp_vfm as ummdp_vfm
\ No newline at end of file
+try:
+    import _funcs.ummdp_vfm as ummdp_vfm
+except ImportError:
+    ummdp_vfm = None
\ No newline at end of file
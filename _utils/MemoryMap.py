@@ -0,0 +1,59 @@
+import tempfile
+import numpy as np
+
+def memory_map(shape,engine,dtype=float):
+    """
+    Allocate array in memory or in a memory-mapped scratch file.
+
+    Parameters
+    ----------
+    shape : tuple , int
+        Shape of array.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+    dtype : type
+        Data type of array.
+
+    Returns
+    -------
+    array : shape , dtype
+        Array initialized with zeros.
+    """
+
+    # In-memory array
+    if engine['nblk'] is None:
+        array = np.zeros(shape,dtype=dtype)
+
+    # Memory-mapped array in scratch file deleted when released
+    else:
+        fscratch = tempfile.TemporaryFile(dir=engine['dir'])
+        array = np.memmap(fscratch,dtype=dtype,mode='w+',shape=shape)
+
+    return array
+
+def increment_blocks(nf,engine):
+    """
+    Split increments in blocks to be processed at once.
+
+    Parameters
+    ----------
+    nf : int
+        Number of increments.
+    engine : {'nblk','dir','type','workers','tests','cache'} , dict
+        Computation engine settings.
+
+    Returns
+    -------
+    blocks : (nblocks,) , slice
+        Slices of increments in each block.
+    """
+
+    # Number of increments per block
+    if engine['nblk'] is None:
+        nblk = max(nf,1)
+    else:
+        nblk = engine['nblk']
+
+    blocks = [slice(f,min(f+nblk,nf)) for f in range(0,nf,nblk)]
+
+    return blocks
\ No newline at end of file
@@ -0,0 +1,37 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+def shared_array(shape,dtype=float,name=None):
+    """
+    Create or attach to an array in a shared memory block.
+
+    Parameters
+    ----------
+    shape : tuple , int
+        Shape of array.
+    dtype : type
+        Data type of array.
+    name : str or None
+        Name of existing shared memory block, or None to create a new one.
+
+    Returns
+    -------
+    shm : SharedMemory
+        Shared memory block, to be closed (and unlinked by its creator) after
+          all references to the array are released.
+    array : shape , dtype
+        Array in shared memory block.
+    """
+
+    shape = tuple(int(i) for i in shape)
+    size = max(1,int(np.prod(shape)) * np.dtype(dtype).itemsize)
+
+    # Create or attach to shared memory block
+    if name is None:
+        shm = shared_memory.SharedMemory(create=True,size=size)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+
+    array = np.ndarray(shape,dtype=dtype,buffer=shm.buf)
+
+    return shm,array
\ No newline at end of file
@@ -30,7 +30,7 @@ def tensor_to_voigt(tensor,ne,ndi,ntens,nf,eng=False):
         Number of degrees of freedom.
     """
 
-    voigt = np.zeros((nf,ne,ntens))
+    voigt = np.zeros((nf,ne,ntens),dtype=np.result_type(tensor,float))
 
     voigt[...,0] = tensor[...,0,0]
     voigt[...,1] = tensor[...,1,1]
@@ -25,7 +25,7 @@ def voigt_to_tensor(voigt,ne,dof,ntens,nf,eng=False):
         Array in tensor form.
     """
 
-    tensor = np.zeros((nf,ne,dof,dof))
+    tensor = np.zeros((nf,ne,dof,dof),dtype=np.result_type(voigt,float))
 
     tensor[...,0,0] = voigt[...,0]
     tensor[...,1,1] = voigt[...,1]
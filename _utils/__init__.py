@@ -8,4 +8,6 @@ from .TensorToVoigt import *
 from .FlattenTensor import *
 from .RearrangeTensor import *
 from .Error import *
-from .f2pyStop import *
\ No newline at end of file
+from .f2pyStop import *
+from .MemoryMap import *
+from .SharedArray import *
\ No newline at end of file